@@ -0,0 +1,130 @@
+"""
+Turn saved Docket.aspx pages into benchmark fixtures with no personal data left in them.
+
+    python benchmarks/anonymize.py saved/Docket_412345.html --name typical.html
+
+Party names, addresses, attorneys, the caption and the judge are replaced with stable
+pseudonyms (the same input name always maps to the same fake name, so a party named in
+a docket entry still matches its row in #dgrdParties). Street numbers are scrambled, while
+city, state and ZIP are kept because the address parsing depends on their layout.
+ASP.NET state fields are overwritten with random bytes of the same length. Dates, docket
+types and the remaining docket text are kept as they are.
+
+Review every page before committing it; the pseudonyms only cover the fields above.
+"""
+import argparse
+import base64
+import hashlib
+import os
+import random
+import re
+
+from bs4 import BeautifulSoup
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FIRST_NAMES = ('JOHN', 'JANE', 'ALEX', 'SAM', 'PAT', 'CHRIS', 'TAYLOR', 'JORDAN', 'CASEY', 'MORGAN')
+LAST_NAMES = ('DOE', 'ROE', 'SMITH', 'JONES', 'MILLER', 'DAVIS', 'BROWN', 'WILSON', 'MOORE', 'CLARK')
+STREETS = ('MAIN ST', 'ELM ST', 'OAK AVE', 'PARK DR', 'LAKE RD', 'HILL ST', 'CEDAR LN', 'MAPLE AVE')
+STATE_FIELDS = ('__VIEWSTATE', '__EVENTVALIDATION', '__PREVIOUSPAGE')
+# Party columns of #dgrdParties holding names: name and attorney
+NAME_COLUMNS = (0, 4)
+ADDRESS_COLUMN = 3
+CITY_STATE_ZIP_PATTERN = re.compile(r'^[^,]+,\s*[A-Z]{2}\s+\d{5}(?:-\d{4})?$')
+
+
+def _pick(options: tuple, seed: str, salt: str) -> str:
+    digest = hashlib.sha256(f'{salt}:{seed}'.encode('utf-8')).digest()
+    return options[digest[0] % len(options)]
+
+
+def pseudonym(name: str) -> str:
+    """A stable fake name in the original's 'LAST, FIRST' or 'FIRST LAST' layout."""
+    name = ' '.join(name.split())
+    if not name or name == ',':
+        return name
+    key = name.upper()
+    last, first = _pick(LAST_NAMES, key, 'last'), _pick(FIRST_NAMES, key, 'first')
+    suffix = hashlib.sha256(key.encode('utf-8')).hexdigest()[:4].upper()
+    if ',' in name:
+        return f'{last}{suffix}, {first}'
+    return f'{first} {last}{suffix}'
+
+
+def street(line: str) -> str:
+    """A stable fake street line."""
+    number = int(hashlib.sha256(line.upper().encode('utf-8')).hexdigest()[:6], 16) % 9999 + 1
+    return f'{number} {_pick(STREETS, line.upper(), "street")}'
+
+
+def anonymize(html: bytes) -> str:
+    """
+    :param html: A saved Docket.aspx page.
+    :return: The page with personal data replaced, see the module docstring.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    names = {}
+
+    def replace_name(element) -> None:
+        text = element.get_text(' ', strip=True)
+        if text and text != ',':
+            names[text] = pseudonym(text)
+            element.string = names[text]
+
+    parties = soup.find('table', id='dgrdParties')
+    for row in (parties.find_all('tr')[1:] if parties else []):
+        columns = row.find_all('td')
+        for index in NAME_COLUMNS:
+            if index < len(columns):
+                replace_name(columns[index])
+        if ADDRESS_COLUMN < len(columns):
+            for text in columns[ADDRESS_COLUMN].find_all(string=True):
+                stripped = text.strip()
+                if stripped and stripped != ',' and not CITY_STATE_ZIP_PATTERN.match(stripped):
+                    text.replace_with(street(stripped))
+
+    for label_id in ('lblCaption', 'lblJudgeName'):
+        label = soup.find(id=label_id)
+        if label is not None:
+            caption = label.get_text()
+            for original, fake in names.items():
+                caption = caption.replace(original, fake)
+            label.string = caption if label_id == 'lblCaption' else pseudonym(caption)
+
+    results = soup.find('table', id='dgrdResults')
+    for text in (results.find_all(string=True) if results else []):
+        replaced = str(text)
+        for original, fake in names.items():
+            replaced = replaced.replace(original, fake)
+        if replaced != text:
+            text.replace_with(replaced)
+
+    for field in STATE_FIELDS:
+        element = soup.find('input', attrs={'name': field})
+        if element is not None and element.get('value'):
+            size = len(base64.b64decode(element['value'] + '==', validate=False)) or 1
+            element['value'] = base64.b64encode(random.randbytes(size)).decode('ascii')
+
+    return str(soup)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Anonymize saved Docket.aspx pages into benchmark fixtures.')
+    parser.add_argument('pages', nargs='+', help='saved Docket.aspx HTML files')
+    parser.add_argument('--name', help='fixture file name (single page only), defaults to the input name')
+    parser.add_argument('--out', default=FIXTURES_DIR, help='output directory (default: benchmarks/fixtures)')
+    args = parser.parse_args(argv)
+    if args.name and len(args.pages) > 1:
+        parser.error('--name needs exactly one page')
+
+    for page in args.pages:
+        with open(page, 'rb') as file:
+            html = file.read()
+        target = os.path.join(args.out, args.name or os.path.basename(page))
+        with open(target, 'w', encoding='utf-8') as file:
+            file.write(anonymize(html))
+        print(f'{page} -> {target} (add it to fixtures/manifest.json)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Offline parse benchmarks over the saved Lorain Docket.aspx pages in benchmarks/fixtures.
+
+    python benchmarks/run_benchmarks.py                   # report cases/sec and peak memory
+    python benchmarks/run_benchmarks.py --save-baseline   # record the numbers in baseline.json
+    python benchmarks/run_benchmarks.py --check           # exit 1 if slower / bigger than the baseline
+
+Run it where `public_digital` is importable (inside the docker image). Nothing is fetched
+from the court site. The baseline is per machine and per HTML_PARSER_BACKEND, so record it
+on the machine that runs the check.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+from scrapy.exceptions import IgnoreRequest
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+MANIFEST_PATH = os.path.join(FIXTURES_DIR, 'manifest.json')
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+SPIDERS_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Allowed relative slowdown (cases/sec) or growth (peak memory) before --check fails
+DEFAULT_THRESHOLD = 0.15
+
+
+def import_spiders() -> SimpleNamespace:
+    """Import the parse modules through the spiders package, as the crawler does."""
+    sys.path.insert(0, os.path.dirname(SPIDERS_DIR))
+    package = os.path.basename(SPIDERS_DIR)
+    return SimpleNamespace(
+        parse_functions=importlib.import_module(f'{package}.parse_utils.parse_functions'),
+        parse_classes=importlib.import_module(f'{package}.parse_utils.parse_classes'),
+        html_backends=importlib.import_module(f'{package}.parse_utils.html_backends'),
+        parse=importlib.import_module(f'{package}.county.parse'),
+    )
+
+
+def load_fixtures(names=None) -> list:
+    """
+    :param names: Fixture file names to keep, all fixtures if None.
+    :return: (name, manifest entry, page bytes) for every fixture in manifest.json.
+    """
+    with open(MANIFEST_PATH) as file:
+        manifest = json.load(file)
+    fixtures = []
+    for name, entry in manifest.items():
+        if names and name not in names and os.path.splitext(name)[0] not in names:
+            continue
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as file:
+            fixtures.append((name, entry, file.read()))
+    return fixtures
+
+
+def expect_failure(func, exceptions):
+    """Wrap `func` so the exception a page is expected to raise does not stop the benchmark."""
+    def call():
+        try:
+            func()
+        except exceptions:
+            pass
+        else:
+            raise AssertionError('fixture parsed although it was expected to fail')
+    return call
+
+
+def build_benchmarks(spiders: SimpleNamespace, name: str, entry: dict, html: bytes, backend: str) -> dict:
+    """
+    The benchmarks of one fixture, as {benchmark name: callable}.
+
+    Civil pages get a benchmark per parse stage, each fed with the previous stage's output
+    so only the stage itself is timed, plus the full `parse_case_data`. Non civil and error
+    pages get `parse_case_data`, timed up to the exception that rejects them, and non civil
+    pages also the byte level pre-filter the spider drops them with.
+    """
+    functions = spiders.parse_functions
+    link = f'https://example.invalid/Docket.aspx?CaseID={entry["case_number"]}'
+    item = {
+        'case_number': entry['case_number'], 'link': link, 'county': entry.get('county', 'Lorain'),
+        'soup': None, 'body': html, 'encoding': 'utf-8',
+    }
+    spider = SimpleNamespace(settings={'HTML_PARSER_BACKEND': backend})
+
+    def parse_case_data():
+        return spiders.parse.parse_case_data(item, spider)
+
+    if entry['kind'] == 'not_civil':
+        return {
+            'case_prefilter': lambda: functions.is_civil_case_number(functions.case_number_from_bytes(html)),
+            'parse_case_data': expect_failure(parse_case_data, IgnoreRequest),
+        }
+    if entry['kind'] == 'error':
+        return {'parse_case_data': expect_failure(parse_case_data, Exception)}
+
+    document = spiders.html_backends.build_document(html, backend)
+    case_dict = functions.parse_case_related_data(document, item['county'], entry['case_number'])
+    docket_columns = functions.parse_docket_columns(document)
+    defendant_dicts, plaintiffs = functions.parse_plaintiffs_and_defendants(document, link)
+    if (len(docket_columns), len(defendant_dicts)) != (entry['docket_entries'], entry['defendants']):
+        raise AssertionError(
+            f'{name}: parsed {len(docket_columns)} docket entries and {len(defendant_dicts)} defendants, '
+            f'manifest.json expects {entry["docket_entries"]} and {entry["defendants"]}'
+        )
+
+    return {
+        'parse_docket_entries': lambda: functions.parse_docket_entries(document),
+        'parse_docket_columns': lambda: functions.parse_docket_columns(document),
+        'parse_plaintiffs_and_defendants': lambda: functions.parse_plaintiffs_and_defendants(document, link),
+        'process_entries': lambda: spiders.parse_classes.DocketProcessor(
+            dict(case_dict), plaintiffs
+        ).process_entries(docket_columns),
+        'parse_case_data': parse_case_data,
+    }
+
+
+def measure(func, min_time: float, repeat: int) -> dict:
+    """
+    :return: cases/sec of the best of `repeat` timing rounds of at least `min_time` seconds,
+        and the peak traced allocation of a single call in KiB.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    best = min(timer.repeat(repeat, number))
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'cases_per_sec': round(number / best, 2), 'peak_kib': round(peak / 1024, 1)}
+
+
+def run(fixtures: list, backend: str, min_time: float, repeat: int) -> dict:
+    spiders = import_spiders()
+    results = {}
+    # parse_case_related_data prints every case number
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, entry, html in fixtures:
+            for benchmark, func in build_benchmarks(spiders, name, entry, html, backend).items():
+                results[f'{os.path.splitext(name)[0]}/{benchmark}'] = measure(func, min_time, repeat)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    :return: A message for every benchmark that got slower or bigger than the baseline
+        allows, empty if there is no regression.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result['cases_per_sec'] < base['cases_per_sec'] * (1 - threshold):
+            regressions.append(
+                f'{key}: {result["cases_per_sec"]} cases/sec, baseline {base["cases_per_sec"]}'
+            )
+        if result['peak_kib'] > base['peak_kib'] * (1 + threshold):
+            regressions.append(f'{key}: peak {result["peak_kib"]} KiB, baseline {base["peak_kib"]}')
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def print_report(results: dict, baseline: dict) -> None:
+    print(f'{"benchmark":<48} {"cases/sec":>12} {"peak KiB":>10} {"vs baseline":>12}')
+    for key, result in results.items():
+        change = ''
+        if key in baseline:
+            change = f'{result["cases_per_sec"] / baseline[key]["cases_per_sec"] - 1:+.1%}'
+        print(f'{key:<48} {result["cases_per_sec"]:>12,.1f} {result["peak_kib"]:>10,.1f} {change:>12}')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Offline parse benchmarks over saved docket pages.')
+    parser.add_argument('--backend', default='bs4', choices=('bs4', 'lxml', 'selectolax'),
+                        help='HTML_PARSER_BACKEND to benchmark (default: bs4)')
+    parser.add_argument('--fixture', action='append', dest='fixtures',
+                        help='only run this fixture (repeatable), e.g. --fixture huge')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per timing round (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing rounds, the best is kept (default: 5)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'allowed regression as a fraction (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='exit 1 if any benchmark regressed')
+    args = parser.parse_args(argv)
+
+    results = run(load_fixtures(args.fixtures), args.backend, args.min_time, args.repeat)
+
+    stored = load_baseline(args.baseline)
+    baseline = stored.get('backends', {}).get(args.backend, {})
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        stored.setdefault('backends', {})[args.backend] = results
+        stored['python'] = platform.python_version()
+        stored['machine'] = platform.node()
+        with open(args.baseline, 'w') as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+        print(f'baseline saved to {args.baseline}')
+
+    if args.check:
+        if not baseline:
+            print(f'no {args.backend!r} baseline in {args.baseline}, run with --save-baseline first')
+            return 1
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            return 1
+        print(f'no regression beyond {args.threshold:.0%}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import scrapy
+
+from public_digital.items.base_case_items import CaseItem
+
+
+class CompactCaseItem(CaseItem):
+    """
+    CaseItem that carries the raw Docket.aspx bytes instead of a parsed tree.
+
+    No tree is kept alive while the item waits in the pipeline queue: the memory held
+    per item is `len(body)` plus the few short metadata strings, under 1 KB on top of
+    the body. The `case_item/body_bytes_max` stat records the largest body seen.
+    """
+
+    body = scrapy.Field()
+    encoding = scrapy.Field()
+    # PackedCase already parsed from the response archive (replay mode), see parse_case_data
+    packed_case = scrapy.Field()
+
+
+def item_source(item: CaseItem):
+    """
+    HTML the parse steps should read for a CaseItem.
+    :param item: A CompactCaseItem or a CaseItem carrying a soup.
+    :return: The decoded page of a CompactCaseItem, otherwise the soup.
+    """
+    body = item.get('body')
+    if body is not None:
+        return body.decode(item.get('encoding') or 'utf-8', 'replace')
+    return item['soup']
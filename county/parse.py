@@ -1,15 +1,23 @@
+from typing import Optional, Tuple
+
 from ..parse_utils.parse_functions import (
-    parse_docket_entries, parse_case_related_data,
-    parse_plaintiffs_and_defendants, parse_docket_fields
+    parse_docket_columns, parse_case_related_data,
+    parse_plaintiffs_and_defendants, parse_docket_fields,
+    case_number_from_bytes, is_civil_case_number
 )
 
 from ..parse_utils.melissa_address_search import search_personator
+from ..parse_utils.html_backends import as_document
+from ..parse_utils.stage_timing import STAGE_TIMINGS, count_event, stage_timer
+from ..crawl_utils.response_archive import ArchivedResponse, read_body
+from .items import item_source
 
 from public_digital.dataclasses.base_dataclasses import (
     CaseDocket, Case, CaseParty, PackedCase
 )
 
 from public_digital.items.base_case_items import CaseItem
+from scrapy.exceptions import IgnoreRequest
 from ..county.scraper import CaseScraper
 
 
@@ -40,14 +48,80 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
      'county': 'County',
      'state': 'AL',
      'zip_code': '10000'}
+
+    search_personator blocks until Melissa answers. From Scrapy code use
+    defer_personator(...) (a Deferred) or submit_personator(...) (a Future) instead; both
+    return a PersonatorResult whose `address` holds the value above.
+
+    For a defendant dict from step 3 use lookup_defendant(defendant_dict, county): when
+    the docket address already lies in the county (checked against zips.txt) it returns
+    that address without calling Melissa, and counts the call as avoided.
     """
     
 
+    # Items replayed from the response archive were already parsed in a worker process
+    if item.get('packed_case') is not None:
+        return item['packed_case']
+
     # ITEM DATA AVAILABLE
-    soup = item['soup']
-    case_number_int_repr = item['case_number']
-    link = item['link']
-    county = item['county']
+    # HTML_PARSER_BACKEND ('bs4', 'lxml' or 'selectolax') picks the tree the extractors walk
+    # Every step is timed into the stage_timing/* stats by the StageMetrics extension
+    with stage_timer('soup'):
+        soup = as_document(item_source(item), spider.settings.get('HTML_PARSER_BACKEND', 'bs4'))
+
+    return parse_case_document(soup, item['case_number'], item['link'], item['county'])
+
+
+def parse_case_body(body: bytes, encoding: Optional[str], case_number_int_repr: int,
+                    link: str, county: str, backend: str = 'bs4') -> Optional[PackedCase]:
+    """
+    parse_case_data for a raw Docket.aspx body, without an item or a spider, so it can
+    run in a worker process.
+    :return: The PackedCase, None if the page is not a civil case.
+    """
+    case_number = case_number_from_bytes(body)
+    if case_number is not None and not is_civil_case_number(case_number):
+        return None
+    with stage_timer('soup'):
+        soup = as_document(body.decode(encoding or 'utf-8', 'replace'), backend)
+    try:
+        return parse_case_document(soup, case_number_int_repr, link, county)
+    except IgnoreRequest:
+        return None
+
+
+def parse_pooled_body(body: bytes, encoding: Optional[str], case_number_int_repr: int,
+                      link: str, county: str, backend: str = 'bs4') -> Tuple[Optional[PackedCase], tuple]:
+    """
+    Worker process entry point of the parse pool: parse_case_body, plus the stage timings
+    the worker recorded, for STAGE_TIMINGS.merge on the crawler's side.
+    :return: (PackedCase or None if not civil, STAGE_TIMINGS.drain() of the worker)
+    """
+    packed_case = parse_case_body(body, encoding, case_number_int_repr, link, county, backend)
+    return packed_case, STAGE_TIMINGS.drain()
+
+
+def parse_archived_response(archived: ArchivedResponse, county: str,
+                            backend: str = 'bs4') -> Tuple[int, Optional[PackedCase], Optional[str], tuple]:
+    """
+    Worker process entry point of the archive replay: reads one archived response
+    and parses it with parse_case_body.
+    :return: (CaseID, PackedCase or None if not civil, error message or None,
+        STAGE_TIMINGS.drain() of the worker)
+    """
+    try:
+        packed_case = parse_case_body(
+            read_body(archived), archived.encoding, archived.case_id, archived.url, county, backend
+        )
+    except Exception as error:
+        return archived.case_id, None, f'{type(error).__name__}: {error}', STAGE_TIMINGS.drain()
+    return archived.case_id, packed_case, None, STAGE_TIMINGS.drain()
+
+
+def parse_case_document(soup, case_number_int_repr: int, link: str, county: str) -> PackedCase:
+    """ Steps 1 - 8 of parse_case_data on a parsed Docket.aspx page (a Document or
+    BeautifulSoup object).
+    """
     
     """ -------------------------------------------------------------------------------------
     
@@ -68,22 +142,30 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
         court_type: str 
         case_type: str
     """
-    case_dict = parse_case_related_data(soup, county, case_number_int_repr)
+    with stage_timer('parse/1_case_related_data'):
+        try:
+            case_dict = parse_case_related_data(soup, county, case_number_int_repr)
+        except IgnoreRequest:
+            count_event('non_civil_ignored')
+            raise
     
     """ -------------------------------------------------------------------------------------
 
     #
     # (STEP 2)
     #
-    # Create a list of dictionaries containing the docket entry data as key, value pairs
+    # Create a DocketColumns holding the docket entry data column wise
+    # (parse_docket_entries gives the same rows as dictionaries)
     # In the following data structure
     
-    docket_dicts
-        entry: str
-        date_time: datestring format '01/01/1900 
-        unique_id: int
+    docket_columns
+        entries: str
+        date_times: datestring format '01/01/1900 
+        types: str
+        unique_ids: int
     """
-    docket_dicts = parse_docket_entries(soup)
+    with stage_timer('parse/2_docket_entries'):
+        docket_columns = parse_docket_columns(soup)
 
     """ -------------------------------------------------------------------------------------
 
@@ -104,7 +186,8 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
     plaintiffs
         'John Doe 1, John Doe 2, and Jane Doe'
     """
-    defendant_dicts, plaintiffs = parse_plaintiffs_and_defendants(soup, link)
+    with stage_timer('parse/3_plaintiffs_and_defendants'):
+        defendant_dicts, plaintiffs = parse_plaintiffs_and_defendants(soup, link)
 
     """ -------------------------------------------------------------------------------------
 
@@ -138,9 +221,10 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
         agreement_date: datestring format '01/01/1900 
         is_bankruptcy_filed: bool
     """
-    case_docket_data, case_party_docket_data = parse_docket_fields(
-        docket_dicts, case_dict, plaintiffs
-    )
+    with stage_timer('parse/4_docket_fields'):
+        case_docket_data, case_party_docket_data = parse_docket_fields(
+            docket_columns, case_dict, plaintiffs
+        )
 
     """ -------------------------------------------------------------------------------------
 
@@ -153,12 +237,10 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
     #
     # (STEP 5)
     #
-    # Create a list of CaseDocket objects
+    # Create a list of CaseDocket objects straight from the docket columns
     """
-    dockets = [
-        CaseDocket(**docket_entry)
-        for docket_entry in docket_dicts
-    ]
+    with stage_timer('parse/5_case_dockets'):
+        dockets = docket_columns.case_dockets(CaseDocket)
 
     """ -------------------------------------------------------------------------------------
 
@@ -167,7 +249,8 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
     #
     # Create a Case object
     """
-    case = Case(**case_docket_data)
+    with stage_timer('parse/6_case'):
+        case = Case(**case_docket_data)
     
     """ -------------------------------------------------------------------------------------
 
@@ -177,14 +260,15 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
     # Create a list of CaseParty objects with dictionaries that were created
     # Also add the list of CaseDockets as a dictionary.
     """
-    case_parties = [
-        CaseParty(
-            **case_party_docket_data,
-            **defendant_dict,
-            docket_entries=dockets
-        )
-        for defendant_dict in defendant_dicts
-    ]
+    with stage_timer('parse/7_case_parties'):
+        case_parties = [
+            CaseParty(
+                **case_party_docket_data,
+                **defendant_dict,
+                docket_entries=dockets
+            )
+            for defendant_dict in defendant_dicts
+        ]
 
     """ -------------------------------------------------------------------------------------
 
@@ -193,4 +277,9 @@ def parse_case_data(item: CaseItem, spider: CaseScraper) -> PackedCase:
     #
     # Create BaseCasePacked object with the list of Case and list of CaseParty objects
     """
-    return PackedCase(case, case_parties)
+    with stage_timer('parse/8_packed_case'):
+        packed_case = PackedCase(case, case_parties)
+
+    count_event('cases_parsed')
+    count_event('docket_entries', len(dockets))
+    return packed_case
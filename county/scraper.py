@@ -1,53 +1,537 @@
 from public_digital.spiders import BaseScraper as pd
-from typing import Generator
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, count, islice, takewhile
+from typing import AsyncGenerator, Dict, Generator, Iterator, Optional
+from scrapy import signals
+from scrapy.http import Response
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import defer
+
+from ..crawl_utils.case_window import CaseIDWindow
+from ..crawl_utils.checkpoint import CrawlCheckpoint
+from ..crawl_utils.fingerprints import FingerprintStore
+from ..crawl_utils.frontier import FrontierSearch
+from ..crawl_utils.page_class import (
+    PAGE_EMPTY, TRANSIENT_PAGE_CLASSES, RetryScheduled, classify_page
+)
+from ..crawl_utils.range_index import CaseTypeRangeIndex
+from ..crawl_utils.response_archive import ArchivedResponse, ResponseArchive
+from ..crawl_utils.state import state_path
+from ..parse_utils.parse_functions import (
+    case_fingerprint, case_number_from_bytes, case_type_prefix, is_civil_case_number
+)
+from ..parse_utils.stage_timing import STAGE_TIMINGS, count_event, reset_stage_timings, stage_timer
+from .items import CompactCaseItem
 
 
 class CaseScraper(pd.CaseScraperBase):
 
     name = 'lorain_scraper'
 
+    # Pipelines in ./pipelines, added to ITEM_PIPELINES when their setting is enabled:
+    # (enabling setting, module.Class, order setting, default order). Both run before
+    # the Public Digital pipeline that calls parse_case_data.
+    LOCAL_PIPELINES = (
+        # parses CompactCaseItems on worker processes
+        ('PARSE_POOL_ENABLED', 'ParsePoolPipeline_100.ParsePoolPipeline', 'PARSE_POOL_PIPELINE_ORDER', 100),
+        # spools PackedCases into compressed batch files
+        ('CASE_SPOOL_ENABLED', 'CaseSpoolPipeline_200.CaseSpoolPipeline', 'CASE_SPOOL_PIPELINE_ORDER', 200),
+    )
+
+    @classmethod
+    def update_settings(cls, settings) -> None:
+        super().update_settings(settings)
+        package = __package__.rsplit('.', 1)[0]
+        local_pipelines = {
+            f'{package}.pipelines.{path}': settings.getint(order_setting, order)
+            for enabled, path, order_setting, order in cls.LOCAL_PIPELINES
+            if settings.getbool(enabled, False)
+        }
+        if local_pipelines:
+            settings.set('ITEM_PIPELINES', {**settings.getdict('ITEM_PIPELINES'), **local_pipelines}, priority='spider')
+
     def start_requests(self) -> pd.Request:
         """START REQUEST FUNCTION FOR SCRAPY"""
-        self.error_count = 0
+        self.checkpoint = None
+        self.fingerprints = None
+        # CaseID -> changed fingerprint of a case whose item is still in the pipelines
+        self.pending_fingerprints: Dict[int, bytes] = {}
+        self.archive = None
+        self.range_index = None
+
+        # CASE_REPLAY re-parses the response archive instead of crawling
+        if self.settings.getbool('CASE_REPLAY', False):
+            yield pd.Request('data:,', callback=self.replay_archive, dont_filter=True)
+            return
+
+        self.empty_run = 0
+        self.case_window = None
+        self.retry_case_ids = set()
+        self.frontier_search = None
+        # frontier probe pages, handed to the walk instead of fetching the CaseID again
+        self.probe_responses: Dict[int, Response] = {}
+        # CASE_ID_GAP_TOLERANCE is the longest run of empty CaseIDs expected below
+        # the last live case. A longer run ends the walk.
+        self.gap_tolerance = self.settings.getint('CASE_ID_GAP_TOLERANCE', 20)
+
+        # Explicit CaseIDs are an ad hoc run: every one is fetched, none is checkpointed
+        self.explicit_ids = self.explicit_case_numbers()
+
+        # Resume after the last contiguous CaseID emitted by an earlier run of this walk
+        self.walk_start = self.start_case
+        if self.settings.getbool('CASE_CHECKPOINT_ENABLED', True) and not self.explicit_ids:
+            self.checkpoint = CrawlCheckpoint(
+                state_path(self.settings, 'checkpoint.sqlite3'),
+                f'{self.name}:{self.county}:{self.start_case}',
+                self.settings.getint('CASE_CHECKPOINT_BATCH', 100)
+            )
+            if self.checkpoint.low_water is not None and self.checkpoint.low_water > self.start_case:
+                self.walk_start = self.checkpoint.low_water
+                pd.info_log(f'Resuming CaseID walk after checkpoint {self.walk_start}')
+            # CaseIDs an earlier run could not fetch are fetched again first
+            self.retry_case_ids = set(self.checkpoint.failed)
+            if self.retry_case_ids:
+                pd.info_log(f'Retrying {len(self.retry_case_ids)} CaseIDs that failed in an earlier run')
+
+        # Drop docket pages whose content is unchanged since they were last scraped
+        if self.settings.getbool('CASE_FINGERPRINTS_ENABLED', True):
+            self.fingerprints = FingerprintStore(
+                state_path(self.settings, 'fingerprints.sqlite3'),
+                self.settings.getint('CASE_FINGERPRINTS_BATCH', 100)
+            )
+            self.crawler.signals.connect(self.item_scraped, signal=signals.item_scraped)
+            self.crawler.signals.connect(self.item_dropped, signal=signals.item_dropped)
+            self.crawler.signals.connect(self.item_error, signal=signals.item_error)
+
+        # Skip CaseIDs inside non civil blocks, known from earlier crawls or extrapolated
+        # from the block the walk is in
+        if self.settings.getbool('CASE_RANGE_INDEX_ENABLED', True):
+            self.range_index = CaseTypeRangeIndex(
+                state_path(self.settings, 'case_types.sqlite3'),
+                f'{self.name}:{self.county}',
+                min_run=self.settings.getint('CASE_RANGE_MIN_RUN', 10),
+                sample_rate=self.settings.getfloat('CASE_RANGE_SAMPLE_RATE', 0.05),
+                max_skip=self.settings.getint('CASE_RANGE_MAX_SKIP', 100),
+                batch_size=self.settings.getint('CASE_RANGE_INDEX_BATCH', 100)
+            )
+
+        # Keep every new or changed docket page so a parser fix can be replayed over it later
+        if self.settings.getbool('CASE_ARCHIVE_ENABLED', True):
+            self.archive = ResponseArchive(self.archive_dir(), self.settings.getint('CASE_ARCHIVE_BATCH', 100))
+
         yield pd.Request(
             url=self.base_url,
             callback=self.landing_page,
             dont_filter=True,
             meta={
-            'case_number_int_repr':self.start_case, 
+            'case_number_int_repr':self.start_case,
             'initial': True
             }
         )
 
-    @pd.return_soup
-    def landing_page(self, soup: pd.BeautifulSoup) -> Generator[pd.Request, None, None]:
-        """LANDING PAGE REQUEST"""
+    def archive_dir(self) -> str:
+        return self.settings.get('CASE_ARCHIVE_DIR') or state_path(self.settings, 'response_archive')
 
-        
-        if 'An exception has occured: System.IndexOutOfRangeException: There is no row at position 0.' in soup.text and not soup.response.meta.get('initial'):
-            self.error_count += 1
-            if self.error_count > 20:
-                print('failure')
-            
-        self.error_count = 0
-        case_number = soup.response.meta.get('case_number_int_repr')
-  
-        # YIELDS CASE DETAILS REQUEST
-        yield pd.Request(
-            pd.urljoin(self.base_url,
-            f'Docket.aspx?CaseID={case_number+1}'),
-            callback=self.landing_page,
-            meta={
-            'case_number_int_repr': case_number+1, 
-            'initial': False
-            }
+    def case_id_source(self, frontier: Optional[int] = None) -> Iterator[int]:
+        """
+        CaseIDs to enumerate, in ascending order.
+        Explicit integer CaseIDs in `self.case_numbers` are walked if present,
+        otherwise every CaseID after `self.walk_start` up to `frontier` (if known),
+        minus those the range index places in a non civil block (see `range_index_walk`).
+        CaseIDs the checkpoint already holds as completed are skipped, and CaseIDs it
+        holds as failed come first.
+        """
+        if self.explicit_ids:
+            source = iter(self.explicit_ids)
+        else:
+            if frontier is None:
+                source = count(self.walk_start + 1)
+            else:
+                source = takewhile(lambda case_number: case_number <= frontier, count(self.walk_start + 1))
+            if self.range_index is not None:
+                source = self.range_index_walk(source)
+
+        completed = self.checkpoint.completed if self.checkpoint else set()
+        return chain(
+            sorted(self.retry_case_ids),
+            (
+                case_number for case_number in source
+                if case_number not in completed and case_number not in self.retry_case_ids
+            )
+        )
+
+    def range_index_walk(self, source: Iterator[int]) -> Iterator[int]:
+        """
+        `source` minus the CaseIDs the range index skips. Skipped CaseIDs that a later
+        observation showed to be outside the non civil block are issued as soon as the
+        window asks for its next CaseID, and unconfirmed ones once `source` runs out.
+        Counted in the case_range_index/* stats.
+        """
+        for case_number in source:
+            yield from self.range_index_backfill()
+            if not self.range_index.should_skip(case_number):
+                yield case_number
+            self.range_index_stats()
+        yield from self.range_index_backfill(final=True)
+
+    def range_index_backfill(self, final: bool = False) -> Iterator[int]:
+        backfill = self.range_index.take_backfill(final)
+        if backfill:
+            self.range_index_stats()
+        return iter(backfill)
+
+    def range_index_stats(self) -> None:
+        self.crawler.stats.set_value('case_range_index/skipped', self.range_index.skipped)
+        self.crawler.stats.set_value('case_range_index/sampled', self.range_index.sampled)
+        self.crawler.stats.set_value('case_range_index/backfilled', self.range_index.backfilled)
+
+    def explicit_case_numbers(self) -> list:
+        """The integer CaseIDs in `self.case_numbers`, sorted; anything else is logged and left out"""
+        case_numbers = [str(case_number).strip() for case_number in (getattr(self, 'case_numbers', None) or [])]
+        ignored = [case_number for case_number in case_numbers if not case_number.isdigit()]
+        if ignored:
+            pd.info_log(f'Ignoring {len(ignored)} case_numbers that are not integer CaseIDs: {", ".join(ignored[:10])}')
+        return sorted({int(case_number) for case_number in case_numbers if case_number.isdigit()})
+
+    def start_walk(self, frontier: Optional[int] = None) -> Generator[pd.Request, None, None]:
+        """Opens the CaseID window and yields the first CASE DETAILS REQUESTS"""
+
+        # CASE_ID_WINDOW is the number of Docket.aspx requests kept in flight.
+        # 1 keeps the original one-at-a-time walk.
+        self.case_window = CaseIDWindow(
+            self.case_id_source(frontier),
+            self.settings.getint('CASE_ID_WINDOW', 1),
+            failed=self.retry_case_ids
         )
+        yield from self.next_case_requests()
+
+    def next_case_requests(self) -> Generator[pd.Request, None, None]:
+        """Yields a CASE DETAILS REQUEST for every free slot in the CaseID window"""
+
+        for case_number in self.case_window.fill():
+            probe = self.probe_responses.pop(case_number, None)
+            if probe is not None:
+                # the frontier probe already fetched this CaseID
+                self.crawler.stats.inc_value('case_frontier/probes_reused')
+                yield from self.landing_page(probe)
+                continue
+            yield pd.Request(
+                pd.urljoin(self.base_url,
+                f'Docket.aspx?CaseID={case_number}'),
+                callback=self.landing_page,
+                errback=self.case_failed,
+                # frontier probes that failed may already have fetched this CaseID
+                dont_filter=True,
+                meta={
+                'case_number_int_repr': case_number,
+                'initial': False
+                }
+            )
+
+    def complete_case(self, case_number: int, empty: Optional[bool]) -> None:
+        """
+        Frees the window slot of a CaseID and ends the walk after `gap_tolerance`
+        consecutive empty CaseIDs (explicit CaseIDs are all fetched). `empty` is None when
+        the page could not be fetched; such CaseIDs stay in the checkpoint's failed set and
+        are retried by the next run. The checkpoint resumes after the last CaseID that was
+        not empty, so empty CaseIDs at the end of the walk are fetched again next time.
+        """
+        released = self.case_window.complete(case_number, empty, failed=empty is None, empty=bool(empty))
+        for released_id, released_empty in released:
+            # retried CaseIDs are not consecutive, they say nothing about the gap
+            if released_empty is None or released_id in self.retry_case_ids:
+                continue
+            self.empty_run = self.empty_run + 1 if released_empty else 0
+
+        if self.checkpoint:
+            self.checkpoint.update(
+                self.case_window.resume_after, self.case_window.kept_ahead, self.case_window.failed
+            )
+
+        if self.empty_run >= self.gap_tolerance and not self.case_window.stopped and not self.explicit_ids:
+            pd.info_log(f'{self.empty_run} consecutive empty CaseIDs up to {case_number}, ending the CaseID walk')
+            self.case_window.stop()
+
+    def case_unchanged(self, response: Response) -> bool:
+        """
+        True if the docket page has the same fingerprint as when it was last scraped.
+        The fingerprint is read from the raw body, so no tree is built for it.
+        A changed fingerprint is kept in response.meta['case_fingerprint'] and in
+        `pending_fingerprints`, and stored by item_scraped once the case has passed every
+        pipeline.
+        """
+        if self.fingerprints is None:
+            return False
+        with stage_timer('fingerprint'):
+            fingerprint = case_fingerprint(response.body)
+            unchanged = self.fingerprints.unchanged(response.meta['case_number_int_repr'], fingerprint)
+        self.crawler.stats.inc_value('case_fingerprint/hit' if unchanged else 'case_fingerprint/miss')
+        if not unchanged:
+            response.meta['case_fingerprint'] = fingerprint
+            self.pending_fingerprints[response.meta['case_number_int_repr']] = fingerprint
+        return unchanged
+
+    def item_scraped(self, item, response, spider) -> None:
+        """
+        Stores the fingerprint of a docket page once its item went through every pipeline.
+        It is looked up by the item's CaseID: an item built from a reused frontier probe
+        comes with the response of the callback that yielded it, or with a Failure.
+        """
+        fingerprint = self.pending_fingerprints.pop(item['case_number'], None)
+        if fingerprint is not None:
+            self.fingerprints.store(item['case_number'], fingerprint)
 
-        if not soup.response.meta.get('initial'):
-        
-            yield pd.CaseItem(
-                case_number=soup.response.meta['case_number_int_repr'],
-                soup=soup,
-                link=soup.response.url,
+    def item_dropped(self, item, response, exception, spider) -> None:
+        """A dropped case keeps its old fingerprint"""
+        self.pending_fingerprints.pop(item['case_number'], None)
+
+    def item_error(self, item, response, spider, failure) -> None:
+        """A case a pipeline failed on keeps its old fingerprint and is scraped again next time"""
+        self.pending_fingerprints.pop(item['case_number'], None)
+
+    def not_civil(self, response: Response) -> bool:
+        """
+        True if the raw page is a non civil case, read from the "lblCaseNumber" label without
+        building a tree. Such pages are dropped before the soup, the fingerprint, the
+        archive and parse_case_data. Pages without a readable label are kept.
+        The case type prefix is recorded in the range index on the way.
+        """
+        prefilter = self.settings.getbool('CASE_PREFILTER_ENABLED', True)
+        if not prefilter and self.range_index is None:
+            return False
+        case_number = case_number_from_bytes(response.body)
+        if case_number is None:
+            return False
+        if self.range_index is not None:
+            self.range_index.record(response.meta['case_number_int_repr'], case_type_prefix(case_number))
+        if not prefilter or is_civil_case_number(case_number):
+            return False
+        self.crawler.stats.inc_value('case_prefilter/not_civil')
+        count_event('non_civil_ignored')
+        return True
+
+    def case_failed(self, failure) -> Generator[pd.Request, None, None]:
+        """Frees the window slot of a CASE DETAILS REQUEST that failed to download"""
+
+        # the PageClassifier fetches the CaseID again after a backoff
+        if failure.check(RetryScheduled):
+            return
+        self.complete_case(failure.request.meta['case_number_int_repr'], None)
+        yield from self.next_case_requests()
+
+    def next_frontier_probes(self) -> Generator[pd.Request, None, None]:
+        """Yields FRONTIER PROBE REQUESTS until the highest live CaseID is known, then starts the walk"""
+
+        for case_number in self.frontier_search.next_probes():
+            yield pd.Request(
+                pd.urljoin(self.base_url,
+                f'Docket.aspx?CaseID={case_number}'),
+                callback=self.frontier_page,
+                errback=self.frontier_failed,
+                dont_filter=True,
+                meta={
+                'case_number_int_repr': case_number,
+                'initial': False
+                }
+            )
+
+        if self.frontier_search.done and self.case_window is None:
+            frontier = self.frontier_search.frontier
+            pd.info_log(f'Highest live CaseID is {frontier}')
+            self.probe_responses = {
+                case_number: probe for case_number, probe in self.probe_responses.items() if case_number <= frontier
+            }
+            yield from self.start_walk(frontier)
+
+    def frontier_page(self, response: Response) -> Generator[pd.Request, None, None]:
+        """FRONTIER PROBE REQUEST"""
+
+        # like a failed probe, anything but an empty CaseID page counts as live
+        page_class = response.meta.get('page_class') or classify_page(response.status, response.body)
+        live = page_class != PAGE_EMPTY
+        if page_class not in TRANSIENT_PAGE_CLASSES:
+            self.probe_responses[response.meta['case_number_int_repr']] = response
+        self.frontier_search.record(response.meta['case_number_int_repr'], live)
+        yield from self.next_frontier_probes()
+
+    def frontier_failed(self, failure) -> Generator[pd.Request, None, None]:
+        """A probe that could not be fetched counts as live so the walk is never cut short"""
+
+        if failure.check(RetryScheduled):
+            return
+        self.frontier_search.record(failure.request.meta['case_number_int_repr'], True)
+        yield from self.next_frontier_probes()
+
+    @pd.return_soup
+    def response_soup(self, soup: pd.BeautifulSoup) -> pd.BeautifulSoup:
+        """Builds the pd soup of a response, with `soup.response` attached"""
+        return soup
+
+    def case_item(self, response: Response) -> Optional[pd.CaseItem]:
+        """
+        CaseItem for a docket page, None if the page is unchanged since the last crawl.
+
+        CASE_ITEM_MODE 'soup' attaches the pd soup as before. 'compact' attaches only the
+        raw body and its encoding. A HTML_PARSER_BACKEND other than 'bs4' parses the raw
+        body, so no soup is built for it and the item is compact in either mode.
+        """
+        case_number = response.meta['case_number_int_repr']
+        if self.case_unchanged(response):
+            return None
+
+        compact = (
+            self.settings.get('CASE_ITEM_MODE', 'soup') == 'compact'
+            or self.settings.get('HTML_PARSER_BACKEND', 'bs4') != 'bs4'
+        )
+        if compact:
+            self.crawler.stats.max_value('case_item/body_bytes_max', len(response.body))
+            return CompactCaseItem(
+                case_number=case_number,
+                soup=None,
+                body=response.body,
+                encoding=response.encoding,
+                link=response.url,
                 county=self.county
             )
+
+        with stage_timer('soup'):
+            soup = self.response_soup(response)
+        return pd.CaseItem(
+            case_number=case_number,
+            soup=soup,
+            link=response.url,
+            county=self.county
+        )
+
+    def landing_page(self, response: Response) -> Generator[pd.Request, None, None]:
+        """LANDING PAGE REQUEST"""
+
+        case_number = response.meta.get('case_number_int_repr')
+
+        if response.meta.get('initial'):
+            # CASE_ID_FRONTIER_PROBE finds the highest live CaseID before walking
+            if self.settings.getbool('CASE_ID_FRONTIER_PROBE', True) and not self.explicit_ids:
+                self.frontier_search = FrontierSearch(self.walk_start, self.gap_tolerance)
+                yield from self.next_frontier_probes()
+            else:
+                yield from self.start_walk()
+            return
+
+        # Set by the PageClassifier middleware, which already retried error pages
+        page_class = response.meta.get('page_class') or classify_page(response.status, response.body)
+        if page_class in TRANSIENT_PAGE_CLASSES:
+            # a server error is not an empty CaseID: free the slot without extending the gap
+            self.crawler.stats.inc_value(f'case_pages/{page_class}')
+            self.complete_case(case_number, None)
+            yield from self.next_case_requests()
+            return
+
+        empty = page_class == PAGE_EMPTY
+        if empty and self.range_index is not None:
+            self.range_index.record_empty(case_number)
+        if not empty and not self.not_civil(response):
+            item = self.case_item(response)
+            if item is not None:
+                if self.archive is not None:
+                    self.archive_response(response)
+                yield item
+        self.complete_case(case_number, empty)
+
+        # YIELDS CASE DETAILS REQUESTS
+        yield from self.next_case_requests()
+
+    def archive_response(self, response: Response) -> None:
+        """
+        Archives a new or changed docket page. Unchanged pages never get here when
+        fingerprints are enabled; the archive also skips a page identical to the
+        latest one archived for its CaseID, e.g. after the previous delivery failed.
+        """
+        fingerprint = response.meta.get('case_fingerprint') or case_fingerprint(response.body)
+        archived = self.archive.append(
+            response.meta['case_number_int_repr'], response.url, response.body, response.encoding, fingerprint
+        )
+        self.crawler.stats.inc_value('case_archive/archived' if archived else 'case_archive/duplicate')
+
+    async def replay_archive(self, response: Response) -> AsyncGenerator[CompactCaseItem, None]:
+        """
+        REPLAY REQUEST: parses the latest archived page of every CaseID (or of the integer
+        CaseIDs in `self.case_numbers`) with parse_case_data on CASE_REPLAY_WORKERS
+        processes, and yields CaseItems that carry the finished PackedCase as the
+        workers finish them. The reactor never waits on the pool. The stage timings each
+        worker returns are merged into STAGE_TIMINGS.
+        """
+        from twisted.internet import reactor
+        # parse.py imports this module
+        from .parse import parse_archived_response
+
+        archive = ResponseArchive(self.archive_dir())
+        case_ids = {
+            int(case_number) for case_number in (getattr(self, 'case_numbers', None) or [])
+            if str(case_number).isdigit()
+        } or None
+        backend = self.settings.get('HTML_PARSER_BACKEND', 'bs4')
+        workers = self.settings.getint('CASE_REPLAY_WORKERS', 0) or os.cpu_count()
+        batch_size = max(1, self.settings.getint('CASE_REPLAY_BATCH', 1000))
+        pd.info_log(f'Replaying {len(archive)} archived CaseIDs on {workers} processes')
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=reset_stage_timings) as executor:
+                archived_responses = archive.responses(case_ids)
+                # batches bound the parsed cases held in memory at once
+                while True:
+                    batch = list(islice(archived_responses, batch_size))
+                    if not batch:
+                        break
+                    # workers hand their results to the reactor thread through the queue
+                    finished = defer.DeferredQueue()
+                    for archived in batch:
+                        future = executor.submit(parse_archived_response, archived, self.county, backend)
+                        future.add_done_callback(
+                            lambda done, archived=archived: reactor.callFromThread(finished.put, (archived, done))
+                        )
+                    for _ in batch:
+                        archived, done = await maybe_deferred_to_future(finished.get())
+                        case_number, packed_case, error, timings = done.result()
+                        STAGE_TIMINGS.merge(*timings)
+                        item = self.replayed_item(archived, case_number, packed_case, error)
+                        if item is not None:
+                            yield item
+        finally:
+            archive.close()
+
+    def replayed_item(self, archived: ArchivedResponse, case_number: int, packed_case,
+                      error: Optional[str]) -> Optional[CompactCaseItem]:
+        """CaseItem for the result of parse_archived_response, None if there is no case to send"""
+        if error:
+            self.crawler.stats.inc_value('case_replay/failed')
+            self.logger.warning(f'Replay of CaseID {case_number} failed: {error}')
+            return None
+        if packed_case is None:
+            self.crawler.stats.inc_value('case_replay/not_civil')
+            return None
+        self.crawler.stats.inc_value('case_replay/parsed')
+        return CompactCaseItem(
+            case_number=case_number,
+            soup=None,
+            body=None,
+            encoding=archived.encoding,
+            link=archived.url,
+            county=self.county,
+            packed_case=packed_case
+        )
+
+    def closed(self, reason: str) -> None:
+        """Flushes the crawl checkpoint and fingerprint store when the spider closes"""
+
+        if getattr(self, 'checkpoint', None):
+            self.checkpoint.close()
+        if getattr(self, 'fingerprints', None):
+            self.fingerprints.close()
+        if getattr(self, 'archive', None):
+            self.archive.close()
+        if getattr(self, 'range_index', None):
+            self.range_index.close()
+        parent_closed = getattr(super(), 'closed', None)
+        if parent_closed:
+            parent_closed(reason)
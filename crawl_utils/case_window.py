@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class CaseIDWindow:
+    """
+    Sliding window over an ordered sequence of CaseIDs.
+
+    At most `size` CaseIDs are "open" at any time. A CaseID stays open from the
+    moment it is issued until it and every CaseID issued before it have completed,
+    so completions may arrive in any order while the window only ever slides
+    forward from its lowest open CaseID. `low_water` is the last CaseID of the
+    contiguous completed prefix, which is what a crawl checkpoint records.
+
+    A CaseID completed as failed (its page could not be fetched) still frees its slot,
+    so `low_water` moves past it, but it is kept in `failed` until it completes without
+    failing. A checkpoint must keep `failed` so a later walk retries those CaseIDs.
+    `failed` starts with the CaseIDs an earlier walk left to retry.
+
+    CaseIDs completed as `empty` count towards `low_water` but not towards
+    `resume_after`, the last CaseID of the prefix that was not empty. A checkpoint
+    records `resume_after`, so CaseIDs that were still empty at the end of a walk are
+    fetched again once cases are filed under them.
+    """
+
+    def __init__(self, case_ids: Iterable[int], size: int = 1, failed: Iterable[int] = ()):
+        self.size = max(1, int(size))
+        self.low_water: Optional[int] = None
+        self.resume_after: Optional[int] = None
+        self.stopped = False
+        self.failed: Set[int] = set(failed)
+
+        self._case_ids: Iterator[int] = iter(case_ids)
+        self._open: Deque[int] = deque()
+        self._completed: Dict[int, Any] = {}
+        self._empty: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    @property
+    def pending(self) -> List[int]:
+        """CaseIDs that have been issued but not completed yet."""
+        return [case_id for case_id in self._open if case_id not in self._completed]
+
+    @property
+    def completed_ahead(self) -> List[int]:
+        """CaseIDs that completed out of order above `low_water`."""
+        return sorted(self._completed)
+
+    @property
+    def kept_ahead(self) -> List[int]:
+        """CaseIDs that completed out of order above `low_water` and were not empty."""
+        return sorted(case_id for case_id in self._completed if case_id not in self._empty)
+
+    @property
+    def finished(self) -> bool:
+        """True once nothing is open and no further CaseIDs will be issued."""
+        return not self._open and self.stopped
+
+    def fill(self) -> List[int]:
+        """
+        Issue as many new CaseIDs as the window has room for.
+
+        :return: The newly issued CaseIDs in ascending order.
+        """
+        issued = []
+        while not self.stopped and len(self._open) < self.size:
+            case_id = next(self._case_ids, None)
+            if case_id is None:
+                self.stop()
+                break
+            self._open.append(case_id)
+            issued.append(case_id)
+        return issued
+
+    def stop(self) -> None:
+        """Stop issuing CaseIDs; already open CaseIDs can still complete."""
+        self.stopped = True
+
+    def complete(self, case_id: int, status: Any = None, failed: bool = False,
+                 empty: bool = False) -> List[Tuple[int, Any]]:
+        """
+        Mark a CaseID as completed and slide the window past the contiguous prefix.
+
+        :param case_id: The completed CaseID.
+        :param status: Any value describing the outcome, handed back when the window slides past it.
+        :param failed: True if the CaseID could not be fetched and must be retried later.
+        :param empty: True if the CaseID has no case (yet), see `resume_after`.
+        :return: The (case_id, status) pairs the window slid past, in CaseID order.
+        """
+        if case_id not in self._open:
+            return []
+        self._completed[case_id] = status
+        if empty:
+            self._empty.add(case_id)
+        if failed:
+            self.failed.add(case_id)
+        else:
+            self.failed.discard(case_id)
+
+        released = []
+        while self._open and self._open[0] in self._completed:
+            released_id = self._open.popleft()
+            released.append((released_id, self._completed.pop(released_id)))
+            self.low_water = released_id
+            if released_id in self._empty:
+                self._empty.discard(released_id)
+            else:
+                self.resume_after = released_id
+        return released
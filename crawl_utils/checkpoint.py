@@ -0,0 +1,79 @@
+import json
+import sqlite3
+import time
+from typing import Iterable, Optional, Set
+
+
+class CrawlCheckpoint:
+    """
+    SQLite backed high-water mark of a CaseID walk.
+
+    Stores the last contiguous CaseID emitted (`low_water`), the CaseIDs completed
+    out of order above it and the CaseIDs that failed and must be retried (`failed`,
+    usually below `low_water`), keyed by `crawl_key`. Updates are written in batches of
+    `batch_size`; call `flush` or `close` when the crawl ends.
+    """
+
+    def __init__(self, path: str, crawl_key: str, batch_size: int = 100):
+        self.crawl_key = crawl_key
+        self.batch_size = max(1, int(batch_size))
+        self.low_water: Optional[int] = None
+        self.completed: Set[int] = set()
+        self.failed: Set[int] = set()
+
+        self._pending_updates = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints ('
+            'crawl_key TEXT PRIMARY KEY, low_water INTEGER, completed TEXT, failed TEXT, updated_at REAL)'
+        )
+        try:
+            # checkpoints written before failed CaseIDs were kept
+            self.connection.execute('ALTER TABLE checkpoints ADD COLUMN failed TEXT')
+        except sqlite3.OperationalError:
+            pass
+        row = self.connection.execute(
+            'SELECT low_water, completed, failed FROM checkpoints WHERE crawl_key = ?', (crawl_key,)
+        ).fetchone()
+        if row:
+            self.low_water = row[0]
+            self.completed = set(json.loads(row[1] or '[]'))
+            self.failed = set(json.loads(row[2] or '[]'))
+
+    def update(self, low_water: Optional[int], completed: Iterable[int],
+               failed: Optional[Iterable[int]] = None) -> None:
+        """
+        Record the current state of the walk, flushing once `batch_size` updates are pending.
+
+        :param low_water: The last contiguous CaseID completed, None if none yet. It never
+            moves the checkpoint back, e.g. while failed CaseIDs below it are retried.
+        :param completed: CaseIDs completed above `low_water`.
+        :param failed: Every CaseID still waiting for a retry, None to keep the stored ones.
+        """
+        if low_water is not None and (self.low_water is None or low_water > self.low_water):
+            self.low_water = low_water
+        if failed is not None:
+            self.failed = set(failed)
+        self.completed = {
+            case_id for case_id in self.completed.union(completed)
+            if self.low_water is None or case_id > self.low_water
+        }
+        self._pending_updates += 1
+        if self._pending_updates >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending_updates:
+            return
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO checkpoints (crawl_key, low_water, completed, failed, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self.crawl_key, self.low_water, json.dumps(sorted(self.completed)),
+                 json.dumps(sorted(self.failed)), time.time())
+            )
+        self._pending_updates = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
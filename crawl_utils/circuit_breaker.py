@@ -0,0 +1,51 @@
+BREAKER_CLOSED = 'closed'
+BREAKER_OPEN = 'open'
+BREAKER_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over the outcome of downloads.
+
+    Closed: `threshold` consecutive failures open it. Open: the caller pauses the crawl
+    for `cooldown` seconds, then calls `half_open`; results of downloads that were
+    already in flight are ignored meanwhile. Half open: the next success closes it
+    again, the next failure reopens it with the cooldown doubled (up to `max_cooldown`).
+    A success that closes the breaker resets the cooldown.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 600.0):
+        self.threshold = max(1, int(threshold))
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.cooldown = cooldown
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.trips = 0
+
+    def record(self, ok: bool) -> bool:
+        """
+        :param ok: False for a transient failure, True for any answer from a healthy site.
+        :return: True if this result opened the breaker.
+        """
+        if self.state == BREAKER_OPEN:
+            return False
+        if ok:
+            self.failures = 0
+            if self.state == BREAKER_HALF_OPEN:
+                self.state = BREAKER_CLOSED
+                self.cooldown = self.base_cooldown
+            return False
+
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        elif self.failures < self.threshold:
+            return False
+        self.state = BREAKER_OPEN
+        self.failures = 0
+        self.trips += 1
+        return True
+
+    def half_open(self) -> None:
+        self.state = BREAKER_HALF_OPEN
@@ -0,0 +1,111 @@
+from statistics import median
+from typing import List, Optional
+
+# Delay (seconds) a backoff starts from when the current delay is 0
+BACKOFF_DELAY_STEP = 0.25
+
+
+class ConcurrencyController:
+    """
+    Latency gradient controller for the concurrency and delay of one download slot.
+
+    Responses are observed in windows of `window`. When a window closes its median
+    latency is compared with `baseline`, the lowest window median seen so far, which
+    drifts up by `baseline_drift` per window so it follows a server that got slower for
+    good. Per window:
+
+    - more than `max_error_rate` errors (server error pages, timeouts): 'backoff',
+      concurrency is halved and the delay doubled
+    - median above `tolerance` times the baseline: 'decrease', concurrency drops by a
+      quarter, or the delay grows once concurrency is at `min_concurrency`
+    - otherwise latency is flat: 'relax' halves the delay back towards `min_delay`
+      first, then 'increase' raises concurrency by one, but only if the window was saturated
+      (the slot had as many requests as it allowed); without that the crawl itself is
+      the limit and more concurrency would not be used
+    - 'hold' when none of these apply
+
+    So concurrency climbs one step at a time while latency stays flat and falls
+    multiplicatively once it climbs, which keeps the slot close to the server's
+    throughput knee.
+    """
+
+    def __init__(self, concurrency: int, delay: float = 0.0, min_concurrency: int = 1,
+                 max_concurrency: int = 16, min_delay: float = 0.0, max_delay: float = 30.0,
+                 window: int = 20, tolerance: float = 1.5, max_error_rate: float = 0.05,
+                 baseline_drift: float = 0.05):
+        self.min_concurrency = max(1, int(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+        self.concurrency = min(max(int(concurrency), self.min_concurrency), self.max_concurrency)
+        self.min_delay = max(0.0, min_delay)
+        self.max_delay = max(self.min_delay, max_delay)
+        self.delay = min(max(delay, self.min_delay), self.max_delay)
+        self.window = max(1, int(window))
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.baseline_drift = baseline_drift
+
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+
+        self._latencies: List[float] = []
+        self._observed = 0
+        self._errors = 0
+        self._saturated = False
+
+    def observe(self, latency: Optional[float], error: bool = False, saturated: bool = False) -> Optional[str]:
+        """
+        Record one finished download.
+
+        :param latency: The download latency in seconds, None if it was not measured.
+        :param error: True for a server error page or a failed download.
+        :param saturated: True if the slot was using all of its concurrency.
+        :return: The action taken if this closed a window ('increase', 'relax', 'hold',
+            'decrease' or 'backoff'), otherwise None.
+        """
+        self._observed += 1
+        if error:
+            self._errors += 1
+        elif latency is not None:
+            self._latencies.append(latency)
+        self._saturated = self._saturated or saturated
+        if self._observed < self.window:
+            return None
+        return self.close_window()
+
+    def close_window(self) -> str:
+        self.error_rate = self._errors / self._observed
+        self.latency = median(self._latencies) if self._latencies else None
+
+        if self.error_rate > self.max_error_rate:
+            action = 'backoff'
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self.delay = min(self.max_delay, max(self.delay * 2, BACKOFF_DELAY_STEP))
+        elif self.latency is not None and self.baseline is not None and self.latency > self.baseline * self.tolerance:
+            action = 'decrease'
+            if self.concurrency > self.min_concurrency:
+                self.concurrency = max(self.min_concurrency, self.concurrency * 3 // 4)
+            else:
+                self.delay = min(self.max_delay, max(self.delay * 1.5, BACKOFF_DELAY_STEP))
+        elif self.delay > self.min_delay:
+            action = 'relax'
+            # halve it, and drop it entirely once it is negligible
+            self.delay = self.delay / 2 if self.delay >= BACKOFF_DELAY_STEP else self.min_delay
+            self.delay = max(self.delay, self.min_delay)
+        elif self._saturated and self.concurrency < self.max_concurrency:
+            action = 'increase'
+            self.concurrency += 1
+        else:
+            action = 'hold'
+
+        if self.latency is not None:
+            if self.baseline is None:
+                self.baseline = self.latency
+            else:
+                self.baseline = min(self.latency, self.baseline * (1 + self.baseline_drift))
+
+        self._latencies = []
+        self._observed = 0
+        self._errors = 0
+        self._saturated = False
+        return action
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+from typing import Optional
+
+
+class FingerprintStore:
+    """
+    SQLite backed store of the last content fingerprint seen per CaseID.
+
+    `unchanged` only reads; a fingerprint is written with `store` once the case it
+    belongs to has been delivered, so a page that failed to parse or never left the
+    pipeline is still "changed" on the next crawl. Writes are committed in batches of
+    `batch_size`; call `close` when the crawl ends.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.batch_size = max(1, int(batch_size))
+
+        self._pending_writes = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS fingerprints ('
+            'case_id INTEGER PRIMARY KEY, fingerprint TEXT, updated_at REAL)'
+        )
+
+    def get(self, case_id: int) -> Optional[str]:
+        row = self.connection.execute(
+            'SELECT fingerprint FROM fingerprints WHERE case_id = ?', (case_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def unchanged(self, case_id: int, fingerprint: str) -> bool:
+        """
+        :param case_id: The integer CaseID (case_number_int_repr).
+        :param fingerprint: The fingerprint of the current page.
+        :return: True if the stored fingerprint matches, False otherwise.
+        """
+        return self.get(case_id) == fingerprint
+
+    def store(self, case_id: int, fingerprint: str) -> None:
+        """Record the fingerprint of a page whose case has been delivered."""
+        self.connection.execute(
+            'INSERT OR REPLACE INTO fingerprints (case_id, fingerprint, updated_at) VALUES (?, ?, ?)',
+            (case_id, fingerprint, time.time())
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending_writes:
+            self.connection.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
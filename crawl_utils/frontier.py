@@ -0,0 +1,108 @@
+from typing import Dict, List, Optional, Set
+
+
+class FrontierSearch:
+    """
+    Finds the highest live CaseID above a known live CaseID with exponential probing
+    followed by binary search.
+
+    CaseIDs are sparse, so a single empty CaseID says nothing about the end of the data.
+    A probe at CaseID `x` therefore asks whether the block `[x, x + gap)` holds any live
+    CaseID, assuming that no run of `gap` empty CaseIDs occurs below the frontier.
+    Only the first CaseID of a block is fetched when it is live, the rest of the block
+    is fetched only when that first CaseID is empty.
+
+    Usage: fetch every CaseID returned by `next_probes`, report each page with `record`,
+    and repeat until `done`. `frontier` then holds the highest live CaseID found.
+    """
+
+    def __init__(self, start: int, gap: int = 20):
+        self.gap = max(1, int(gap))
+        self.lo = start
+        self.hi: Optional[int] = None
+        self.frontier: Optional[int] = None
+        self.results: Dict[int, bool] = {}
+
+        self._step = self.gap
+        self._block: Optional[int] = None
+        self._in_flight: Set[int] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.frontier is not None
+
+    def record(self, case_id: int, live: bool) -> None:
+        """
+        Report whether a probed CaseID returned a case.
+
+        :param case_id: The probed CaseID.
+        :param live: True if the page held a case, False if it was empty.
+        """
+        self._in_flight.discard(case_id)
+        self.results[case_id] = live
+
+    def next_probes(self) -> List[int]:
+        """
+        Advance the search as far as the recorded results allow.
+
+        :return: CaseIDs that must be fetched before the search can advance further.
+        """
+        while not self.done:
+            if self._block is None:
+                self._block = self._next_block()
+                if self._block is None:
+                    self.frontier = self.lo
+                    break
+
+            verdict = self._evaluate(self._block)
+            if verdict is None:
+                probes = [
+                    case_id for case_id in self._wanted(self._block)
+                    if case_id not in self.results and case_id not in self._in_flight
+                ]
+                self._in_flight.update(probes)
+                return probes
+
+            self._advance(self._block, verdict)
+            self._block = None
+        return []
+
+    def _next_block(self) -> Optional[int]:
+        if self.hi is None:
+            return self.lo + self._step
+        if self.hi - self.lo <= 1:
+            return None
+        return (self.lo + self.hi) // 2
+
+    def _block_ids(self, block: int) -> range:
+        return range(block, block + self.gap)
+
+    def _wanted(self, block: int) -> List[int]:
+        if block not in self.results:
+            return [block]
+        return list(self._block_ids(block))
+
+    def _evaluate(self, block: int) -> Optional[bool]:
+        if block not in self.results:
+            return None
+        outcomes = [self.results.get(case_id) for case_id in self._block_ids(block)]
+        if any(outcomes):
+            return True
+        if all(outcome is False for outcome in outcomes):
+            return False
+        return None
+
+    def _advance(self, block: int, live: bool) -> None:
+        if live:
+            self.lo = max(
+                [self.lo] + [case_id for case_id in self._block_ids(block) if self.results.get(case_id)]
+            )
+            if self.hi is None:
+                self._step *= 2
+            elif self.lo >= self.hi:
+                # a live CaseID beyond a block believed empty: the gap assumption
+                # did not hold there, so go back to probing upwards
+                self.hi = None
+                self._step = self.gap
+        else:
+            self.hi = block
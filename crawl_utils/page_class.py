@@ -0,0 +1,59 @@
+from typing import Optional
+
+from scrapy.exceptions import IgnoreRequest
+
+# Page classes, also stored as request.meta['page_class']
+PAGE_CASE = 'case'
+PAGE_EMPTY = 'empty'
+PAGE_SERVER_ERROR = 'server_error'
+PAGE_THROTTLED = 'throttled'
+PAGE_UNKNOWN = 'unknown'
+
+# Classes worth retrying: the server failed or refused, the CaseID itself says nothing
+TRANSIENT_PAGE_CLASSES = (PAGE_SERVER_ERROR, PAGE_THROTTLED)
+
+# Docket.aspx of a CaseID that does not exist
+EMPTY_CASE_MARKER = 'An exception has occured: System.IndexOutOfRangeException: There is no row at position 0.'
+# Any other exception Docket.aspx reports in its error label (the site's spelling)
+EXCEPTION_MARKER = b'An exception has occured'
+# The ASP.NET "yellow screen" of an unhandled error
+SERVER_ERROR_MARKER = b"Server Error in '/' Application"
+# IIS / ASP.NET pages of a full request queue or rate limit
+THROTTLE_MARKERS = (b'Server Too Busy', b'The service is unavailable', b'Too Many Requests')
+THROTTLE_STATUSES = (429, 503)
+CASE_MARKER = b'lblCaseNumber'
+
+
+class RetryScheduled(IgnoreRequest):
+    """
+    Fails a request whose transient page will be fetched again after a backoff.
+    The retry is a new request with the same callbacks, so an errback receiving
+    this must not treat the request as finished.
+    """
+
+
+def classify_page(status: int, body: Optional[bytes]) -> str:
+    """
+    Classify a Docket.aspx response from its status and raw bytes, without a tree.
+    A page with a case number label is a case, whatever its docket text says; the
+    throttle and error markers are only looked for on pages without one.
+
+    :return: PAGE_THROTTLED for a rate limit or full request queue, PAGE_SERVER_ERROR for
+        a 5xx, an ASP.NET error page or an exception other than the empty CaseID one,
+        PAGE_EMPTY for a CaseID without a case, PAGE_CASE for a page with a case number
+        label and PAGE_UNKNOWN for anything else (e.g. the search page).
+    """
+    body = body or b''
+    if status in THROTTLE_STATUSES:
+        return PAGE_THROTTLED
+    if status >= 500:
+        return PAGE_SERVER_ERROR
+    if CASE_MARKER in body:
+        return PAGE_CASE
+    if any(marker in body for marker in THROTTLE_MARKERS):
+        return PAGE_THROTTLED
+    if SERVER_ERROR_MARKER in body:
+        return PAGE_SERVER_ERROR
+    if EXCEPTION_MARKER in body:
+        return PAGE_EMPTY if EMPTY_CASE_MARKER.encode() in body else PAGE_SERVER_ERROR
+    return PAGE_UNKNOWN
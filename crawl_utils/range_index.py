@@ -0,0 +1,187 @@
+import sqlite3
+import time
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional
+
+
+class CaseTypeRun(NamedTuple):
+    """CaseIDs `start` to `end` (inclusive) where every observed case had the same type prefix."""
+    start: int
+    end: int
+    case_type: str
+    observations: int
+
+
+class CaseTypeRangeIndex:
+    """
+    SQLite backed index of the case type prefix ('CV', 'CR', 'TR', ...) observed per CaseID,
+    read back as runs of consecutive observed CaseIDs sharing a prefix.
+
+    Case numbers are allocated in blocks, so a CaseID inside a long non civil run is almost
+    certainly non civil too. `should_skip` says so for CaseIDs inside runs of at least
+    `min_run` observations from earlier crawls. The walk past the last observed CaseID is
+    covered by extrapolation: once the block the walk is in (the latest run of same type
+    observations) is such a run, up to `max_skip` CaseIDs after its highest observed
+    CaseID are skipped too.
+
+    Every `1 / sample_rate`-th skippable CaseID is fetched anyway as a sample. A sample
+    of the same type confirms the block and extends the extrapolation past it; one of
+    another type stops the skipping right away, and so does an empty CaseID past the
+    block, which may be the end of the filed cases (`record_empty`). Either way the
+    CaseIDs extrapolation skipped since the last confirmation are handed back by
+    `take_backfill`, so a block that turned civil loses no case. A run from earlier
+    crawls that an observation contradicts is not skipped any more and is split on the
+    next crawl.
+    Writes are committed in batches of `batch_size`; call `close` when the crawl ends.
+    """
+
+    def __init__(self, path: str, index_key: str, civil_type: str = 'CV', min_run: int = 10,
+                 sample_rate: float = 0.05, max_skip: int = 100, batch_size: int = 100):
+        self.index_key = index_key
+        self.civil_type = civil_type
+        self.min_run = max(1, int(min_run))
+        self.sample_every = round(1 / sample_rate) if sample_rate > 0 else 0
+        self.max_skip = max(0, int(max_skip))
+        self.batch_size = max(1, int(batch_size))
+        self.skipped = 0
+        self.sampled = 0
+        self.backfilled = 0
+
+        self._pending_writes = 0
+        self._skippable = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS case_types ('
+            'index_key TEXT, case_id INTEGER, case_type TEXT, observed_at REAL, '
+            'PRIMARY KEY (index_key, case_id))'
+        )
+        self.runs = self.load_runs()
+        self._run_starts = [run.start for run in self.runs]
+        self._broken_runs = set()
+
+        # the block the walk is in: the latest run of same type observations, seeded
+        # with the last run of earlier crawls
+        self.block: Optional[CaseTypeRun] = self.runs[-1] if self.runs else None
+        # CaseIDs skipped past `block.end` that no observation confirmed yet
+        self._extrapolated: List[int] = []
+        self._backfill: List[int] = []
+
+    def load_runs(self) -> List[CaseTypeRun]:
+        runs = []
+        rows = self.connection.execute(
+            'SELECT case_id, case_type FROM case_types WHERE index_key = ? ORDER BY case_id',
+            (self.index_key,)
+        )
+        for case_id, case_type in rows:
+            if runs and runs[-1].case_type == case_type:
+                runs[-1] = runs[-1]._replace(end=case_id, observations=runs[-1].observations + 1)
+            else:
+                runs.append(CaseTypeRun(case_id, case_id, case_type, 1))
+        return runs
+
+    def run_of(self, case_id: int) -> Optional[int]:
+        """Position in `runs` of the run spanning `case_id`, None if it lies outside every run."""
+        position = bisect_right(self._run_starts, case_id) - 1
+        if position >= 0 and case_id <= self.runs[position].end:
+            return position
+        return None
+
+    def should_skip(self, case_id: int) -> bool:
+        """
+        :param case_id: A CaseID about to be fetched.
+        :return: True if it lies in a known or extrapolated non civil block and was not
+            picked as a sample.
+        """
+        position = self.run_of(case_id)
+        if position is not None:
+            run = self.runs[position]
+            if position in self._broken_runs or not self.skips(run):
+                return False
+            return not self.sample()
+
+        block = self.block
+        if block is None or not self.skips(block) or not block.end < case_id <= block.end + self.max_skip:
+            return False
+        if self.sample():
+            return False
+        self._extrapolated.append(case_id)
+        return True
+
+    def skips(self, run: CaseTypeRun) -> bool:
+        """True if CaseIDs in `run` may be skipped: a non civil run of at least `min_run` observations."""
+        return run.case_type != self.civil_type and run.observations >= self.min_run
+
+    def sample(self) -> bool:
+        """Counts a skippable CaseID; True if it is fetched anyway as a sample."""
+        self._skippable += 1
+        if self.sample_every and self._skippable % self.sample_every == 0:
+            self.sampled += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, case_id: int, case_type: str) -> None:
+        """
+        Store the case type prefix seen on a fetched page.
+
+        :param case_id: The integer CaseID (case_number_int_repr).
+        :param case_type: The prefix from `case_type_prefix`.
+        """
+        position = self.run_of(case_id)
+        if position is not None and self.runs[position].case_type != case_type:
+            self._broken_runs.add(position)
+        self.extend_block(case_id, case_type)
+
+        self.connection.execute(
+            'INSERT OR REPLACE INTO case_types (index_key, case_id, case_type, observed_at) VALUES (?, ?, ?, ?)',
+            (self.index_key, case_id, case_type, time.time())
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.flush()
+
+    def extend_block(self, case_id: int, case_type: str) -> None:
+        """Confirms or ends the current block with an observation"""
+        block = self.block
+        if block is not None and block.case_type == case_type:
+            if case_id > block.end:
+                self._extrapolated = [skipped for skipped in self._extrapolated if skipped > case_id]
+            self.block = block._replace(end=max(block.end, case_id), observations=block.observations + 1)
+            return
+        # another type: CaseIDs skipped on the strength of the old block are fetched after all
+        self._backfill.extend(self._extrapolated)
+        self._extrapolated = []
+        self.block = CaseTypeRun(case_id, case_id, case_type, 1)
+
+    def record_empty(self, case_id: int) -> None:
+        """
+        An empty CaseID past the current block may be the end of the filed cases, where
+        nothing confirms the block any more: extrapolation stops, and the CaseIDs it
+        skipped are handed back.
+        """
+        if self.block is not None and case_id > self.block.end:
+            self._backfill.extend(self._extrapolated)
+            self._extrapolated = []
+            self.block = None
+
+    def take_backfill(self, final: bool = False) -> List[int]:
+        """
+        :param final: True once the walk has no further CaseIDs: unconfirmed skips are
+            handed back as well, since nothing will confirm them any more.
+        :return: Skipped CaseIDs to fetch after all, in ascending order.
+        """
+        backfill, self._backfill = self._backfill, []
+        if final:
+            backfill.extend(self._extrapolated)
+            self._extrapolated = []
+        self.backfilled += len(backfill)
+        return sorted(backfill)
+
+    def flush(self) -> None:
+        if self._pending_writes:
+            self.connection.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import time
+import zlib
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+ARCHIVE_DATA_FILE = 'responses.dat'
+ARCHIVE_INDEX_FILE = 'index.sqlite3'
+
+
+class ArchivedResponse(NamedTuple):
+    """Location of one archived response body; `read_body` turns it back into bytes."""
+    case_id: int
+    url: str
+    encoding: Optional[str]
+    data_path: str
+    offset: int
+    length: int
+    fetched_at: float
+
+
+def read_body(archived: ArchivedResponse) -> bytes:
+    """
+    Read and decompress an archived body. Opens the data file itself, so it can run in
+    a worker process that only received the ArchivedResponse.
+    """
+    with open(archived.data_path, 'rb') as file:
+        file.seek(archived.offset)
+        return zlib.decompress(file.read(archived.length))
+
+
+class ResponseArchive:
+    """
+    Append-only archive of Docket.aspx response bodies, indexed by CaseID.
+
+    Bodies are zlib compressed and appended to `responses.dat`; `index.sqlite3` maps
+    every stored response to its CaseID, URL, encoding, byte range and content
+    fingerprint. Nothing is ever rewritten, so a CaseID fetched again gets a new record
+    and `responses` returns the latest one, unless its fingerprint equals that of the
+    latest record, in which case nothing is stored. Index rows are committed in batches of `batch_size` after the data file
+    is flushed; a crash can leave unindexed bytes at the end of the data file, never an
+    index row pointing at missing data. Call `close` when the crawl ends.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 100, compression_level: int = 6):
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, ARCHIVE_DATA_FILE)
+        self.batch_size = max(1, int(batch_size))
+        self.compression_level = compression_level
+
+        self._pending_writes = 0
+        self._data_file = None
+        self.connection = sqlite3.connect(os.path.join(directory, ARCHIVE_INDEX_FILE))
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'id INTEGER PRIMARY KEY, case_id INTEGER, url TEXT, encoding TEXT, '
+            'offset INTEGER, length INTEGER, fetched_at REAL, fingerprint TEXT)'
+        )
+        try:
+            # archives written before responses were deduplicated
+            self.connection.execute('ALTER TABLE responses ADD COLUMN fingerprint TEXT')
+        except sqlite3.OperationalError:
+            pass
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS responses_case_id ON responses (case_id, id)'
+        )
+
+    def append(self, case_id: int, url: str, body: bytes, encoding: Optional[str] = None,
+               fingerprint: Optional[str] = None) -> bool:
+        """
+        Archive one response body.
+
+        :param case_id: The integer CaseID (case_number_int_repr).
+        :param url: The URL the body was fetched from.
+        :param body: The raw response body.
+        :param encoding: The response encoding.
+        :param fingerprint: The page's content fingerprint, None to archive it unconditionally.
+        :return: False if the CaseID's latest archived response has the same fingerprint
+            and nothing was stored, True otherwise.
+        """
+        if fingerprint is not None and fingerprint == self.latest_fingerprint(case_id):
+            return False
+        if self._data_file is None:
+            self._data_file = open(self.data_path, 'ab')
+        data = zlib.compress(body, self.compression_level)
+        offset = self._data_file.tell()
+        self._data_file.write(data)
+        self.connection.execute(
+            'INSERT INTO responses (case_id, url, encoding, offset, length, fetched_at, fingerprint) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (case_id, url, encoding, offset, len(data), time.time(), fingerprint)
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.flush()
+        return True
+
+    def latest_fingerprint(self, case_id: int) -> Optional[str]:
+        """Fingerprint of the latest archived response of a CaseID, None if there is none."""
+        row = self.connection.execute(
+            'SELECT fingerprint FROM responses WHERE case_id = ? ORDER BY id DESC LIMIT 1', (case_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def responses(self, case_ids: Optional[Iterable[int]] = None) -> Iterator[ArchivedResponse]:
+        """
+        The latest archived response of every CaseID, in CaseID order.
+
+        :param case_ids: Only these CaseIDs, all archived CaseIDs if None.
+        """
+        self.flush()
+        wanted = set(case_ids) if case_ids is not None else None
+        rows = self.connection.execute(
+            'SELECT case_id, url, encoding, offset, length, fetched_at FROM responses '
+            'WHERE id IN (SELECT MAX(id) FROM responses GROUP BY case_id) ORDER BY case_id'
+        )
+        for case_id, url, encoding, offset, length, fetched_at in rows:
+            if wanted is None or case_id in wanted:
+                yield ArchivedResponse(case_id, url, encoding, self.data_path, offset, length, fetched_at)
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(DISTINCT case_id) FROM responses').fetchone()[0]
+
+    def flush(self) -> None:
+        if not self._pending_writes:
+            return
+        self._data_file.flush()
+        os.fsync(self._data_file.fileno())
+        self.connection.commit()
+        self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._data_file is not None:
+            self._data_file.close()
+        self.connection.close()
@@ -0,0 +1,14 @@
+import os
+
+
+def state_path(settings, filename: str) -> str:
+    """
+    Path of a local crawl state file inside the CRAWL_STATE_DIR setting ('crawl_state' by default).
+
+    :param settings: The crawler settings.
+    :param filename: Name of the state file.
+    :return: The path, with its directory created.
+    """
+    directory = settings.get('CRAWL_STATE_DIR', 'crawl_state')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
@@ -1,3 +0,0 @@
-
-class MyExtension(object):
-    pass
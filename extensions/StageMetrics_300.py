@@ -0,0 +1,132 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from ..crawl_utils.state import state_path
+from ..parse_utils.stage_timing import STAGE_TIMINGS, StageHistogram, bucket_label
+
+logger = logging.getLogger(__name__)
+
+
+class StageMetrics:
+    """
+    Latency histograms per crawl stage and throughput counters, in the Scrapy stats and
+    in a local JSON lines metrics file.
+
+    Stages: 'download' (the download_latency Scrapy measured), 'soup' (tree construction),
+    'fingerprint', 'parse/1_case_related_data' ... 'parse/8_packed_case' (the steps of
+    parse_case_data), 'address_check' (the zips.txt check in lookup_defendant) and 'melissa_lookup'
+    (uncached Personator lookups). Each stage gets
+    stage_timing/<stage>/count, /total_ms, /max_ms, /p50_ms, /p95_ms and one
+    /le_<bound>ms counter per histogram bucket.
+
+    Throughput goes to case_throughput/*: cases_parsed, docket_entries, non_civil_ignored,
+    melissa_cache_hits, melissa_calls_avoided, addresses_verified_locally,
+    addresses_need_lookup, addresses_not_searchable, cases_per_min and dockets_per_case.
+
+    Settings:
+        STAGE_METRICS_ENABLED (True)
+        STAGE_METRICS_INTERVAL (60) seconds between metrics file lines, 0 only writes on close
+        STAGE_METRICS_FILE ('metrics.jsonl' in CRAWL_STATE_DIR)
+    """
+
+    def __init__(self, crawler, interval: float, path: str):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = interval
+        self.path = path
+        self.histograms: Dict[str, StageHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('STAGE_METRICS_ENABLED', True):
+            raise NotConfigured
+        extension = cls(
+            crawler,
+            crawler.settings.getfloat('STAGE_METRICS_INTERVAL', 60),
+            crawler.settings.get('STAGE_METRICS_FILE') or state_path(crawler.settings, 'metrics.jsonl')
+        )
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        return extension
+
+    def spider_opened(self, spider) -> None:
+        self.started = time.monotonic()
+        # drop anything recorded before this crawl, e.g. by an earlier crawl in the process
+        STAGE_TIMINGS.drain()
+        if self.interval > 0:
+            self.task = task.LoopingCall(self.dump, spider)
+            self.task.start(self.interval, now=False)
+
+    def response_received(self, response, request, spider) -> None:
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            STAGE_TIMINGS.record('download', latency)
+
+    def collect(self) -> None:
+        """Moves everything recorded since the last call into the stats."""
+        histograms, counters = STAGE_TIMINGS.drain()
+
+        for stage, drained in histograms.items():
+            prefix = f'stage_timing/{stage}'
+            self.stats.inc_value(f'{prefix}/count', drained.count)
+            self.stats.inc_value(f'{prefix}/total_ms', round(drained.total_ms, 3))
+            self.stats.max_value(f'{prefix}/max_ms', round(drained.max_ms, 3))
+            for index, bucket in enumerate(drained.buckets):
+                if bucket:
+                    self.stats.inc_value(f'{prefix}/{bucket_label(index)}', bucket)
+
+            histogram = self.histograms.setdefault(stage, StageHistogram())
+            histogram.merge(drained)
+            self.stats.set_value(f'{prefix}/p50_ms', histogram.quantile(0.5))
+            self.stats.set_value(f'{prefix}/p95_ms', histogram.quantile(0.95))
+
+        for counter, value in counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+            self.stats.inc_value(f'case_throughput/{counter}', value)
+
+        cases = self.counters.get('cases_parsed', 0)
+        minutes = (time.monotonic() - self.started) / 60 if self.started else 0
+        if minutes:
+            self.stats.set_value('case_throughput/cases_per_min', round(cases / minutes, 2))
+        if cases:
+            self.stats.set_value(
+                'case_throughput/dockets_per_case', round(self.counters.get('docket_entries', 0) / cases, 2)
+            )
+
+    def dump(self, spider, reason: str = None) -> None:
+        """Collects and appends a snapshot of the cumulative metrics to the metrics file."""
+        self.collect()
+        snapshot = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'spider': spider.name,
+            'elapsed_s': round(time.monotonic() - self.started, 1) if self.started else None,
+            'stages': {stage: histogram.summary() for stage, histogram in sorted(self.histograms.items())},
+            'throughput': {
+                key.split('/', 1)[1]: value
+                for key, value in self.stats.get_stats().items()
+                if key.startswith('case_throughput/')
+            },
+        }
+        if reason is not None:
+            snapshot['finish_reason'] = reason
+        try:
+            with open(self.path, 'a') as file:
+                file.write(json.dumps(snapshot, sort_keys=True) + '\n')
+        except OSError as error:
+            logger.warning(f'Could not write stage metrics to {self.path}: {error}')
+
+    def spider_closed(self, spider, reason) -> None:
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        self.dump(spider, reason)
@@ -0,0 +1,119 @@
+import logging
+from typing import Dict
+
+from scrapy.exceptions import NotConfigured
+
+from ..crawl_utils.concurrency import ConcurrencyController
+from ..crawl_utils.page_class import TRANSIENT_PAGE_CLASSES, classify_page
+
+logger = logging.getLogger(__name__)
+
+
+def format_ms(seconds) -> str:
+    return f'{seconds * 1000:.0f}ms' if seconds is not None else 'n/a'
+
+
+class AdaptiveConcurrency:
+    """
+    Adjusts the concurrency and delay of every download slot (one per domain) from the
+    download latency and the rate of server errors, instead of hand tuned delays.
+
+    Every response and download failure is fed to the slot's ConcurrencyController
+    (crawl_utils/concurrency.py). Server error and throttle pages (see classify_page in
+    crawl_utils/page_class.py) and failed downloads count as errors; the "no row at
+    position 0" page of an empty CaseID is a normal answer. Whenever a window closes the slot gets the
+    controller's concurrency and delay. The file name's 560 places it between
+    HttpCompressionMiddleware (590) and RetryMiddleware (550), so it sees the error
+    responses and exceptions the retry middleware turns into new requests.
+
+    Stats per slot: adaptive_concurrency/<slot>/concurrency, /delay_ms, /latency_ms (median
+    of the last window), /baseline_ms, /error_rate, /max_concurrency, /error_responses,
+    /failed_downloads and one counter per window action (/increase, /relax, /hold,
+    /decrease, /backoff).
+
+    Settings:
+        ADAPTIVE_CONCURRENCY_ENABLED (False)
+        ADAPTIVE_CONCURRENCY_START (CONCURRENT_REQUESTS_PER_DOMAIN)
+        ADAPTIVE_CONCURRENCY_MIN (1), ADAPTIVE_CONCURRENCY_MAX (16)
+        ADAPTIVE_CONCURRENCY_MAX_DELAY (30) seconds, the delay never drops below DOWNLOAD_DELAY
+        ADAPTIVE_CONCURRENCY_WINDOW (20) responses per adjustment
+        ADAPTIVE_CONCURRENCY_TOLERANCE (1.5) latency growth over the baseline that counts as climbing
+        ADAPTIVE_CONCURRENCY_MAX_ERROR_RATE (0.05)
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.start = settings.getint('ADAPTIVE_CONCURRENCY_START', 0) or settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN', 8)
+        self.min_concurrency = settings.getint('ADAPTIVE_CONCURRENCY_MIN', 1)
+        self.max_concurrency = settings.getint('ADAPTIVE_CONCURRENCY_MAX', 16)
+        self.min_delay = settings.getfloat('DOWNLOAD_DELAY', 0)
+        self.max_delay = settings.getfloat('ADAPTIVE_CONCURRENCY_MAX_DELAY', 30)
+        self.window = settings.getint('ADAPTIVE_CONCURRENCY_WINDOW', 20)
+        self.tolerance = settings.getfloat('ADAPTIVE_CONCURRENCY_TOLERANCE', 1.5)
+        self.max_error_rate = settings.getfloat('ADAPTIVE_CONCURRENCY_MAX_ERROR_RATE', 0.05)
+        self.controllers: Dict[str, ConcurrencyController] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_CONCURRENCY_ENABLED', False):
+            raise NotConfigured
+        if settings.getbool('AUTOTHROTTLE_ENABLED', False):
+            logger.warning('AUTOTHROTTLE_ENABLED is set, AdaptiveConcurrency stays off so the two do not fight over the delay')
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_response(self, request, response, spider):
+        error = classify_page(response.status, response.body) in TRANSIENT_PAGE_CLASSES
+        if error:
+            self.stats.inc_value(f'adaptive_concurrency/{request.meta.get("download_slot")}/error_responses')
+        self.observe(request, request.meta.get('download_latency'), error)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self.stats.inc_value(f'adaptive_concurrency/{request.meta.get("download_slot")}/failed_downloads')
+        self.observe(request, None, True)
+
+    def observe(self, request, latency, error: bool) -> None:
+        key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None:
+            return
+        controller = self.controllers.get(key)
+        if controller is None:
+            controller = self.controllers[key] = ConcurrencyController(
+                self.start, slot.delay, self.min_concurrency, self.max_concurrency,
+                self.min_delay, self.max_delay, self.window, self.tolerance, self.max_error_rate
+            )
+            self.apply(key, slot, controller)
+
+        # the downloader may already have taken the finished request out of slot.active
+        in_flight = len(slot.active) + (request not in slot.active)
+        action = controller.observe(latency, error, saturated=in_flight >= slot.concurrency)
+        if action is None:
+            return
+        if (controller.concurrency, controller.delay) != (slot.concurrency, slot.delay):
+            logger.info(
+                f'{key}: {action}, concurrency {slot.concurrency} -> {controller.concurrency}, '
+                f'delay {slot.delay:.2f}s -> {controller.delay:.2f}s (median latency '
+                f'{format_ms(controller.latency)}, baseline {format_ms(controller.baseline)}, '
+                f'errors {controller.error_rate:.0%})'
+            )
+        self.stats.inc_value(f'adaptive_concurrency/{key}/{action}')
+        self.apply(key, slot, controller)
+
+    def apply(self, key: str, slot, controller: ConcurrencyController) -> None:
+        slot.concurrency = controller.concurrency
+        slot.delay = controller.delay
+
+        prefix = f'adaptive_concurrency/{key}'
+        self.stats.set_value(f'{prefix}/concurrency', controller.concurrency)
+        self.stats.max_value(f'{prefix}/max_concurrency', controller.concurrency)
+        self.stats.set_value(f'{prefix}/delay_ms', round(controller.delay * 1000))
+        self.stats.set_value(f'{prefix}/error_rate', round(controller.error_rate, 4))
+        if controller.latency is not None:
+            self.stats.set_value(f'{prefix}/latency_ms', round(controller.latency * 1000, 1))
+        if controller.baseline is not None:
+            self.stats.set_value(f'{prefix}/baseline_ms', round(controller.baseline * 1000, 1))
@@ -1,2 +0,0 @@
-class MyMiddleware:
-  pass
@@ -0,0 +1,160 @@
+import logging
+import random
+from typing import Optional
+
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+
+from ..crawl_utils.circuit_breaker import CircuitBreaker
+from ..crawl_utils.page_class import TRANSIENT_PAGE_CLASSES, RetryScheduled, classify_page
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds asked for by a numeric Retry-After header, None without one."""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class PageClassifier:
+    """
+    Classifies every response from its status and raw bytes (crawl_utils/page_class.py)
+    into a case, an empty CaseID, a transient server error or a throttle page, and stores
+    the class in request.meta['page_class'] for the spider callbacks.
+
+    Server errors and throttle pages are retried after a jittered exponential backoff,
+    at most PAGE_RETRY_TIMES times; after that the request fails with IgnoreRequest, so
+    its errback frees the CaseID without counting it as empty. The backoff never holds
+    a download slot: the request fails with RetryScheduled at once, which errbacks
+    ignore, and a reactor timer hands the retry to the engine when the backoff is over.
+    The spider is kept open while retries are waiting. The retries are counted
+    in request.meta['page_retry_times'], apart from RetryMiddleware's 'retry_times', so
+    neither middleware eats into the other's budget. The file name's 555
+    places it ahead of RetryMiddleware (550), and behind AdaptiveConcurrency (560), which
+    still sees the error pages.
+
+    A CircuitBreaker counts transient failures, including failed downloads. After
+    PAGE_BREAKER_THRESHOLD in a row the engine is paused for PAGE_BREAKER_COOLDOWN
+    seconds, so nothing is sent to a site that is down. Then the crawl resumes and the
+    next result decides: a success closes the breaker, a failure pauses again for twice
+    as long (up to PAGE_BREAKER_MAX_COOLDOWN).
+
+    Stats: page_class/<class>, page_retry/count, page_retry/reason_count/page_class_<class>,
+    page_retry/max_reached,
+    circuit_breaker/opened, circuit_breaker/paused_seconds and circuit_breaker/state.
+
+    Settings:
+        PAGE_CLASSIFIER_ENABLED (True)
+        PAGE_RETRY_TIMES (4)
+        PAGE_RETRY_BACKOFF_BASE (1) seconds before the first retry, doubling per retry
+        PAGE_RETRY_BACKOFF_MAX (60) seconds
+        PAGE_BREAKER_THRESHOLD (5) consecutive transient failures, 0 disables the breaker
+        PAGE_BREAKER_COOLDOWN (30) seconds, PAGE_BREAKER_MAX_COOLDOWN (600)
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.retry_times = settings.getint('PAGE_RETRY_TIMES', 4)
+        self.priority_adjust = settings.getint('RETRY_PRIORITY_ADJUST', -1)
+        self.backoff_base = settings.getfloat('PAGE_RETRY_BACKOFF_BASE', 1)
+        self.backoff_max = settings.getfloat('PAGE_RETRY_BACKOFF_MAX', 60)
+        threshold = settings.getint('PAGE_BREAKER_THRESHOLD', 5)
+        self.breaker = CircuitBreaker(
+            threshold,
+            settings.getfloat('PAGE_BREAKER_COOLDOWN', 30),
+            settings.getfloat('PAGE_BREAKER_MAX_COOLDOWN', 600)
+        ) if threshold > 0 else None
+        self.resume_call = None
+        # reactor timers of retries waiting out their backoff
+        self.waiting_retries = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('PAGE_CLASSIFIER_ENABLED', True):
+            raise NotConfigured
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def backoff(self, retries: int) -> float:
+        """Half of the exponential backoff plus a random part of the other half."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** retries)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def process_response(self, request, response, spider):
+        page_class = classify_page(response.status, response.body)
+        request.meta['page_class'] = page_class
+        self.stats.inc_value(f'page_class/{page_class}')
+        transient = page_class in TRANSIENT_PAGE_CLASSES
+        self.record(not transient)
+        if not transient:
+            return response
+
+        retries = request.meta.get('page_retry_times', 0)
+        if retries >= self.retry_times:
+            self.stats.inc_value('page_retry/max_reached')
+            logger.error(f'Gave up retrying {request} (failed {retries + 1} times): {page_class} page')
+            raise IgnoreRequest(f'{page_class} page from {response.url} after {self.retry_times} retries')
+        retry = request.replace(dont_filter=True, priority=request.priority + self.priority_adjust)
+        retry.meta['page_retry_times'] = retries + 1
+        self.stats.inc_value('page_retry/count')
+        self.stats.inc_value(f'page_retry/reason_count/page_class_{page_class}')
+        logger.debug(f'Retrying {request} (failed {retries + 1} times): {page_class} page')
+
+        delay = max(self.backoff(retries), retry_after(response) or 0)
+        self.schedule_retry(retry, delay)
+        raise RetryScheduled(f'{page_class} page from {response.url}, retrying in {delay:.1f}s')
+
+    def schedule_retry(self, retry, delay: float) -> None:
+        from twisted.internet import reactor
+        self.waiting_retries.add(reactor.callLater(delay, self.send_retry, retry))
+
+    def send_retry(self, retry) -> None:
+        self.waiting_retries = {call for call in self.waiting_retries if call.active()}
+        self.crawler.engine.crawl(retry)
+
+    def spider_idle(self, spider) -> None:
+        if any(call.active() for call in self.waiting_retries):
+            raise DontCloseSpider
+
+    def process_exception(self, request, exception, spider):
+        # retried by RetryMiddleware, only counted here; a dropped request says nothing about the site
+        if isinstance(exception, IgnoreRequest):
+            return
+        self.record(False)
+
+    def record(self, ok: bool) -> None:
+        if self.breaker is None:
+            return
+        opened = self.breaker.record(ok)
+        self.stats.set_value('circuit_breaker/state', self.breaker.state)
+        if not opened:
+            return
+        cooldown = self.breaker.cooldown
+        logger.warning(f'Site looks unhealthy, pausing the crawl for {cooldown:.0f}s (circuit breaker trip {self.breaker.trips})')
+        self.stats.inc_value('circuit_breaker/opened')
+        self.stats.inc_value('circuit_breaker/paused_seconds', cooldown)
+        self.crawler.engine.pause()
+        from twisted.internet import reactor
+        self.resume_call = reactor.callLater(cooldown, self.resume)
+
+    def resume(self) -> None:
+        self.resume_call = None
+        self.breaker.half_open()
+        self.stats.set_value('circuit_breaker/state', self.breaker.state)
+        logger.info('Resuming the crawl, the next response decides whether the site has recovered')
+        self.crawler.engine.unpause()
+
+    def spider_closed(self, spider) -> None:
+        if self.resume_call is not None and self.resume_call.active():
+            self.resume_call.cancel()
+        for call in self.waiting_retries:
+            if call.active():
+                call.cancel()
@@ -0,0 +1,101 @@
+import re
+from typing import NamedTuple, Optional
+
+from .zip_index import county_key, get_zip_index
+
+ZIP_CODE_PATTERN = re.compile(r'(\d{5})(?:-?\d{4})?')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# AddressCheck.reason values; only ADDRESS_IN_COUNTY is verified
+ADDRESS_IN_COUNTY = 'in_county'
+ADDRESS_MISSING = 'no_address'
+ADDRESS_BAD_ZIP = 'bad_zip'
+ADDRESS_UNKNOWN_ZIP = 'unknown_zip'
+ADDRESS_STATE_MISMATCH = 'state_mismatch'
+ADDRESS_OUTSIDE_COUNTY = 'outside_county'
+
+# USPS codes of the states, DC and the territories, by the upper case name dockets spell out
+US_STATE_CODES = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR', 'CALIFORNIA': 'CA',
+    'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE', 'DISTRICT OF COLUMBIA': 'DC',
+    'FLORIDA': 'FL', 'GEORGIA': 'GA', 'HAWAII': 'HI', 'IDAHO': 'ID', 'ILLINOIS': 'IL',
+    'INDIANA': 'IN', 'IOWA': 'IA', 'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA',
+    'MAINE': 'ME', 'MARYLAND': 'MD', 'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN',
+    'MISSISSIPPI': 'MS', 'MISSOURI': 'MO', 'MONTANA': 'MT', 'NEBRASKA': 'NE', 'NEVADA': 'NV',
+    'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ', 'NEW MEXICO': 'NM', 'NEW YORK': 'NY',
+    'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH', 'OKLAHOMA': 'OK', 'OREGON': 'OR',
+    'PENNSYLVANIA': 'PA', 'RHODE ISLAND': 'RI', 'SOUTH CAROLINA': 'SC', 'SOUTH DAKOTA': 'SD',
+    'TENNESSEE': 'TN', 'TEXAS': 'TX', 'UTAH': 'UT', 'VERMONT': 'VT', 'VIRGINIA': 'VA',
+    'WASHINGTON': 'WA', 'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY',
+    'AMERICAN SAMOA': 'AS', 'GUAM': 'GU', 'NORTHERN MARIANA ISLANDS': 'MP', 'PUERTO RICO': 'PR',
+    'VIRGIN ISLANDS': 'VI',
+}
+
+
+class AddressCheck(NamedTuple):
+    """
+    Outcome of checking a defendant's docket address against zips.txt.
+    `address` is the normalized address in the shape of a Personator result
+    (name, street, county, state, zip_code), None unless verified.
+    """
+    verified: bool
+    reason: str
+    address: Optional[dict] = None
+
+
+def normalize_zip(zip_code: Optional[str]) -> Optional[str]:
+    """The five digit ZIP of '44035', '44035-1234' or '440351234', None for anything else."""
+    match = ZIP_CODE_PATTERN.fullmatch((zip_code or '').strip())
+    return match.group(1) if match else None
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Upper case with runs of whitespace collapsed, as the court site prints addresses."""
+    return WHITESPACE_PATTERN.sub(' ', text or '').strip().upper()
+
+
+def normalize_state(state: Optional[str]) -> str:
+    """The USPS code of 'OH', 'Oh.' or 'Ohio'; anything else normalized as text ('' for no state)."""
+    state = normalize_text(state).rstrip('.')
+    return US_STATE_CODES.get(state, state)
+
+
+def check_address(party: dict, county: str) -> AddressCheck:
+    """
+    Verify a defendant's docket address locally: it needs a street and city, a ZIP code
+    listed in zips.txt, the state of that ZIP (when the docket gives one, as a USPS code
+    or spelled out) and the ZIP must belong to `county`. A ZIP that spans counties counts for each of them, as
+    MelissaAPI.verify_against_zips does for Personator results.
+
+    :param party: A defendant dict from parse_plaintiffs_and_defendants.
+    :param county: The county of the case (e.g. 'Lorain').
+    """
+    street = normalize_text(party.get('street'))
+    city = normalize_text(party.get('city'))
+    if not street or not city:
+        return AddressCheck(False, ADDRESS_MISSING)
+
+    zip_code = normalize_zip(party.get('zip_code'))
+    if zip_code is None:
+        return AddressCheck(False, ADDRESS_BAD_ZIP)
+
+    index = get_zip_index()
+    zip_state = index.zip_states.get(zip_code)
+    if zip_state is None:
+        return AddressCheck(False, ADDRESS_UNKNOWN_ZIP)
+    state = normalize_state(party.get('state'))
+    if state and state != zip_state.upper():
+        return AddressCheck(False, ADDRESS_STATE_MISMATCH)
+
+    key = county_key(county, zip_state)
+    if zip_code not in index.zips_of(key):
+        return AddressCheck(False, ADDRESS_OUTSIDE_COUNTY)
+
+    return AddressCheck(True, ADDRESS_IN_COUNTY, {
+        'name': party.get('defendant'),
+        'street': street,
+        'county': key[:-len(zip_state) - 1],
+        'state': zip_state.upper(),
+        'zip_code': zip_code,
+    })
+
@@ -1,3 +1,4 @@
+import functools
 import re
 from dataclasses import dataclass
 
@@ -33,6 +34,73 @@ HEARING_DATE_PATTERN = re.compile(r'(?i)(set for|continued to)')
 # Add bankruptcy_pattern to search for the word "bankruptcy" in the description
 BANKRUPTCY_PATTERN = re.compile(r'\bbankruptcy\b', re.IGNORECASE)
 
+# Regular expression pattern to match dollar amounts with optional decimal point
+AMOUNT_PATTERN = re.compile(r'\$\d+(?:\.\d{1,2})?')
+
+# Single pass keyword scanner for the DocketProcessor rules. Every group holds a literal
+# that any match of the rule's own pattern must contain, so a rule whose group never
+# matches can be skipped. The lookahead reports overlapping keywords too.
+DOCKET_RULE_KEYWORDS_PATTERN = re.compile(
+    r'(?=(?P<bankruptcy>bankruptcy)'
+    r'|(?P<hearing_date>set for|continued to)'
+    r'|(?P<serve_status>signed receipt|process server)'
+    r'|(?P<judgment>judg)'
+    r'|(?P<garnishment>garnishment|personal earnings)'
+    r'|(?P<dismissed>dismissed))',
+    re.IGNORECASE
+)
+
+# Header labels of a docket page that feed the parsed case data
+CASE_HEADER_LABELS = (
+    'lblCaseNumber', 'lblDescription', 'lblDateFiled', 'lblCaption', 'lblJudgeName'
+)
+# Tables of a docket page that feed the parsed case data
+CASE_DATA_TABLES = ('dgrdResults', 'dgrdParties')
+
+
+def _element_pattern(element_id: str):
+    """The start tag of the element with the given id in a raw Docket.aspx page, matched on bytes"""
+    return re.compile(
+        rb'<(?P<tag>[a-z][a-z0-9]*)\b[^>]*?\sid\s*=\s*(?P<quote>["\']?)' + re.escape(element_id.encode())
+        + rb'(?P=quote)(?=[\s/>])[^>]*>',
+        re.IGNORECASE
+    )
+
+
+# Byte patterns of the start tags of the header labels and data tables, by element id
+ELEMENT_PATTERNS = {
+    element_id: _element_pattern(element_id) for element_id in CASE_HEADER_LABELS + CASE_DATA_TABLES
+}
+CASE_NUMBER_LABEL_PATTERN = ELEMENT_PATTERNS['lblCaseNumber']
+TAG_PATTERN = re.compile(rb'<[^>]*>')
+WHITESPACE_PATTERN = re.compile(rb'\s+')
+
+
+@functools.lru_cache(maxsize=None)
+def tag_boundary_pattern(tag: bytes):
+    """Start and end tags of one tag name, to find the end tag that balances a start tag"""
+    return re.compile(rb'<(?P<end>/?)' + re.escape(tag) + rb'\b[^>]*>', re.IGNORECASE)
+
+
+# Case type letters of a case number, e.g. 'CR' in '2023CRB00104'
+CASE_TYPE_PREFIX_PATTERN = re.compile(r'[A-Z]{2}')
+
+# Date patterns equivalent to datetime.strptime's for '%m/%d/%Y', '%m/%d/%y' and '%B %d, %Y'
+_STRPTIME_MONTH = r'(?P<m>1[0-2]|0[1-9]|[1-9])'
+_STRPTIME_DAY = r'(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])'
+_STRPTIME_MONTH_NAME = (
+    r'(?P<B>september|february|november|december|january|october|august|march|april|june|july|may)'
+)
+NUMERIC_DATE_PATTERN = re.compile(
+    rf'{_STRPTIME_MONTH}/{_STRPTIME_DAY}/(?P<Y>\d\d\d\d)', re.IGNORECASE
+)
+SHORT_NUMERIC_DATE_PATTERN = re.compile(
+    rf'{_STRPTIME_MONTH}/{_STRPTIME_DAY}/(?P<y>\d\d)', re.IGNORECASE
+)
+MONTH_NAME_DATE_PATTERN = re.compile(
+    rf'{_STRPTIME_MONTH_NAME}\s+{_STRPTIME_DAY},\s+(?P<Y>\d\d\d\d)', re.IGNORECASE
+)
+
 # mapping for case_type field
 COURT_CASE_TYPES_MAP = {
     '': 'Other',
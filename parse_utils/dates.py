@@ -0,0 +1,80 @@
+import calendar
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Pattern, Tuple
+
+from .datastructures import (
+    NUMERIC_DATE_PATTERN, SHORT_NUMERIC_DATE_PATTERN, MONTH_NAME_DATE_PATTERN
+)
+
+# Distinct date strings remembered per function; docket dates repeat heavily
+DATE_CACHE_SIZE = 4096
+
+MONTH_NUMBERS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
+# (strptime format, equivalent pattern) in the order DocketProcessor has always tried them
+DATE_FORMATS = (
+    ('%B %d, %Y', MONTH_NAME_DATE_PATTERN),
+    ('%m/%d/%Y', NUMERIC_DATE_PATTERN),
+    ('%m/%d/%y', SHORT_NUMERIC_DATE_PATTERN),
+)
+
+
+def _match_date(pattern: Pattern, date_str: str) -> Optional[Tuple[int, int, int]]:
+    """
+    (year, month, day) of a date string matching one of the strptime-equivalent patterns,
+    None if it does not match or is not a real date (both cases strptime raises ValueError for).
+    """
+    found = pattern.match(date_str)
+    if not found or found.end() != len(date_str):
+        return None
+
+    groups = found.groupdict()
+    if 'B' in groups:
+        month = MONTH_NUMBERS[groups['B'].lower()]
+    else:
+        month = int(groups['m'])
+    day = int(groups['d'])
+    if 'y' in groups:
+        year = int(groups['y'])
+        year += 2000 if year <= 68 else 1900
+    else:
+        year = int(groups['Y'])
+
+    if year < 1 or day > calendar.monthrange(year, month)[1]:
+        return None
+    return year, month, day
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def is_mmddyyyy(date_str: str) -> bool:
+    """
+    Check if the given date string is a valid 'MM/DD/YYYY' date, same as
+    `datetime.strptime(date_str, '%m/%d/%Y')` succeeding.
+    :param date_str: The date string to be validated.
+    :return: True if the date string is valid, False otherwise.
+    """
+    return _match_date(NUMERIC_DATE_PATTERN, date_str) is not None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_date(date_str: str) -> Optional[str]:
+    """
+    Normalize a 'Month D, YYYY', 'MM/DD/YYYY' or 'MM/DD/YY' date to 'MM/DD/YYYY'.
+    Same result as trying `datetime.strptime` with each of DATE_FORMATS in turn.
+    :param date_str: The date string to be normalized.
+    :return: The normalized date string, None if no format matches.
+    """
+    for date_format, pattern in DATE_FORMATS:
+        parsed = _match_date(pattern, date_str)
+        if parsed is None:
+            continue
+        year, month, day = parsed
+        if year < 1000:
+            # strftime does not zero-pad such years; leave the formatting to it
+            return datetime.strptime(date_str, date_format).strftime('%m/%d/%Y')
+        return f'{month:02d}/{day:02d}/{year}'
+    return None
@@ -0,0 +1,183 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Parser used when a BeautifulSoup tree has to be built. 'html.parser' as before;
+# 'lxml' is faster but builds a different tree for malformed HTML.
+BS4_PARSER = os.environ.get('BS4_PARSER', 'html.parser')
+
+
+class Node(ABC):
+    """
+    Minimal element interface the docket extractors need, so they can run on any
+    HTML tree. Every backend returns the same strings as BeautifulSoup would.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def text(self, strip: bool = True) -> str:
+        """Text of the element and its descendants, like `get_text(strip=strip)`."""
+
+    @abstractmethod
+    def strings(self) -> List[str]:
+        """Non-empty stripped text pieces, like `stripped_strings`."""
+
+    @abstractmethod
+    def find_all(self, tag: str) -> List['Node']:
+        """Descendant elements with the given tag, in document order."""
+
+
+class Document(Node):
+    __slots__ = ()
+
+    @abstractmethod
+    def find(self, element_id: str, tag: Optional[str] = None) -> Optional[Node]:
+        """First element with the given id (and tag, if given), None if absent."""
+
+
+class SoupNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def text(self, strip: bool = True) -> str:
+        return self.element.get_text(strip=strip)
+
+    def strings(self) -> List[str]:
+        return list(self.element.stripped_strings)
+
+    def find_all(self, tag: str) -> List[Node]:
+        return [SoupNode(element) for element in self.element.find_all(tag)]
+
+
+class SoupDocument(SoupNode, Document):
+    __slots__ = ()
+
+    @classmethod
+    def from_html(cls, html: Union[bytes, str]) -> 'SoupDocument':
+        return cls(BeautifulSoup(html, BS4_PARSER))
+
+    def find(self, element_id: str, tag: Optional[str] = None) -> Optional[Node]:
+        element = self.element.find(tag or True, id=element_id)
+        return SoupNode(element) if element is not None else None
+
+
+class LxmlNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def text(self, strip: bool = True) -> str:
+        pieces = self.element.xpath('.//text()')
+        if strip:
+            return ''.join(piece.strip() for piece in pieces)
+        return ''.join(pieces)
+
+    def strings(self) -> List[str]:
+        return [piece.strip() for piece in self.element.xpath('.//text()') if piece.strip()]
+
+    def find_all(self, tag: str) -> List[Node]:
+        return [LxmlNode(element) for element in self.element.iterdescendants(tag)]
+
+
+class LxmlDocument(LxmlNode, Document):
+    __slots__ = ()
+
+    @classmethod
+    def from_html(cls, html: Union[bytes, str]) -> 'LxmlDocument':
+        if lxml is None:
+            raise ImportError("The 'lxml' HTML parser backend requires lxml")
+        return cls(lxml.html.document_fromstring(html))
+
+    def find(self, element_id: str, tag: Optional[str] = None) -> Optional[Node]:
+        elements = self.element.xpath(f'//{tag or "*"}[@id=$element_id]', element_id=element_id)
+        return LxmlNode(elements[0]) if elements else None
+
+
+class SelectolaxNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def text(self, strip: bool = True) -> str:
+        return self.element.text(deep=True, separator='', strip=strip)
+
+    def strings(self) -> List[str]:
+        pieces = (
+            node.text(deep=False, strip=True)
+            for node in self.element.traverse(include_text=True)
+            if node.tag == '-text'
+        )
+        return [piece for piece in pieces if piece]
+
+    def find_all(self, tag: str) -> List[Node]:
+        return [SelectolaxNode(element) for element in self.element.css(tag)]
+
+
+class SelectolaxDocument(SelectolaxNode, Document):
+    __slots__ = ()
+
+    @classmethod
+    def from_html(cls, html: Union[bytes, str]) -> 'SelectolaxDocument':
+        if HTMLParser is None:
+            raise ImportError("The 'selectolax' HTML parser backend requires selectolax")
+        return cls(HTMLParser(html))
+
+    def find(self, element_id: str, tag: Optional[str] = None) -> Optional[Node]:
+        element = self.element.css_first(f'{tag or ""}#{element_id}')
+        return SelectolaxNode(element) if element is not None else None
+
+
+BACKENDS = {
+    'bs4': SoupDocument,
+    'lxml': LxmlDocument,
+    'selectolax': SelectolaxDocument,
+}
+
+
+def build_document(html: Union[bytes, str], backend: str = 'bs4') -> Document:
+    """
+    Parse raw HTML with the given backend.
+    :param html: The page as bytes or str.
+    :param backend: One of the keys of BACKENDS.
+    :return: The parsed Document.
+    """
+    try:
+        document_class = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown HTML parser backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    return document_class.from_html(html)
+
+
+def as_document(source, backend: str = 'bs4') -> Document:
+    """
+    Return a Document for whatever the extractors were handed.
+    :param source: A Document, a BeautifulSoup object or raw HTML.
+    :param backend: Backend used when the HTML has to be parsed. A BeautifulSoup object
+        with a `response` attached is re-parsed from the raw body for non-bs4 backends,
+        so callers that know the backend should not build the soup in the first place.
+    :return: The Document.
+    """
+    if isinstance(source, Document):
+        return source
+    if isinstance(source, BeautifulSoup):
+        response = getattr(source, 'response', None)
+        if backend == 'bs4' or response is None:
+            return SoupDocument(source)
+        return build_document(response.body, backend)
+    return build_document(source, backend)
@@ -1,11 +1,26 @@
 import os
+import atexit
 import logging
+import threading
 import requests
-from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple, Union
 from bs4 import BeautifulSoup as bs
+from requests.adapters import HTTPAdapter
+
+from .address_check import ADDRESS_MISSING, AddressCheck, check_address
+from .html_backends import BS4_PARSER
+from .personator_cache import PersonatorCache, get_personator_cache
+from .stage_timing import count_event, stage_timer
+from .zip_index import get_zip_index
 
 MELISSA_USERNAME = os.environ.get('MELISSA_USERNAME')
 MELISSA_PASSWORD = os.environ.get('MELISSA_PASSWORD')
+# Concurrent Personator lookups used by search_personator_batch and the lookup pools
+MELISSA_MAX_WORKERS = int(os.environ.get('MELISSA_MAX_WORKERS', 8))
+# Connections the shared session keeps open; more concurrent lookups would only wait for one
+MELISSA_POOL_SIZE = MELISSA_MAX_WORKERS
 
 
 class MissingCredentialsError(Exception):
@@ -13,18 +28,37 @@ class MissingCredentialsError(Exception):
 
 
 class MelissaAPI:
+    # Sign-in happens on the first authenticated request, not on construction
+    SIGNIN_URL = 'https://apps.melissa.com/user/signin.aspx'
+
     def __init__(self):
-        self.session = requests.Session()
-        self.login()
+        self.session = self.new_session()
+        self.logged_in = False
+        # bumped on every sign-in, so threads that saw the same expired session sign in once
+        self.login_generation = 0
+        self._login_lock = threading.Lock()
+
+    @staticmethod
+    def new_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MELISSA_POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
-        self.matching_zips = []
-        self.zip_code_keys, self.county_keys = self.get_zip_codes()
+    @property
+    def zip_code_keys(self):
+        return get_zip_index().zip_code_keys
+
+    @property
+    def county_keys(self):
+        return get_zip_index().county_to_zips
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.session.close()
+        self.close()
 
         if exc_type is not None:
             logging.error(
@@ -35,31 +69,50 @@ class MelissaAPI:
     @staticmethod
     def get_soup(response):
         if response.status_code == 200:
-            return bs(response.text, 'html.parser')
+            return bs(response.text, BS4_PARSER)
 
     def get_zip_codes(self):
-        with open('zips.txt', 'r') as file:
-            file = file.read()
-
-        zips = {}
-        zip_dict = OrderedDict()
-
-        for zip in file.split("\n")[:-1]:
-            zip = zip.split("|")
-            county_name = zip[1].replace(
-                " County", ""
-            )
-            county_name = county_name.lower().replace(
-                f" {zip[2].lower()}", ""
-            ).title()
-            county_name = county_name+f" {zip[2].title()}"
-            zip_dict.setdefault(
-                county_name,
-                []
-            ).append(zip[0])
-            zips[zip[0]] = {'county': county_name, 'state': zip[2].title()}
-
-        return zips, zip_dict
+        # Lookups come from the prebuilt, lazily loaded ZIP index (see zip_index.py)
+        index = get_zip_index()
+        return index.zip_code_keys, index.county_to_zips
+
+    def close(self):
+        """Close the pooled connections; the next request opens a new session and signs in again"""
+        with self._login_lock:
+            self.session.close()
+            self.session = self.new_session()
+            self.logged_in = False
+
+    def ensure_login(self, expired_generation=None):
+        """
+        Sign in unless already signed in. With `expired_generation`, sign in again if no
+        other thread has done so since that generation's session was found expired.
+        """
+        with self._login_lock:
+            if self.logged_in and expired_generation != self.login_generation:
+                return
+            self.login()
+            self.logged_in = True
+            self.login_generation += 1
+
+    @classmethod
+    def session_expired(cls, response) -> bool:
+        """An expired session is redirected to the sign-in page"""
+        return response.status_code in (401, 403) or cls.SIGNIN_URL in response.url
+
+    def get_authenticated(self, url, params=None):
+        """GET a page that needs a signed-in session, signing in again once if it expired"""
+        self.ensure_login()
+        generation = self.login_generation
+        response = self.session.get(url, params=params)
+        if self.session_expired(response):
+            logging.info('Melissa session expired, signing in again')
+            self.ensure_login(expired_generation=generation)
+            response = self.session.get(url, params=params)
+            if self.session_expired(response):
+                logging.warning('Melissa session still expired after signing in again')
+                return None
+        return self.get_soup(response)
 
     def get_data(self, url, params={}):
         response = self.session.get(url, params=params)
@@ -73,7 +126,7 @@ class MelissaAPI:
 
     def login(self):
         login_page = self.get_data(
-            'https://apps.melissa.com/user/signin.aspx?src=/user/user_account.aspx')
+            f'{self.SIGNIN_URL}?src=/user/user_account.aspx')
         viewstate = login_page.find(
             'input', {'name': '__VIEWSTATE'}
         ).get('value')
@@ -89,7 +142,7 @@ class MelissaAPI:
         }
 
         return self.post_data(
-            'https://apps.melissa.com/user/signin.aspx', formdata
+            self.SIGNIN_URL, formdata
         )
 
     def get_personator_search(self):
@@ -99,6 +152,7 @@ class MelissaAPI:
         )
 
     def search_personator(self, name, state):
+        """Soup of the Personator results page. Keeps no per-query state, so it is reentrant"""
 
         params = {
             "name": name,
@@ -110,18 +164,14 @@ class MelissaAPI:
             "emailAddress": "",
             "freeForm": ""
         }
-        self.query = params
-
-        self.search_soup = self.get_data(
+        return self.get_authenticated(
             "https://lookups.melissa.com/home/personatorsearch/",
             params=params
         )
-        return self.search_soup
 
     def extract_results(self, results):
         addresses = []
         if not results.find_all('table'):
-            self.search_results = []
             return None
         for res in results.find_all('table')[0].find_all('tr')[1:]:
             addresses.append({
@@ -132,7 +182,6 @@ class MelissaAPI:
                 'zip_code': res.find_all('td')[4].string,
             })
 
-        self.search_results = addresses
         return addresses
 
     def verify_against_zips(self, results, county, state, zip_codes=None):
@@ -140,7 +189,7 @@ class MelissaAPI:
         county = county.lower().replace(f' {state.lower()}', '').title()
         zip_key = f'{county.title()} {state.title()}'
 
-        zip_codes = zip_codes or self.county_keys[zip_key]
+        zip_codes = frozenset(zip_codes) if zip_codes else get_zip_index().county_to_zips[zip_key]
 
         matching_zips = []
 
@@ -148,41 +197,240 @@ class MelissaAPI:
 
             if search_data['zip_code'] in zip_codes:
                 matching_zips.append(search_data)
-        self.matching_zips = matching_zips
         return matching_zips
 
 
-if all((MELISSA_USERNAME, MELISSA_PASSWORD)):
-    melissa_api = MelissaAPI()
+@dataclass
+class PersonatorResult:
+    """Outcome of one Personator lookup, owned by the caller"""
+    query: dict
+    # every row of the Personator results table
+    results: List[dict] = field(default_factory=list)
+    # rows inside the county (or given) ZIP codes
+    matches: List[dict] = field(default_factory=list)
+    # what search_personator returns: the single match, or '' if none or ambiguous
+    address: Union[dict, str] = ''
+    cached: bool = False
+    # the docket address was verified against zips.txt, Melissa was not asked
+    verified_locally: bool = False
+    # outcome of the zips.txt check that lookup_defendant ran before asking Melissa
+    address_check: Optional[AddressCheck] = None
+
+
+_melissa_api = None
+_melissa_api_lock = threading.Lock()
+_executor = None
+_thread_pool = None
+
+
+def get_melissa_api() -> MelissaAPI:
+    """The shared MelissaAPI client, created on first use (signing in happens on its first query)"""
+    global _melissa_api
+    _check_credentials()
+    with _melissa_api_lock:
+        if _melissa_api is None:
+            _melissa_api = MelissaAPI()
+        return _melissa_api
+
+
+def get_personator_executor() -> ThreadPoolExecutor:
+    """The shared thread pool of MELISSA_MAX_WORKERS used for asynchronous lookups"""
+    global _executor
+    with _melissa_api_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MELISSA_MAX_WORKERS, thread_name_prefix='personator')
+        return _executor
+
+
+def get_personator_thread_pool():
+    """
+    Twisted ThreadPool of MELISSA_MAX_WORKERS used by defer_personator, kept apart from
+    the reactor's own pool (which also resolves DNS). Started on first use and stopped
+    when the reactor shuts down, i.e. with the crawler.
+    """
+    global _thread_pool
+    from twisted.internet import reactor
+    from twisted.python.threadpool import ThreadPool
+
+    with _melissa_api_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPool(minthreads=0, maxthreads=MELISSA_MAX_WORKERS, name='personator')
+            _thread_pool.start()
+            reactor.addSystemEventTrigger('during', 'shutdown', stop_personator_thread_pool)
+        return _thread_pool
+
+
+def stop_personator_thread_pool() -> None:
+    global _thread_pool
+    with _melissa_api_lock:
+        thread_pool, _thread_pool = _thread_pool, None
+    if thread_pool is not None:
+        thread_pool.stop()
+
+
+@atexit.register
+def close_melissa_api() -> None:
+    """Shut down the lookup thread pool and close the shared client's pooled connections"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if _melissa_api is not None:
+        _melissa_api.close()
+
+
+def __getattr__(name):
+    # `melissa_api` used to be created (and signed in) at import time
+    if name == 'melissa_api':
+        return get_melissa_api()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _check_credentials() -> None:
+    if not all((MELISSA_USERNAME, MELISSA_PASSWORD)):
+        raise MissingCredentialsError(
+            "Both username and password must be supplied in your .env file")
+
+
+def lookup_personator(name: str, state: str, county: str, zip_codes: list = None) -> PersonatorResult:
+    """
+    Run one Personator query and keep the single result inside the county ZIP codes.
+    All state lives in the returned PersonatorResult, so lookups can run concurrently
+    on the shared session. Results, including '' for no or ambiguous matches, are
+    served from and stored in the Personator cache when it is enabled. A lookup whose
+    results page could not be fetched (error status, expired session) returns '' but
+    is not cached; exceptions are raised as they always were.
+
+    ARGS: same as search_personator
+
+    RETURNS (PersonatorResult):
+    `address` holds what search_personator returns
+    """
+    _check_credentials()
+    if zip_codes:
+        zip_codes = [str(z) for z in zip_codes]
+    result = PersonatorResult(query={
+        'name': name, 'state': state, 'county': county, 'zip_codes': zip_codes
+    })
+
+    cache = get_personator_cache()
+    if cache is not None:
+        cache_key = PersonatorCache.make_key(name, state, county, zip_codes)
+        found, cached_address = cache.get(cache_key)
+        if found:
+            count_event('melissa_cache_hits')
+            result.address = cached_address
+            result.cached = True
+            return result
+
+    with stage_timer('melissa_lookup'):
+        melissa_api = get_melissa_api()
+        results_soup = melissa_api.search_personator(name, state)
+        result.results = (melissa_api.extract_results(results_soup) if results_soup else None) or []
+        if result.results:
+            result.matches = melissa_api.verify_against_zips(
+                result.results, county, state, zip_codes)
+
+    result.address = (
+        result.matches[0]
+        if result.matches and len(result.matches) < 2
+        else ''
+    )
+    # only an answer from Melissa is worth remembering, not a failed request
+    if cache is not None and results_soup:
+        cache.set(cache_key, result.address)
+    return result
+
+
+def lookup_defendant(party: dict, county: str, zip_codes: list = None) -> PersonatorResult:
+    """
+    Address of a defendant dict from parse_plaintiffs_and_defendants. When the docket
+    address already lies in `county` (check_address in address_check.py) it is returned
+    as is and Melissa is not called; otherwise this is lookup_personator by name and state.
+    A defendant without a name, or without a street and city on the docket, is not sent
+    to Melissa at all and gets the '' address of a lookup without a match.
+
+    RETURNS (PersonatorResult):
+    `verified_locally` tells which way the address was found, `address_check` holds
+    the outcome of the zips.txt check either way
+    """
+    name, state = party.get('defendant'), party.get('state')
+    query = {'name': name, 'state': state, 'county': county, 'zip_codes': zip_codes}
+    with stage_timer('address_check'):
+        check = check_address(party, county)
+    if check.verified and (not zip_codes or check.address['zip_code'] in {str(z) for z in zip_codes}):
+        count_event('addresses_verified_locally')
+        count_event('melissa_calls_avoided')
+        return PersonatorResult(query=query, address=check.address, verified_locally=True, address_check=check)
+    if not (name or '').strip() or check.reason == ADDRESS_MISSING:
+        count_event('addresses_not_searchable')
+        return PersonatorResult(query=query, address_check=check)
+    count_event('addresses_need_lookup')
+    result = lookup_personator(name, state, county, zip_codes)
+    result.address_check = check
+    return result
 
 
 def search_personator(name: str, state: str, county: str, zip_codes: list = None):
 
-    if all((MELISSA_USERNAME, MELISSA_PASSWORD)):
-
-        if zip_codes:
-            zip_codes = [str(z) for z in zip_codes]
-
-        melissa_api.matching_zips = []
-        melissa_api.search_results = []
-        melissa_api.query = {}
-        melissa_api.search_soup = None
-
-        melissa_api.get_personator_search()
-        results = melissa_api.search_personator(name, state)
-        extracted_results = melissa_api.extract_results(results)
-        matching_addresses = []
-        if extracted_results:
-            matching_addresses = melissa_api.verify_against_zips(
-                extracted_results, county, state, zip_codes)
-
-        matching_addresses = (
-            matching_addresses[0]
-            if matching_addresses and len(matching_addresses) < 2
-            else ''
-        )
-
-        return matching_addresses
-
-    raise MissingCredentialsError(
-        "Both username and password must be supplied in your .env file")
+    return lookup_personator(name, state, county, zip_codes).address
+
+
+def submit_personator(name: str, state: str, county: str, zip_codes: list = None) -> 'Future[PersonatorResult]':
+    """Thread pool form of lookup_personator: returns a Future of the PersonatorResult"""
+    _check_credentials()
+    return get_personator_executor().submit(lookup_personator, name, state, county, zip_codes)
+
+
+def defer_personator(name: str, state: str, county: str, zip_codes: list = None):
+    """
+    Deferred form of lookup_personator for Scrapy code. The lookup runs in the Personator
+    thread pool (get_personator_thread_pool), so the reactor keeps downloading and
+    resolving names while Melissa answers.
+
+    RETURNS (Deferred):
+    Fires with the PersonatorResult
+    """
+    from twisted.internet import reactor
+    from twisted.internet.threads import deferToThreadPool
+
+    _check_credentials()
+    return deferToThreadPool(
+        reactor, get_personator_thread_pool(), lookup_personator, name, state, county, zip_codes)
+
+
+def personator_cache_stats() -> dict:
+    """Hit, negative hit and miss counters of the Personator cache (empty if disabled)"""
+    cache = get_personator_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def search_personator_batch(
+        queries: Iterable[Tuple[str, str, str, Optional[list]]],
+        max_workers: int = None) -> List[Union[dict, str]]:
+    """
+    Run many Personator searches concurrently over the pooled session.
+
+    ARGS:
+    queries: Iterable of (name, state, county, zip_codes) tuples, same arguments as search_personator
+    max_workers: Concurrent lookups, MELISSA_MAX_WORKERS by default and at most
+    MELISSA_POOL_SIZE, the connections of the shared session
+
+    RETURNS (list):
+    One search_personator result per query, in the order of `queries`; '' without
+    asking Melissa for a query that lacks a name, state or county
+    """
+    _check_credentials()
+    queries = [tuple(query) + (None,) * (4 - len(query)) for query in queries]
+    results: List[Union[dict, str]] = [''] * len(queries)
+    complete = [index for index, query in enumerate(queries) if all(query[:3])]
+    if not complete:
+        return results
+
+    workers = min(max_workers or MELISSA_MAX_WORKERS, MELISSA_POOL_SIZE, len(complete))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        found = executor.map(lambda index: lookup_personator(*queries[index]), complete)
+        for index, result in zip(complete, found):
+            results[index] = result.address
+    return results
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field, fields, replace
+from typing import List, Tuple
+
+from public_digital.dataclasses.base_dataclasses import (
+    CaseDocket, Case, CaseParty, PackedCase
+)
+
+# CASE_DOCKET_PACKING values
+PER_PARTY_DOCKETS = 'per_party'
+SHARED_DOCKETS = 'shared'
+DOCKET_PACKING_MODES = (PER_PARTY_DOCKETS, SHARED_DOCKETS)
+
+
+def packed_fields(packed_case: PackedCase) -> Tuple[str, str]:
+    """Names of the case and case parties fields of PackedCase, in constructor order."""
+    case_field, parties_field = fields(packed_case)[:2]
+    return case_field.name, parties_field.name
+
+
+@dataclass
+class SharedDocketCase:
+    """
+    A PackedCase with the case's docket entries stored once instead of once per party.
+
+    Step 7 of parse_case_data gives every CaseParty the same docket list, so serializing
+    a PackedCase writes the whole docket again for each defendant. Here `docket_entries`
+    holds that list, and a party whose docket_entries were the shared list has None in
+    its place. A party with dockets of its own keeps them, so `expand` is lossless.
+    """
+    case: Case
+    case_parties: List[CaseParty]
+    docket_entries: List[CaseDocket] = field(default_factory=list)
+
+    def expand(self) -> PackedCase:
+        """The PackedCase this was built from, each party with its own docket_entries."""
+        return PackedCase(self.case, [
+            replace(party, docket_entries=self.docket_entries) if party.docket_entries is None else party
+            for party in self.case_parties
+        ])
+
+
+def share_dockets(packed_case: PackedCase) -> SharedDocketCase:
+    """
+    :param packed_case: A PackedCase from parse_case_data.
+    :return: The same case with the docket entries of the first party stored once at case level.
+    """
+    case_name, parties_name = packed_fields(packed_case)
+    case_parties = getattr(packed_case, parties_name)
+    docket_entries = case_parties[0].docket_entries if case_parties else []
+    return SharedDocketCase(
+        getattr(packed_case, case_name),
+        [
+            replace(party, docket_entries=None)
+            if party.docket_entries is docket_entries or party.docket_entries == docket_entries else party
+            for party in case_parties
+        ],
+        docket_entries
+    )
+
+
+def pack_case(packed_case: PackedCase, mode: str = PER_PARTY_DOCKETS):
+    """
+    :param packed_case: A PackedCase from parse_case_data.
+    :param mode: One of DOCKET_PACKING_MODES (the CASE_DOCKET_PACKING setting).
+    :return: The PackedCase itself, or its SharedDocketCase in 'shared' mode.
+    """
+    if mode == PER_PARTY_DOCKETS:
+        return packed_case
+    if mode == SHARED_DOCKETS:
+        return share_dockets(packed_case)
+    raise ValueError(f'Unknown docket packing mode {mode!r}, expected one of {DOCKET_PACKING_MODES}')
+
+
+def expand_case_record(record: dict) -> dict:
+    """
+    Turn a serialized SharedDocketCase (e.g. a line of a spool batch) back into the
+    record a PackedCase serializes to. Records without case level docket entries are
+    returned unchanged, so consumers can call this on every line.
+    """
+    if 'docket_entries' not in record:
+        return record
+    case_name, parties_name = packed_fields(PackedCase)
+    docket_entries = record['docket_entries']
+    return {
+        case_name: record['case'],
+        parties_name: [
+            dict(party, docket_entries=docket_entries) if party.get('docket_entries') is None else party
+            for party in record['case_parties']
+        ]
+    }
@@ -1,22 +1,106 @@
 
-import re
-from datetime import datetime
-from typing import Dict, Optional, Any, Tuple
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
 
 from .datastructures import (
     GARNISHMENT_PATTERN, EMPLOYER_PATTERN, 
     SERVE_STATUS_PATTERN, JUDGMENT_PATTERNS,  
     DISMISSED_PATTERN, HEARING_DATE_PATTERN, 
-    BANKRUPTCY_PATTERN
+    BANKRUPTCY_PATTERN, AMOUNT_PATTERN,
+    DOCKET_RULE_KEYWORDS_PATTERN
 )
+from .dates import normalize_date
+
+
+class DocketRow:
+    """
+    One row of DocketColumns. The DocketProcessor rules read it like a docket entry
+    dict (entry['entry'], entry['date_time']).
+    """
+    __slots__ = ('date_time', 'type', 'entry', 'unique_id')
+
+    def __init__(self, date_time: str, docket_type: str, entry: str, unique_id: int):
+        self.date_time = date_time
+        self.type = docket_type
+        self.entry = entry
+        self.unique_id = unique_id
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+
+class DocketColumns:
+    """
+    The docket entries of a case stored column wise instead of as a dict per row.
+
+    Dates and type codes repeat throughout a docket, so they are interned and every row
+    holding the same value points at one string. The row numbers live in an int array.
+    DocketProcessor reads the columns directly and only builds a DocketRow for the
+    entries a rule applies to; `case_dockets` builds the CaseDocket objects of step 5
+    straight from the columns.
+    """
+    __slots__ = ('date_times', 'types', 'entries', 'unique_ids')
+
+    def __init__(self):
+        self.date_times: List[str] = []
+        self.types: List[str] = []
+        self.entries: List[str] = []
+        self.unique_ids = array('l')
+
+    def append(self, date_time: str, docket_type: str, entry: str, unique_id: int) -> None:
+        self.date_times.append(sys.intern(date_time))
+        self.types.append(sys.intern(docket_type))
+        self.entries.append(entry)
+        self.unique_ids.append(unique_id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def row(self, index: int) -> DocketRow:
+        return DocketRow(self.date_times[index], self.types[index], self.entries[index], self.unique_ids[index])
+
+    def __iter__(self) -> Iterator[DocketRow]:
+        return map(self.row, range(len(self)))
+
+    def case_dockets(self, docket_class) -> list:
+        """
+        :param docket_class: CaseDocket (or a subclass).
+        :return: One docket_class object per row, in docket order.
+        """
+        return [
+            docket_class(date_time=date_time, type=docket_type, entry=entry, unique_id=unique_id)
+            for date_time, docket_type, entry, unique_id
+            in zip(self.date_times, self.types, self.entries, self.unique_ids)
+        ]
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """The rows in the dict form parse_docket_entries returns."""
+        return [
+            {'date_time': date_time, 'type': docket_type, 'entry': entry, 'unique_id': unique_id}
+            for date_time, docket_type, entry, unique_id
+            in zip(self.date_times, self.types, self.entries, self.unique_ids)
+        ]
+
 
 class DocketProcessor:
+    # (DOCKET_RULE_KEYWORDS_PATTERN group, method) in the order the rules are applied to an entry
+    RULES = (
+        ('bankruptcy', 'bankruptcy_test'),
+        ('hearing_date', 'process_hearing_date'),
+        ('serve_status', 'parse_served_status'),
+        ('judgment', 'judgment_test'),
+        ('garnishment', 'parse_garn_status'),
+        ('dismissed', 'test_dismissed'),
+    )
+
     def __init__(self, case_dict, plaintiffs):
         # Initialize the DocketProcessor with CaseData containing the docket entries, Case, and CaseParty instances.
         self.case_data = case_dict
         self.case_data['plaintiff'] = plaintiffs
      
         self.case_party_data = {}
+        self.rules = [(group, getattr(self, method)) for group, method in self.RULES]
 
     def bankruptcy_test(self, entry: Dict[str, str]) -> None:
         """
@@ -40,19 +124,11 @@ class DocketProcessor:
         :param entry: A dictionary representing a single docket entry.
         """
 
-        def parse_and_format_date(date_str: str) -> Optional[str]:
-            for fmt in ('%B %d, %Y', '%m/%d/%Y', '%m/%d/%y'):
-                try:
-                    return datetime.strptime(date_str, fmt).strftime('%m/%d/%Y')
-                except ValueError:
-                    continue
-            return None
-
         match = HEARING_DATE_PATTERN.search(entry['entry'])
 
         if match:
             date_str = match.group(1)
-            date = parse_and_format_date(date_str)
+            date = normalize_date(date_str)
             if date:
                 self.case_data['hearing_date'] = date
 
@@ -86,7 +162,7 @@ class DocketProcessor:
             :return: The largest dollar amount found in the text or None if no amounts were found.
             """
             # Extract all dollar amounts with optional decimal point
-            amounts = re.findall(r'\$\d+(?:\.\d{1,2})?', description)
+            amounts = AMOUNT_PATTERN.findall(description)
             # Remove the dollar sign and convert extracted numbers to float
             float_amounts = [float(amount[1:]) for amount in amounts]
             # Return the largest amount found, or None if no amounts were found
@@ -149,26 +225,44 @@ class DocketProcessor:
             self.case_data['case_dismiss_date'] = entry['date_time']
             self.case_data['case_status'] = 'DISMISSED'
 
-    def process_entries(self, dockets: dict) -> Tuple[dict, dict]:
+    def process_entries(self, dockets: Union[DocketColumns, List[dict]]) -> Tuple[dict, dict]:
         """
         Process all docket entries by calling the `process_entry` method for each entry.
-        Create a CaseDocket object and append to the CaseData.docket_entries
+        DocketColumns are scanned column wise and a DocketRow is only built for the
+        entries a rule applies to.
         """
-        for i, entry in enumerate(dockets):
-
-            self.process_entry(entry)
+        if isinstance(dockets, DocketColumns):
+            for index, description in enumerate(dockets.entries):
+                matched = self.matched_rules(description)
+                if matched:
+                    self.apply_rules(matched, dockets.row(index))
+        else:
+            for entry in dockets:
+                self.process_entry(entry)
 
         return self.case_data, self.case_party_data
 
     def process_entry(self, entry: Dict[str, Any]) -> None:
         """
         Process a single docket entry by calling various parsing methods to update the case and case party data.
+        The description is scanned once for the rule keywords and only the rules whose keyword
+        occurs are run, in the order of RULES.
 
-        :param entry: A dictionary representing a docket entry.
+        :param entry: A dictionary (or DocketRow) representing a docket entry.
         """
-        self.bankruptcy_test(entry)
-        self.process_hearing_date(entry)
-        self.parse_served_status(entry)
-        self.judgment_test(entry)
-        self.parse_garn_status(entry)
-        self.test_dismissed(entry)
+        matched = self.matched_rules(entry['entry'])
+        if matched:
+            self.apply_rules(matched, entry)
+
+    @staticmethod
+    def matched_rules(description: str) -> set:
+        """The DOCKET_RULE_KEYWORDS_PATTERN groups occurring in a docket description."""
+        return {
+            match.lastgroup
+            for match in DOCKET_RULE_KEYWORDS_PATTERN.finditer(description)
+        }
+
+    def apply_rules(self, matched: set, entry) -> None:
+        for group, rule in self.rules:
+            if group in matched:
+                rule(entry)
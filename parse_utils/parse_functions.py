@@ -1,12 +1,18 @@
 
 import re
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import html
+import hashlib
+from typing import List, Dict, Optional, Tuple, Union
 from scrapy.exceptions import IgnoreRequest
 
 from public_digital.utils.funcs import write_to_file
-from .datastructures import COURT_CASE_TYPES_MAP
-from .parse_classes import DocketProcessor
+from .datastructures import (
+    COURT_CASE_TYPES_MAP, CASE_HEADER_LABELS, CASE_DATA_TABLES, ELEMENT_PATTERNS, TAG_PATTERN,
+    WHITESPACE_PATTERN, CASE_TYPE_PREFIX_PATTERN, tag_boundary_pattern
+)
+from .html_backends import as_document
+from .parse_classes import DocketColumns, DocketProcessor
+from .dates import is_mmddyyyy
 
 
 def _validate_type(docket_type: str) -> bool:
@@ -23,11 +29,7 @@ def _validate_date(date_str: str) -> bool:
     :param date_str: The date string to be validated.
     :return: True if the date string is valid, False otherwise.
     """
-    try:
-        datetime.strptime(date_str, '%m/%d/%Y')
-        return True
-    except ValueError:
-        return False
+    return is_mmddyyyy(date_str)
     
 def _format_description(description: str) -> str:
     """
@@ -38,29 +40,106 @@ def _format_description(description: str) -> str:
     formatted_description = re.sub(r'\s+', ' ', description).strip()
     return formatted_description
 
-def parse_docket_entries(soup) -> List[Dict[str, Optional[str]]]:
+def is_civil_case_number(case_number: str) -> bool:
+    """
+    Lorain civil case numbers contain "CV" (e.g. '2023CVF01234').
+    :param case_number: The text of the "lblCaseNumber" label.
+    :return: True for a civil case.
+    """
+    return "CV" in case_number
+
+def case_type_prefix(case_number: str) -> str:
+    """
+    Case type prefix of a case number: 'CV' for civil cases, otherwise the first two
+    letters (e.g. '2023CRB00104' -> 'CR'), '' if there are none.
+    :param case_number: The text of the "lblCaseNumber" label.
+    """
+    if is_civil_case_number(case_number):
+        return 'CV'
+    match = CASE_TYPE_PREFIX_PATTERN.search(case_number)
+    return match.group(0) if match else ''
+
+def element_from_bytes(body: bytes, element_id: str) -> Optional[bytes]:
+    """
+    Inner HTML of an element of ELEMENT_PATTERNS, read straight from the raw page bytes
+    without building a tree. Elements of the same tag nested inside it (a table in a
+    table cell) are kept, the element ends at the end tag that balances its start tag.
+    :param body: The raw Docket.aspx response body.
+    :param element_id: The id of the element, e.g. 'lblCaseNumber'.
+    :return: The bytes between the element's tags, None if the element is not found or never closed.
+    """
+    pattern = ELEMENT_PATTERNS[element_id]
+    marker = element_id.encode()
+    # find the id with a plain byte search, then match the tag it belongs to
+    position = body.find(marker)
+    while position != -1:
+        match = pattern.match(body, max(0, body.rfind(b'<', 0, position)))
+        if match is not None:
+            return balanced_content(body, match.group('tag').lower(), match.end())
+        position = body.find(marker, position + 1)
+    return None
+
+def balanced_content(body: bytes, tag: bytes, start: int) -> Optional[bytes]:
+    """The bytes from `start` up to the end tag of `tag` that closes the element open at `start`"""
+    depth = 1
+    for boundary in tag_boundary_pattern(tag).finditer(body, start):
+        if boundary.group(0).endswith(b'/>'):
+            continue
+        depth += -1 if boundary.group('end') else 1
+        if depth == 0:
+            return body[start:boundary.start()]
+    return None
+
+def case_number_from_bytes(body: bytes) -> Optional[str]:
+    """
+    Cheap pre-parse read of the "lblCaseNumber" label straight from the raw page bytes,
+    without building a tree. Tags nested in the label are dropped.
+    :param body: The raw Docket.aspx response body.
+    :return: The label text, None if the label is not found.
+    """
+    label = element_from_bytes(body, 'lblCaseNumber')
+    if label is None:
+        return None
+    return html.unescape(TAG_PATTERN.sub(b'', label).decode('utf-8', 'replace'))
+
+def case_fingerprint(body: bytes) -> str:
+    """
+    Fingerprint the parts of a docket page that feed the parsed case: the header labels
+    and the "dgrdResults" and "dgrdParties" tables. Read from the raw bytes like
+    case_number_from_bytes, so no tree is built; only the text between tags counts,
+    with whitespace normalized.
+    :param body: The raw Docket.aspx response body.
+    :return: A hex digest that only changes when the parsed content can change.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for element_id in CASE_HEADER_LABELS + CASE_DATA_TABLES:
+        element = element_from_bytes(body, element_id) or b''
+        pieces = (WHITESPACE_PATTERN.sub(b' ', piece).strip() for piece in TAG_PATTERN.split(element))
+        digest.update(element_id.encode() + b'=' + b'\x1f'.join(piece for piece in pieces if piece) + b'\x1e')
+    return digest.hexdigest()
+
+def parse_docket_columns(soup) -> DocketColumns:
 
     """
     Extracts docket information from an HTML table with the id "dgrdResults".
-    Returns a list of dictionaries containing the docket date, type, and description.
+    Returns a DocketColumns holding the docket date, type, and description of every entry.
+    Accepts a Document from any parser backend or a BeautifulSoup object.
     """
     # Find the table with id "dgrdResults"
-    docket_table = soup.find('table', {'id': 'dgrdResults'})
+    docket_table = as_document(soup).find('dgrdResults', 'table')
     # Extract the rows in the table
     rows = docket_table.find_all('tr')
-    docket_entries = []
+    docket_entries = DocketColumns()
     # Iterate through the rows, starting from the second row (skipping the header)
     for count, row in enumerate(rows[1:-1]):
         columns = row.find_all('td')
         # Get the description text, if it exists
-        description = columns[2].get_text(
-            strip=True) if len(columns) > 2 else None
+        description = columns[2].text() if len(columns) > 2 else None
         # Only proceed if there is a description
         if description:
             # Extract date and docket type from the columns
-            date = columns[0].get_text(strip=True)
-            docket_type = columns[1].get_text(
-                strip=True) if len(columns) > 1 else None
+            date = columns[0].text()
+            docket_type = columns[1].text() if len(columns) > 1 else None
             # Validate the date format
             if _validate_date(date):
                 # Validate the docket type, set to an empty string if invalid
@@ -69,30 +148,38 @@ def parse_docket_entries(soup) -> List[Dict[str, Optional[str]]]:
                 # Format the description text
                 formatted_description = _format_description(
                     description)
-                # Add the extracted and formatted data to the list of docket entries
-                docket_entries.append(
-                    {'date_time': date, 'type': docket_type, 'entry': formatted_description, 'unique_id': count})
+                # Add the extracted and formatted data to the docket columns
+                docket_entries.append(date, docket_type, formatted_description, count)
     return docket_entries
 
 
+def parse_docket_entries(soup) -> List[Dict[str, Optional[str]]]:
+    """
+    parse_docket_columns as a list of dictionaries containing the docket date, type,
+    and description ({'date_time', 'type', 'entry', 'unique_id'}).
+    """
+    return parse_docket_columns(soup).as_dicts()
+
+
 def parse_case_related_data(soup, county, case_number_int_repr=None):
-    case_number = soup.select('#lblCaseNumber')[0].text
+    document = as_document(soup)
+    case_number = document.find('lblCaseNumber').text(strip=False)
     print(case_number)
-    if "CV" in case_number:
+    if is_civil_case_number(case_number):
         case_type = ''
         try:
-            case_type = COURT_CASE_TYPES_MAP[soup.select('#lblDescription')[0].get_text(strip=True).lower()]
+            case_type = COURT_CASE_TYPES_MAP[document.find('lblDescription').text().lower()]
         except:
-            write_to_file('case_types.txt', soup.select('#lblDescription')[0].get_text(strip=True)+'\n')
+            write_to_file('case_types.txt', document.find('lblDescription').text()+'\n')
         case_data = {
-            'file_date': soup.select('#lblDateFiled')[0].get_text(strip=True),
-            'case_status_date': soup.select('#lblDateFiled')[0].get_text(strip=True),
-            'case_title': soup.select('#lblCaption')[0].get_text(strip=True),
+            'file_date': document.find('lblDateFiled').text(),
+            'case_status_date': document.find('lblDateFiled').text(),
+            'case_title': document.find('lblCaption').text(),
             'plaintiff': '',
             'court_type': 'Municipal',
             'case_number': case_number,
             'county': county,
-            'judge': soup.select('#lblJudgeName')[0].get_text(strip=True),
+            'judge': document.find('lblJudgeName').text(),
             'case_type': case_type,
         }
         if case_number_int_repr:
@@ -103,7 +190,8 @@ def parse_case_related_data(soup, county, case_number_int_repr=None):
     
 def parse_plaintiffs_and_defendants(soup, link: str) -> Tuple[dict, str]:
     """
-    Extract plaintiffs and defendants from the provided HTML using the soup object.
+    Extract plaintiffs and defendants from the provided HTML using the soup object
+    (a Document from any parser backend or a BeautifulSoup object).
     :return: Tuple containing a list of CustomCaseParty objects representing defendants and a string containing plaintiffs' names
     """
     def names_list_to_string(names: List[str]) -> str:
@@ -136,23 +224,22 @@ def parse_plaintiffs_and_defendants(soup, link: str) -> Tuple[dict, str]:
             # If the name doesn't contain a comma, use the original name
             formatted_name = name
         return formatted_name
-    docket_table = soup.find('table', {'id': 'dgrdParties'})
+    docket_table = as_document(soup).find('dgrdParties', 'table')
     rows = docket_table.find_all('tr')[1:]
     defendants = []
     plaintiffs = []
     for row in rows:
         columns = row.find_all('td')
-        party_type = columns[2].get_text(strip=True)
+        party_type = columns[2].text()
         # Format name
-        name = format_name(columns[0].get_text(strip=True))
+        name = format_name(columns[0].text())
         if party_type == "P":
             plaintiffs.append(name)
         if party_type == "D":
             party = {}
             
             # Create address parts list
-            address_parts = [t.strip()
-                             for t in columns[3].stripped_strings]
+            address_parts = columns[3].strings()
             # If address exists
             if address_parts[0] != ',':
           
@@ -161,7 +248,7 @@ def parse_plaintiffs_and_defendants(soup, link: str) -> Tuple[dict, str]:
                 city = parts[0].strip()
                 state = " ".join(parts[-1].split()[:-1])
                 zip_code = parts[-1].split()[-1].strip()
-                total_address = columns[3].get_text(strip=True)
+                total_address = columns[3].text()
 
                 party['link'] = link
                 party['defendant'] = name
@@ -176,7 +263,7 @@ def parse_plaintiffs_and_defendants(soup, link: str) -> Tuple[dict, str]:
 
 
 def parse_docket_fields(
-        dockets: List[dict], case_dict: dict, plaintiffs: str) -> Tuple[dict, dict]:
+        dockets: Union[DocketColumns, List[dict]], case_dict: dict, plaintiffs: str) -> Tuple[dict, dict]:
 
     processor = DocketProcessor(case_dict, plaintiffs)
     return processor.process_entries(dockets)
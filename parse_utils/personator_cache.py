@@ -0,0 +1,146 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional, Tuple
+
+# Local crawl state directory, the same default as the CRAWL_STATE_DIR crawler setting
+CRAWL_STATE_DIR = os.environ.get('CRAWL_STATE_DIR', 'crawl_state')
+# Set MELISSA_CACHE_PATH to an empty string to disable the cache
+MELISSA_CACHE_PATH = os.environ.get('MELISSA_CACHE_PATH', os.path.join(CRAWL_STATE_DIR, 'melissa_cache.sqlite3'))
+MELISSA_CACHE_TTL = float(os.environ.get('MELISSA_CACHE_TTL', 30 * 24 * 3600))
+MELISSA_CACHE_NEGATIVE_TTL = float(os.environ.get('MELISSA_CACHE_NEGATIVE_TTL', 7 * 24 * 3600))
+MELISSA_CACHE_MAX_ENTRIES = int(os.environ.get('MELISSA_CACHE_MAX_ENTRIES', 100000))
+# Inserts between two LRU evictions
+MELISSA_CACHE_PRUNE_INTERVAL = int(os.environ.get('MELISSA_CACHE_PRUNE_INTERVAL', 1000))
+
+
+class PersonatorCache:
+    """
+    Disk backed TTL + LRU cache of Personator lookup results.
+
+    Results are keyed by the normalized (name, state, county, zip set) of the lookup.
+    Empty or ambiguous results ('') are stored as negative entries with their own,
+    usually shorter, TTL. The least recently used entries beyond `max_entries` are
+    evicted by `prune`, which runs every `prune_interval` inserts and on `close`, so
+    the table may exceed `max_entries` by up to `prune_interval` rows in between.
+    Safe to share between threads and processes.
+    """
+
+    def __init__(self, path: str, ttl: float = MELISSA_CACHE_TTL,
+                 negative_ttl: float = MELISSA_CACHE_NEGATIVE_TTL,
+                 max_entries: int = MELISSA_CACHE_MAX_ENTRIES,
+                 prune_interval: int = MELISSA_CACHE_PRUNE_INTERVAL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prune_interval = max(1, int(prune_interval))
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS personator_cache ('
+            'key TEXT PRIMARY KEY, result TEXT, negative INTEGER, created_at REAL, last_used REAL)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS personator_cache_last_used ON personator_cache (last_used)'
+        )
+
+    @staticmethod
+    def make_key(name: str, state: str, county: str, zip_codes: Optional[Iterable] = None) -> str:
+        """Normalized cache key of a lookup."""
+        return json.dumps([
+            ' '.join((name or '').lower().split()),
+            (state or '').strip().upper(),
+            ' '.join((county or '').lower().split()),
+            sorted({str(zip_code).strip() for zip_code in (zip_codes or [])}),
+        ])
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        :param key: A key from `make_key`.
+        :return: (True, result) for a fresh entry, (False, None) otherwise.
+        """
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT result, negative, created_at FROM personator_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            result, negative, created_at = row
+            if now - created_at > (self.negative_ttl if negative else self.ttl):
+                self.connection.execute('DELETE FROM personator_cache WHERE key = ?', (key,))
+                self.misses += 1
+                return False, None
+
+            self.connection.execute(
+                'UPDATE personator_cache SET last_used = ? WHERE key = ?', (now, key)
+            )
+            self.hits += 1
+            if negative:
+                self.negative_hits += 1
+            return True, json.loads(result)
+
+    def set(self, key: str, result: Any) -> None:
+        """Store a lookup result; '' and other empty results are stored as negative entries."""
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO personator_cache (key, result, negative, created_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(result), int(not result), now, now)
+            )
+            self._inserts += 1
+            if self._inserts >= self.prune_interval:
+                self._prune()
+
+    def prune(self) -> None:
+        """Evict the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._prune()
+
+    def _prune(self) -> None:
+        self._inserts = 0
+        excess = self.connection.execute(
+            'SELECT COUNT(*) FROM personator_cache'
+        ).fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                'DELETE FROM personator_cache WHERE key IN '
+                '(SELECT key FROM personator_cache ORDER BY last_used LIMIT ?)', (excess,)
+            )
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'negative_hits': self.negative_hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._prune()
+            self.connection.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_personator_cache() -> Optional[PersonatorCache]:
+    """The process wide PersonatorCache, None if MELISSA_CACHE_PATH is empty."""
+    global _cache
+    if not MELISSA_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            directory = os.path.dirname(MELISSA_CACHE_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _cache = PersonatorCache(MELISSA_CACHE_PATH)
+        return _cache
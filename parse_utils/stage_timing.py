@@ -0,0 +1,136 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets, roughly logarithmic.
+# Anything slower lands in a final overflow bucket.
+STAGE_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def bucket_label(index: int) -> str:
+    """Stats key suffix of a histogram bucket, e.g. 'le_25ms' or 'gt_30000ms'."""
+    if index < len(STAGE_BUCKETS_MS):
+        return f'le_{STAGE_BUCKETS_MS[index]}ms'
+    return f'gt_{STAGE_BUCKETS_MS[-1]}ms'
+
+
+class StageHistogram:
+    """Latency histogram of one stage over STAGE_BUCKETS_MS."""
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(STAGE_BUCKETS_MS) + 1)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for index, bound in enumerate(STAGE_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, other: 'StageHistogram') -> None:
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the q-quantile, capped at the max sample."""
+        if not self.count:
+            return None
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= q * self.count:
+                if index < len(STAGE_BUCKETS_MS):
+                    return min(STAGE_BUCKETS_MS[index], round(self.max_ms, 3))
+                return round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class StageTimings:
+    """
+    Process wide collector of stage latencies and throughput counters.
+
+    The parse steps and Melissa lookups have no handle on the crawler, and may run in
+    pipeline threads, so they record here and the StageMetrics extension drains the
+    collected values into the Scrapy stats. Worker processes drain their own collector
+    and return the records with their result, to be merged into the crawler's.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, StageHistogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = StageHistogram()
+            histogram.add(seconds * 1000)
+
+    def count(self, counter: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def drain(self) -> Tuple[Dict[str, StageHistogram], Dict[str, int]]:
+        """
+        :return: The histograms and counters recorded since the last drain.
+        """
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            counters, self._counters = self._counters, {}
+        return histograms, counters
+
+    def merge(self, histograms: Dict[str, StageHistogram], counters: Dict[str, int]) -> None:
+        """Adds the result of another collector's drain, e.g. one returned by a worker process."""
+        with self._lock:
+            for stage, drained in histograms.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = StageHistogram()
+                histogram.merge(drained)
+            for counter, value in counters.items():
+                self._counters[counter] = self._counters.get(counter, 0) + value
+
+
+STAGE_TIMINGS = StageTimings()
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the wall time of the block as one `stage` sample, also when it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_TIMINGS.record(stage, time.perf_counter() - start)
+
+
+def count_event(counter: str, value: int = 1) -> None:
+    STAGE_TIMINGS.count(counter, value)
+
+
+def reset_stage_timings() -> None:
+    """
+    ProcessPoolExecutor initializer: forked workers start with a copy of the parent's
+    undrained records, which the parent reports itself.
+    """
+    STAGE_TIMINGS.drain()
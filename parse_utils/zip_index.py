@@ -0,0 +1,117 @@
+import os
+import pickle
+import threading
+from typing import Dict, FrozenSet, Optional, Tuple
+
+ZIPS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zips.txt')
+# Pickled index built from zips.txt, rebuilt whenever zips.txt is newer
+ZIP_INDEX_PATH = os.environ.get('ZIP_INDEX_PATH', os.path.splitext(ZIPS_PATH)[0] + '.idx.pickle')
+ZIP_INDEX_VERSION = 1
+# ZipIndex attributes saved in the pickled index
+ZIP_INDEX_FIELDS = ('zip_to_counties', 'county_to_zips', 'zip_states')
+
+
+class ZipIndex:
+    """
+    ZIP code / county lookups built once from zips.txt ("zip|County Name|ST" lines).
+
+    County keys are 'Name St' (e.g. 'Lorain Oh'), the form MelissaAPI has always used.
+    """
+    __slots__ = ZIP_INDEX_FIELDS + ('_zip_code_keys',)
+
+    def __init__(self, zip_to_counties: Dict[str, Tuple[str, ...]],
+                 county_to_zips: Dict[str, FrozenSet[str]], zip_states: Dict[str, str]):
+        self.zip_to_counties = zip_to_counties
+        self.county_to_zips = county_to_zips
+        self.zip_states = zip_states
+        self._zip_code_keys: Optional[Dict[str, dict]] = None
+
+    def county_of(self, zip_code: str) -> Optional[str]:
+        """County key of a ZIP code (the last listed one if it spans counties), None if unknown."""
+        counties = self.zip_to_counties.get(zip_code)
+        return counties[-1] if counties else None
+
+    def zips_of(self, county_key: str) -> FrozenSet[str]:
+        """ZIP codes of a county key, empty if unknown."""
+        return self.county_to_zips.get(county_key, frozenset())
+
+    @property
+    def zip_code_keys(self) -> Dict[str, dict]:
+        """zip -> {'county', 'state'} mapping in the shape of MelissaAPI.get_zip_codes, built on first use."""
+        if self._zip_code_keys is None:
+            self._zip_code_keys = {
+                zip_code: {'county': counties[-1], 'state': self.zip_states[zip_code]}
+                for zip_code, counties in self.zip_to_counties.items()
+            }
+        return self._zip_code_keys
+
+
+def county_key(county_name: str, state: str) -> str:
+    """Normalize a zips.txt county and state pair to a county key (e.g. 'Lorain County', 'OH' -> 'Lorain Oh')."""
+    county_name = county_name.replace(" County", "")
+    county_name = county_name.lower().replace(f" {state.lower()}", "").title()
+    return county_name + f" {state.title()}"
+
+
+def build_zip_index(zips_path: str = ZIPS_PATH) -> ZipIndex:
+    zip_to_counties: Dict[str, Tuple[str, ...]] = {}
+    county_to_zips: Dict[str, list] = {}
+    zip_states: Dict[str, str] = {}
+
+    with open(zips_path, 'r') as file:
+        for line in file.read().splitlines():
+            if not line:
+                continue
+            zip_code, county_name, state = line.split("|")
+            key = county_key(county_name, state)
+            county_to_zips.setdefault(key, []).append(zip_code)
+            zip_to_counties[zip_code] = zip_to_counties.get(zip_code, ()) + (key,)
+            zip_states[zip_code] = state.title()
+
+    return ZipIndex(
+        zip_to_counties,
+        {key: frozenset(zips) for key, zips in county_to_zips.items()},
+        zip_states
+    )
+
+
+def load_zip_index(zips_path: str = ZIPS_PATH, index_path: str = ZIP_INDEX_PATH) -> ZipIndex:
+    """
+    Load the pickled index, building and saving it first if it is missing or older than zips.txt.
+    A read-only location only costs the rebuild; the index is then kept in memory.
+    """
+    try:
+        if os.path.getmtime(index_path) >= os.path.getmtime(zips_path):
+            with open(index_path, 'rb') as file:
+                state = pickle.load(file)
+            if state.pop('version', None) == ZIP_INDEX_VERSION:
+                return ZipIndex(**state)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+        pass
+
+    index = build_zip_index(zips_path)
+    temp_path = f'{index_path}.{os.getpid()}.tmp'
+    # plain containers only, so the file does not depend on this module's import path
+    state = {name: getattr(index, name) for name in ZIP_INDEX_FIELDS}
+    state['version'] = ZIP_INDEX_VERSION
+    try:
+        with open(temp_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+    except OSError:
+        pass
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_zip_index() -> ZipIndex:
+    """The process wide ZipIndex, loaded on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_zip_index()
+    return _index
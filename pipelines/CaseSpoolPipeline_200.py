@@ -0,0 +1,234 @@
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from typing import Optional
+
+from scrapy.exceptions import DropItem, IgnoreRequest, NotConfigured
+from scrapy.utils.misc import load_object
+from twisted.internet import defer, task, threads
+
+from ..county.parse import parse_case_data
+from ..crawl_utils.state import state_path
+from ..parse_utils.packing import DOCKET_PACKING_MODES, pack_case
+
+try:
+    import fcntl
+except ImportError:  # Windows: open batches are not locked, give each crawl its own CASE_SPOOL_DIR
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BATCH_SUFFIX = '.jsonl.gz'
+
+
+def json_default(value):
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__dict__'):
+        return vars(value)
+    return str(value)
+
+
+def serialize_case(packed_case) -> bytes:
+    """One compact JSON line for a PackedCase or SharedDocketCase."""
+    return json.dumps(packed_case, default=json_default, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def lock_batch(file) -> bool:
+    """Take the exclusive lock an open batch holds. :return: False if another crawl holds it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def salvage_batch(path: str, target: str) -> Optional[int]:
+    """
+    Rewrite the complete lines of a batch left open by a crash into a valid batch file.
+    :return: The number of cases saved, None if the batch is still open in a running crawl.
+    """
+    try:
+        with open(path, 'rb') as raw:
+            # a live batch stays locked until it is sealed, and is gone from open/ by then
+            if not lock_batch(raw) or os.stat(path).st_ino != os.fstat(raw.fileno()).st_ino:
+                return None
+            lines = []
+            try:
+                with gzip.GzipFile(fileobj=raw, mode='rb') as file:
+                    for line in file:
+                        if line.endswith(b'\n'):
+                            lines.append(line)
+            except (EOFError, OSError, zlib.error):
+                pass
+            if lines:
+                with gzip.open(target, 'wb') as file:
+                    file.writelines(lines)
+            os.remove(path)
+    except FileNotFoundError:
+        return None
+    return len(lines)
+
+
+class CaseSpoolPipeline:
+    """
+    Groups PackedCases into compressed batch files on disk and hands whole batches to a sink.
+
+    Each item is parsed with parse_case_data and written as one JSON line into the open
+    gzip batch in `<CASE_SPOOL_DIR>/open`. Only the compressor's buffer is held in memory.
+    The item then goes on down the pipeline; a CompactCaseItem carries the PackedCase in
+    its `packed_case` field, so later stages do not parse it again. A batch is sealed into
+    `<CASE_SPOOL_DIR>/ready` once it holds CASE_SPOOL_BATCH_SIZE cases or
+    CASE_SPOOL_BATCH_BYTES compressed bytes, or has been open for CASE_SPOOL_BATCH_SECONDS.
+
+    Sealed batches go one at a time, in a thread, to CASE_SPOOL_SINK: the import path of a
+    callable taking the batch path. The spool is not enabled without one. A batch the
+    sink accepted is deleted (unless CASE_SPOOL_KEEP), and a failed one stays in `ready`
+    and is handed over again on the next run. Batches left open by a crash are salvaged
+    into `ready` when the next run starts; an open batch holds an exclusive lock, so
+    batches of crawls still running on the same directory are left alone.
+
+    With CASE_DOCKET_PACKING = 'shared' each line is a SharedDocketCase, which holds the
+    docket entries once instead of once per defendant; `expand_case_record` in
+    parse_utils/packing.py turns such a line back into the per party shape.
+
+    Enabled by CASE_SPOOL_ENABLED; CaseScraper.update_settings adds it to ITEM_PIPELINES.
+    """
+
+    def __init__(self, stats, directory: str, batch_size: int, batch_bytes: int,
+                 batch_seconds: float, sink, keep: bool = False, docket_packing: str = 'per_party'):
+        if docket_packing not in DOCKET_PACKING_MODES:
+            raise ValueError(f'CASE_DOCKET_PACKING must be one of {DOCKET_PACKING_MODES}, not {docket_packing!r}')
+        self.stats = stats
+        self.open_dir = os.path.join(directory, 'open')
+        self.ready_dir = os.path.join(directory, 'ready')
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.batch_seconds = batch_seconds
+        self.sink = sink
+        self.keep = keep
+        self.docket_packing = docket_packing
+
+        self.batch = None
+        self.batch_file = None
+        self.batch_path = None
+        self.batch_cases = 0
+        self.batch_opened = 0.0
+        self.sequence = 0
+        self.timer = None
+        self.uploads = defer.DeferredSemaphore(1)
+        self.pending = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('CASE_SPOOL_ENABLED', False):
+            raise NotConfigured
+        sink = settings.get('CASE_SPOOL_SINK')
+        if not sink:
+            # sealed batches would pile up in ready/ with nothing to deliver them
+            logger.error('CASE_SPOOL_ENABLED is set without a CASE_SPOOL_SINK, the spool stays disabled')
+            raise NotConfigured('CASE_SPOOL_SINK is not set')
+        return cls(
+            crawler.stats,
+            settings.get('CASE_SPOOL_DIR') or state_path(settings, 'spool'),
+            settings.getint('CASE_SPOOL_BATCH_SIZE', 0),
+            settings.getint('CASE_SPOOL_BATCH_BYTES', 8 * 1024 * 1024),
+            settings.getfloat('CASE_SPOOL_BATCH_SECONDS', 60),
+            load_object(sink),
+            settings.getbool('CASE_SPOOL_KEEP', False),
+            settings.get('CASE_DOCKET_PACKING', 'per_party')
+        )
+
+    def open_spider(self, spider) -> None:
+        # CASE_SPOOL_BATCH_SIZE falls back to the spider's case_package_size
+        self.batch_size = self.batch_size or getattr(spider, 'case_package_size', None) or 500
+        os.makedirs(self.open_dir, exist_ok=True)
+        os.makedirs(self.ready_dir, exist_ok=True)
+
+        for name in sorted(os.listdir(self.open_dir)):
+            saved = salvage_batch(os.path.join(self.open_dir, name), os.path.join(self.ready_dir, name))
+            if saved is not None:
+                logger.info(f'Salvaged {saved} spooled cases from unfinished batch {name}')
+        for name in sorted(os.listdir(self.ready_dir)):
+            if name.endswith(BATCH_SUFFIX):
+                self.hand_off(os.path.join(self.ready_dir, name))
+
+        if self.batch_seconds > 0:
+            self.timer = task.LoopingCall(self.seal_if_stale)
+            self.timer.start(min(self.batch_seconds, 5), now=False)
+
+    def process_item(self, item, spider):
+        try:
+            packed_case = parse_case_data(item, spider)
+        except IgnoreRequest as error:
+            raise DropItem(str(error))
+
+        self.write(serialize_case(pack_case(packed_case, self.docket_packing)))
+        if self.batch_cases >= self.batch_size or self.batch_file.tell() >= self.batch_bytes:
+            self.seal()
+        if 'packed_case' in item.fields:
+            item['packed_case'] = packed_case
+        return item
+
+    def write(self, line: bytes) -> None:
+        if self.batch is None:
+            self.sequence += 1
+            name = f'batch-{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}-{self.sequence:06d}{BATCH_SUFFIX}'
+            self.batch_path = os.path.join(self.open_dir, name)
+            self.batch_file = open(self.batch_path, 'wb')
+            lock_batch(self.batch_file)
+            self.batch = gzip.GzipFile(fileobj=self.batch_file, mode='wb')
+            self.batch_cases = 0
+            self.batch_opened = time.monotonic()
+        self.batch.write(line)
+        self.batch_cases += 1
+        self.stats.inc_value('case_spool/cases')
+
+    def seal(self) -> None:
+        """Close the open batch, move it to `ready` and hand it to the sink."""
+        if self.batch is None:
+            return
+        self.batch.close()
+        ready_path = os.path.join(self.ready_dir, os.path.basename(self.batch_path))
+        # moved while still locked, so a salvage never sees an unlocked batch in open/
+        os.replace(self.batch_path, ready_path)
+        self.batch_file.close()
+        self.batch = self.batch_file = self.batch_path = None
+        self.stats.inc_value('case_spool/batches')
+        self.hand_off(ready_path)
+
+    def seal_if_stale(self) -> None:
+        if self.batch is not None and time.monotonic() - self.batch_opened >= self.batch_seconds:
+            self.seal()
+
+    def hand_off(self, path: str) -> None:
+        deferred = self.uploads.run(threads.deferToThread, self.sink, path)
+        deferred.addCallbacks(self.sent, self.send_failed, callbackArgs=(path,), errbackArgs=(path,))
+        self.pending.add(deferred)
+        deferred.addBoth(self.settled, deferred)
+
+    def sent(self, result, path: str) -> None:
+        self.stats.inc_value('case_spool/batches_sent')
+        if not self.keep:
+            os.remove(path)
+
+    def send_failed(self, failure, path: str) -> None:
+        self.stats.inc_value('case_spool/batches_failed')
+        logger.error(f'Spool sink failed for {path}, it will be retried on the next run: {failure.value}')
+
+    def settled(self, result, deferred):
+        self.pending.discard(deferred)
+        return result
+
+    def close_spider(self, spider):
+        if self.timer is not None and self.timer.running:
+            self.timer.stop()
+        self.seal()
+        return defer.DeferredList(list(self.pending))
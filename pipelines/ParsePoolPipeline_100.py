@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from scrapy.exceptions import DropItem, NotConfigured
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from ..county.parse import parse_pooled_body
+from ..parse_utils.stage_timing import STAGE_TIMINGS, reset_stage_timings
+
+
+class ParsePoolPipeline:
+    """
+    Runs parse_case_data for CompactCaseItems on a ProcessPoolExecutor, so tree walking,
+    regexes and dataclass construction stay off the reactor thread.
+
+    The raw body and the item metadata go to a worker, which returns the PackedCase
+    and the stage timings it recorded, merged into STAGE_TIMINGS here. The PackedCase
+    is stored on the item's `packed_case` field, and parse_case_data returns it
+    unchanged when the Public Digital pipeline calls it. At most PARSE_POOL_QUEUE_DEPTH
+    items are in the pool at once. Further items wait in Scrapy's scraper slot, and once
+    that slot is full (SCRAPER_SLOT_MAX_ACTIVE_SIZE) Scrapy stops feeding new responses,
+    so downloads slow down to the speed of the pool.
+
+    Soup CaseItems and non civil pages are passed on untouched, and parse_case_data
+    handles them on the reactor thread as before. An item the worker failed on is
+    dropped with the worker's exception rather than parsed a second time.
+
+    Enabled by PARSE_POOL_ENABLED; CaseScraper.update_settings adds it to ITEM_PIPELINES.
+    """
+
+    def __init__(self, stats, workers: int, queue_depth: int, backend: str):
+        self.stats = stats
+        self.workers = workers
+        self.backend = backend
+        self.semaphore = defer.DeferredSemaphore(queue_depth)
+        self.executor = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('PARSE_POOL_ENABLED', False):
+            raise NotConfigured
+        workers = settings.getint('PARSE_POOL_WORKERS', 0) or os.cpu_count()
+        return cls(
+            crawler.stats,
+            workers,
+            settings.getint('PARSE_POOL_QUEUE_DEPTH', 0) or workers * 2,
+            settings.get('HTML_PARSER_BACKEND', 'bs4')
+        )
+
+    def open_spider(self, spider) -> None:
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=reset_stage_timings)
+
+    def close_spider(self, spider) -> None:
+        self.executor.shutdown(wait=True)
+
+    def process_item(self, item, spider):
+        if 'packed_case' not in item.fields or item.get('packed_case') is not None or item.get('body') is None:
+            return item
+        return self.semaphore.run(self.parse, item)
+
+    def parse(self, item) -> defer.Deferred:
+        from twisted.internet import reactor
+
+        future = self.executor.submit(
+            parse_pooled_body, item['body'], item.get('encoding'),
+            item['case_number'], item['link'], item['county'], self.backend
+        )
+        deferred = defer.Deferred()
+        future.add_done_callback(lambda done: reactor.callFromThread(self.resolve, deferred, done))
+        deferred.addCallbacks(self.parsed, self.parse_failed, callbackArgs=(item,), errbackArgs=(item,))
+        return deferred
+
+    @staticmethod
+    def resolve(deferred: defer.Deferred, future) -> None:
+        error = future.exception()
+        if error is None:
+            deferred.callback(future.result())
+        else:
+            deferred.errback(Failure(error))
+
+    def parsed(self, result, item):
+        packed_case, timings = result
+        STAGE_TIMINGS.merge(*timings)
+        if packed_case is None:
+            # not a civil case: parse_case_data raises IgnoreRequest for it as before
+            self.stats.inc_value('parse_pool/not_civil')
+            return item
+        self.stats.inc_value('parse_pool/parsed')
+        item['packed_case'] = packed_case
+        return item
+
+    def parse_failed(self, failure: Failure, item):
+        self.stats.inc_value('parse_pool/failed')
+        raise DropItem(
+            f'Parse pool failed on CaseID {item["case_number"]}: '
+            f'{type(failure.value).__name__}: {failure.value}'
+        )
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The spiders directory is mounted as a package inside the Docker image; the tests
+# import its subpackages (crawl_utils, parse_utils, ...) from the repository root.
+SPIDERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SPIDERS_DIR)
+
+
+@pytest.fixture(scope='session')
+def spiders_package() -> str:
+    """
+    Name of the spiders package, for modules that import across subpackages
+    (county.parse, pipelines, ...); imported as the crawler does, like run_benchmarks.py.
+    """
+    sys.path.insert(0, os.path.dirname(SPIDERS_DIR))
+    return os.path.basename(SPIDERS_DIR)
@@ -0,0 +1,43 @@
+import pytest
+
+from parse_utils.address_check import (
+    ADDRESS_BAD_ZIP, ADDRESS_IN_COUNTY, ADDRESS_MISSING, ADDRESS_OUTSIDE_COUNTY,
+    ADDRESS_STATE_MISMATCH, check_address, normalize_state
+)
+
+
+def party(**fields) -> dict:
+    return {'defendant': 'JOHN DOE', 'street': '100 Main St', 'city': 'Elyria',
+            'state': 'OH', 'zip_code': '44035', **fields}
+
+
+@pytest.mark.parametrize('state', ['OH', 'oh', 'Oh.', 'Ohio', ' OHIO ', '', None])
+def test_state_codes_and_names_match(state):
+    check = check_address(party(state=state), 'Lorain')
+    assert check.verified
+    assert check.reason == ADDRESS_IN_COUNTY
+    assert check.address['state'] == 'OH'
+    assert check.address['zip_code'] == '44035'
+
+
+@pytest.mark.parametrize('state', ['PA', 'Pennsylvania', 'West Virginia'])
+def test_other_states_do_not_match(state):
+    assert check_address(party(state=state), 'Lorain').reason == ADDRESS_STATE_MISMATCH
+
+
+def test_normalize_state():
+    assert normalize_state('North  Carolina') == 'NC'
+    assert normalize_state('Atlantis') == 'ATLANTIS'
+    assert normalize_state(None) == ''
+
+
+@pytest.mark.parametrize('fields, reason', [
+    ({'street': ''}, ADDRESS_MISSING),
+    ({'zip_code': '4403'}, ADDRESS_BAD_ZIP),
+    ({'zip_code': '44101'}, ADDRESS_OUTSIDE_COUNTY),
+])
+def test_unverified_addresses(fields, reason):
+    check = check_address(party(**fields), 'Lorain')
+    assert not check.verified
+    assert check.reason == reason
+    assert check.address is None
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+# parse_utils.datastructures imports the Public Digital dataclasses
+pytest.importorskip('public_digital')
+
+from parse_utils.parse_functions import case_fingerprint, case_number_from_bytes, element_from_bytes  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fixtures')
+NESTED_ROW = (
+    b'<tr><td>01/02/2023</td><td>JE</td><td><table><tr><td>NESTED NOTE</td></tr></table>'
+    b'JUDGMENT ENTRY</td></tr>'
+)
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return file.read()
+
+
+def with_nested_table(body: bytes) -> bytes:
+    marker = b'<tr class="gridPager">'
+    assert marker in body
+    return body.replace(marker, NESTED_ROW + marker, 1)
+
+
+def test_element_keeps_nested_tables():
+    results = element_from_bytes(with_nested_table(fixture('small.html')), 'dgrdResults')
+    assert b'NESTED NOTE' in results
+    assert b'JUDGMENT ENTRY' in results
+    assert b'gridPager' in results
+    assert results.count(b'<table') == results.count(b'</table')
+
+
+def test_fingerprint_sees_changes_after_a_nested_table():
+    body = with_nested_table(fixture('small.html'))
+    changed = body.replace(b'DEFAULT JUDGMENT GRANTED', b'DEFAULT JUDGMENT VACATED')
+    assert case_fingerprint(changed) != case_fingerprint(body)
+    pager_changed = body.replace(b'<span>1</span>', b'<span>2</span>', 1)
+    assert case_fingerprint(pager_changed) != case_fingerprint(body)
+
+
+def test_fingerprint_ignores_markup_outside_the_case():
+    body = fixture('typical.html')
+    assert case_fingerprint(body.replace(b'<br />', b'<br />\n  \n', 1)) == case_fingerprint(body)
+
+
+def test_unclosed_or_missing_elements():
+    assert element_from_bytes(b'<table id="dgrdResults"><tr><td>x</td></tr>', 'dgrdResults') is None
+    assert case_number_from_bytes(fixture('error_empty.html')) is None
+    assert case_number_from_bytes(fixture('small.html')) == '2023CVF00101'
@@ -0,0 +1,64 @@
+import gzip
+import importlib
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# the spool imports county.parse, which needs the Public Digital package
+pytest.importorskip('public_digital')
+
+from scrapy.exceptions import NotConfigured  # noqa: E402
+from scrapy.utils.test import get_crawler  # noqa: E402
+
+
+@pytest.fixture
+def spool_module(spiders_package):
+    return importlib.import_module(f'{spiders_package}.pipelines.CaseSpoolPipeline_200')
+
+
+@pytest.fixture
+def items_module(spiders_package):
+    return importlib.import_module(f'{spiders_package}.county.items')
+
+
+def test_spool_needs_a_sink(spool_module):
+    crawler = get_crawler(settings_dict={'CASE_SPOOL_ENABLED': True})
+    with pytest.raises(NotConfigured):
+        spool_module.CaseSpoolPipeline.from_crawler(crawler)
+
+
+def test_spool_is_off_by_default(spool_module):
+    with pytest.raises(NotConfigured):
+        spool_module.CaseSpoolPipeline.from_crawler(get_crawler(settings_dict={'CASE_SPOOL_SINK': 'os.path.exists'}))
+
+
+def test_spooled_items_go_on_down_the_pipeline(tmp_path, monkeypatch, spool_module, items_module):
+    packed_cases = {}
+
+    def parse_case_data(item, spider):
+        packed_cases[item['case_number']] = {'case': {'case_number_int_repr': item['case_number']}}
+        return packed_cases[item['case_number']]
+
+    monkeypatch.setattr(spool_module, 'parse_case_data', parse_case_data)
+    crawler = get_crawler(settings_dict={
+        'CASE_SPOOL_ENABLED': True, 'CASE_SPOOL_SINK': 'os.path.exists',
+        'CASE_SPOOL_DIR': str(tmp_path), 'CASE_SPOOL_BATCH_SECONDS': 0,
+    })
+    pipeline = spool_module.CaseSpoolPipeline.from_crawler(crawler)
+    handed_off = []
+    pipeline.hand_off = handed_off.append
+    pipeline.open_spider(SimpleNamespace(case_package_size=2))
+
+    for case_number in (1, 2, 3):
+        item = items_module.CompactCaseItem(case_number=case_number, body=b'', encoding='utf-8')
+        assert pipeline.process_item(item, None) is item
+        assert item['packed_case'] is packed_cases[case_number]
+    pipeline.close_spider(None)
+
+    assert [os.path.basename(os.path.dirname(path)) for path in handed_off] == ['ready', 'ready']
+    with gzip.open(handed_off[0]) as file:
+        assert [json.loads(line)['case']['case_number_int_repr'] for line in file] == [1, 2]
+    assert crawler.stats.get_value('case_spool/cases') == 3
+    assert crawler.stats.get_value('case_spool/batches') == 2
@@ -0,0 +1,105 @@
+from crawl_utils.case_window import CaseIDWindow
+
+
+def test_fill_issues_up_to_the_window_size():
+    window = CaseIDWindow(range(100, 110), size=3)
+    assert window.fill() == [100, 101, 102]
+    assert window.fill() == []
+    assert window.pending == [100, 101, 102]
+
+
+def test_out_of_order_completion_waits_for_the_lowest_open_case_id():
+    window = CaseIDWindow(range(100, 110), size=3)
+    window.fill()
+    assert window.complete(102, 'b') == []
+    assert window.complete(101, 'a') == []
+    assert window.low_water is None
+    assert window.completed_ahead == [101, 102]
+    # the slots only free once 100 is done
+    assert window.fill() == []
+
+    assert window.complete(100, 'x') == [(100, 'x'), (101, 'a'), (102, 'b')]
+    assert window.low_water == 102
+    assert window.completed_ahead == []
+    assert window.fill() == [103, 104, 105]
+
+
+def test_unknown_or_repeated_completions_are_ignored():
+    window = CaseIDWindow(range(100, 110), size=2)
+    window.fill()
+    assert window.complete(999) == []
+    assert window.complete(100) == [(100, None)]
+    assert window.complete(100) == []
+    assert window.low_water == 100
+
+
+def test_exhausted_source_finishes_the_window():
+    window = CaseIDWindow([1, 2], size=5)
+    assert window.fill() == [1, 2]
+    assert window.stopped and not window.finished
+    window.complete(2)
+    window.complete(1)
+    assert window.finished
+
+
+def test_stop_lets_open_case_ids_complete():
+    window = CaseIDWindow(range(10), size=2)
+    window.fill()
+    window.stop()
+    window.complete(0)
+    assert window.fill() == []
+    window.complete(1)
+    assert window.finished
+    assert window.low_water == 1
+
+
+def test_failed_case_ids_free_their_slot_but_are_kept_for_a_retry():
+    window = CaseIDWindow(range(100, 110), size=3)
+    window.fill()
+    window.complete(101, None, failed=True)
+    window.complete(102, False)
+    assert window.complete(100, True) == [(100, True), (101, None), (102, False)]
+    # low_water moves past the failure, the failure itself is remembered
+    assert window.low_water == 102
+    assert window.failed == {101}
+
+
+def test_a_failed_case_id_that_completes_later_leaves_the_failed_set():
+    window = CaseIDWindow([101, 200, 201], size=1, failed=[101])
+    assert window.failed == {101}
+    assert window.fill() == [101]
+    window.complete(101, True)
+    assert window.failed == set()
+
+    assert window.fill() == [200]
+    window.complete(200, None, failed=True)
+    assert window.fill() == [201]
+    window.complete(201, None, failed=True)
+    assert window.failed == {200, 201}
+    assert window.low_water == 201
+
+
+def test_resume_after_stops_at_the_last_case_that_was_not_empty():
+    window = CaseIDWindow(range(100, 110), size=4)
+    window.fill()
+    window.complete(100, False)
+    window.complete(101, None, failed=True)
+    window.complete(103, True, empty=True)
+    window.complete(102, True, empty=True)
+    assert window.low_water == 103
+    assert window.resume_after == 101
+
+    window.fill()
+    window.complete(104, False)
+    assert window.resume_after == 104
+
+
+def test_kept_ahead_leaves_out_empty_case_ids():
+    window = CaseIDWindow(range(100, 110), size=4)
+    window.fill()
+    window.complete(101, False)
+    window.complete(102, True, empty=True)
+    window.complete(103, None, failed=True)
+    assert window.completed_ahead == [101, 102, 103]
+    assert window.kept_ahead == [101, 103]
+    assert window.resume_after is None
@@ -0,0 +1,49 @@
+import sqlite3
+
+from crawl_utils.checkpoint import CrawlCheckpoint
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite3')
+    checkpoint = CrawlCheckpoint(path, 'walk', batch_size=100)
+    checkpoint.update(120, [125, 130], failed=[103, 117])
+    checkpoint.close()
+
+    resumed = CrawlCheckpoint(path, 'walk')
+    assert resumed.low_water == 120
+    assert resumed.completed == {125, 130}
+    assert resumed.failed == {103, 117}
+    assert CrawlCheckpoint(path, 'other walk').low_water is None
+
+
+def test_retried_case_ids_do_not_move_low_water_back(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoint.sqlite3'), 'walk')
+    checkpoint.update(200, [])
+    checkpoint.update(103, [], failed=[])
+    assert checkpoint.low_water == 200
+    assert checkpoint.failed == set()
+
+
+def test_failed_set_is_kept_when_not_given(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoint.sqlite3'), 'walk')
+    checkpoint.update(110, [], failed=[105])
+    checkpoint.update(111, [115])
+    assert checkpoint.failed == {105}
+    assert checkpoint.completed == {115}
+
+
+def test_checkpoints_from_before_the_failed_column_are_read(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite3')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE checkpoints (crawl_key TEXT PRIMARY KEY, low_water INTEGER, completed TEXT, updated_at REAL)'
+    )
+    connection.execute("INSERT INTO checkpoints VALUES ('walk', 50, '[55]', 0)")
+    connection.commit()
+    connection.close()
+
+    checkpoint = CrawlCheckpoint(path, 'walk')
+    assert (checkpoint.low_water, checkpoint.completed, checkpoint.failed) == (50, {55}, set())
+    checkpoint.update(60, [], failed=[52])
+    checkpoint.close()
+    assert CrawlCheckpoint(path, 'walk').failed == {52}
@@ -0,0 +1,59 @@
+from crawl_utils.circuit_breaker import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, CircuitBreaker
+
+
+def trip(breaker: CircuitBreaker) -> bool:
+    return any([breaker.record(False) for _ in range(breaker.threshold)])
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=10)
+    assert not breaker.record(False)
+    assert not breaker.record(False)
+    assert breaker.record(False)
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.trips == 1
+
+
+def test_a_success_resets_the_failure_count():
+    breaker = CircuitBreaker(threshold=3)
+    breaker.record(False)
+    breaker.record(False)
+    breaker.record(True)
+    assert not breaker.record(False)
+    assert not breaker.record(False)
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_results_are_ignored_while_open():
+    breaker = CircuitBreaker(threshold=2)
+    assert trip(breaker)
+    assert not breaker.record(False)
+    assert not breaker.record(True)
+    assert breaker.state == BREAKER_OPEN
+
+
+def test_half_open_success_closes_and_resets_the_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown=10, max_cooldown=100)
+    trip(breaker)
+    breaker.half_open()
+    assert breaker.record(False)
+    assert breaker.cooldown == 20
+    breaker.half_open()
+    assert not breaker.record(True)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.cooldown == 10
+
+
+def test_half_open_failure_reopens_with_a_doubled_capped_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown=30, max_cooldown=100)
+    trip(breaker)
+    cooldowns = []
+    for _ in range(4):
+        breaker.half_open()
+        assert breaker.state == BREAKER_HALF_OPEN
+        # a single failure is enough, the threshold only applies while closed
+        assert breaker.record(False)
+        assert breaker.state == BREAKER_OPEN
+        cooldowns.append(breaker.cooldown)
+    assert cooldowns == [60, 100, 100, 100]
+    assert breaker.trips == 5
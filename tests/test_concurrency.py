@@ -0,0 +1,123 @@
+import pytest
+
+from crawl_utils.concurrency import BACKOFF_DELAY_STEP, ConcurrencyController
+
+
+def run_window(controller, latency=0.1, errors=0, saturated=True):
+    """Feeds one full window; returns the action that closed it."""
+    actions = [
+        controller.observe(None if number < errors else latency, error=number < errors, saturated=saturated)
+        for number in range(controller.window)
+    ]
+    assert actions[:-1] == [None] * (controller.window - 1)
+    return actions[-1]
+
+
+def test_increases_one_step_while_saturated_and_flat():
+    controller = ConcurrencyController(4, window=5)
+    assert [run_window(controller) for _ in range(3)] == ['increase'] * 3
+    assert controller.concurrency == 7
+    assert controller.baseline == pytest.approx(0.1)
+
+
+def test_holds_when_the_slot_is_not_saturated():
+    controller = ConcurrencyController(4, window=5)
+    assert run_window(controller, saturated=False) == 'hold'
+    assert controller.concurrency == 4
+
+
+def test_one_saturated_response_marks_the_window():
+    controller = ConcurrencyController(4, window=3)
+    for saturated in (False, True, False):
+        action = controller.observe(0.1, saturated=saturated)
+    assert action == 'increase'
+
+
+def test_decreases_when_latency_climbs():
+    controller = ConcurrencyController(8, window=5, tolerance=1.5)
+    run_window(controller, latency=0.1)
+    assert run_window(controller, latency=0.2) == 'decrease'
+    assert controller.concurrency == 6
+    # flat again against the baseline of the first window
+    assert run_window(controller, latency=0.1) == 'increase'
+
+
+def test_decrease_at_min_concurrency_grows_the_delay():
+    controller = ConcurrencyController(1, window=5)
+    run_window(controller, latency=0.1, saturated=False)
+    assert run_window(controller, latency=1.0) == 'decrease'
+    assert (controller.concurrency, controller.delay) == (1, BACKOFF_DELAY_STEP)
+    assert run_window(controller, latency=1.0) == 'decrease'
+    assert controller.delay == pytest.approx(BACKOFF_DELAY_STEP * 1.5)
+
+
+def test_backs_off_on_errors_then_relaxes_the_delay():
+    controller = ConcurrencyController(8, window=10, max_error_rate=0.05)
+    assert run_window(controller, errors=1) == 'backoff'
+    assert (controller.concurrency, controller.delay, controller.error_rate) == (4, BACKOFF_DELAY_STEP, 0.1)
+    assert run_window(controller, errors=2) == 'backoff'
+    assert (controller.concurrency, controller.delay) == (2, BACKOFF_DELAY_STEP * 2)
+
+    assert run_window(controller) == 'relax'
+    assert controller.delay == BACKOFF_DELAY_STEP
+    assert run_window(controller) == 'relax'
+    assert run_window(controller) == 'relax'
+    assert controller.delay == 0
+    assert run_window(controller) == 'increase'
+
+
+def test_clamps_to_the_limits():
+    controller = ConcurrencyController(50, delay=100, min_concurrency=2, max_concurrency=6,
+                                       min_delay=0.5, max_delay=4, window=4)
+    assert (controller.concurrency, controller.delay) == (6, 4)
+
+    for _ in range(5):
+        run_window(controller, errors=4)
+    assert (controller.concurrency, controller.delay) == (2, 4)
+
+    for _ in range(10):
+        run_window(controller)
+    assert (controller.concurrency, controller.delay) == (6, 0.5)
+    assert run_window(controller) == 'hold'
+
+
+def test_min_delay_is_never_relaxed_away():
+    controller = ConcurrencyController(2, delay=0, min_delay=1.0, window=2)
+    assert controller.delay == 1.0
+    assert run_window(controller) == 'increase'
+    assert controller.delay == 1.0
+
+
+def test_baseline_drifts_up_with_a_slower_server():
+    controller = ConcurrencyController(4, window=2, tolerance=1.5, baseline_drift=0.1)
+    run_window(controller, latency=0.1)
+    for _ in range(10):
+        assert run_window(controller, latency=0.14) == 'increase'
+    assert controller.baseline == pytest.approx(0.14)
+
+
+def test_middleware_counts_the_finished_request_as_in_flight(spiders_package):
+    import importlib
+    from types import SimpleNamespace
+
+    from scrapy.http import HtmlResponse, Request
+    from scrapy.utils.test import get_crawler
+
+    module = importlib.import_module(f'{spiders_package}.middlewares.AdaptiveConcurrency_560')
+    crawler = get_crawler(settings_dict={
+        'ADAPTIVE_CONCURRENCY_ENABLED': True, 'ADAPTIVE_CONCURRENCY_START': 2, 'ADAPTIVE_CONCURRENCY_WINDOW': 3,
+    })
+    slot = SimpleNamespace(active=set(), concurrency=2, delay=0.0)
+    crawler.engine = SimpleNamespace(downloader=SimpleNamespace(slots={'court': slot}))
+    middleware = module.AdaptiveConcurrency.from_crawler(crawler)
+
+    other = Request('https://example.invalid/Docket.aspx?CaseID=2')
+    for case_id in (1, 3, 4):
+        request = Request(f'https://example.invalid/Docket.aspx?CaseID={case_id}',
+                          meta={'download_slot': 'court', 'download_latency': 0.1})
+        # the finished request has left slot.active, the other one is still downloading
+        slot.active = {other}
+        response = HtmlResponse(request.url, body=b'<html>case</html>', request=request)
+        middleware.process_response(request, response, None)
+    assert slot.concurrency == 3
+    assert crawler.stats.get_value('adaptive_concurrency/court/increase') == 1
@@ -0,0 +1,51 @@
+import random
+from datetime import datetime
+
+import pytest
+
+# parse_utils.datastructures imports the Public Digital dataclasses
+pytest.importorskip('public_digital')
+
+from parse_utils.dates import DATE_FORMATS, is_mmddyyyy, normalize_date  # noqa: E402
+
+
+def strptime_normalize(date_str):
+    """What DocketProcessor did before the fast parser"""
+    for date_format, _ in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).strftime('%m/%d/%Y')
+        except ValueError:
+            continue
+    return None
+
+
+def strptime_is_mmddyyyy(date_str):
+    try:
+        datetime.strptime(date_str, '%m/%d/%Y')
+        return True
+    except ValueError:
+        return False
+
+
+@pytest.mark.parametrize('date_str', [
+    '01/02/2023', '1/2/2023', '12/31/1999', '02/29/2024', '02/29/2023', '13/01/2023',
+    '00/10/2023', '1/2/23', '1/2/68', '1/2/69', '1/1/0999', '01/01/0000', ' 1/ 2/2023',
+    '1/2/2023 ', '01/02/20233', 'January 5, 2023', 'january 05, 2023', 'MAY 1, 2020',
+    'Sept 1, 2020', 'March  3,   2021', 'February 30, 2020', 'set for', '', '01-02-2023',
+])
+def test_matches_strptime(date_str):
+    assert normalize_date(date_str) == strptime_normalize(date_str)
+    assert is_mmddyyyy(date_str) == strptime_is_mmddyyyy(date_str)
+
+
+def test_matches_strptime_on_random_strings():
+    rng = random.Random(7)
+    pieces = [
+        '0', '1', '01', '2', '02', '9', '12', '13', '28', '29', '30', '31', '32', '/', '/',
+        ',', ' ', '  ', '\t', '23', '68', '69', '99', '00', '0999', '1900', '2024', '9999',
+        'January', 'february', 'MAY', 'Sept', 'x',
+    ]
+    for _ in range(20000):
+        date_str = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 6)))
+        assert normalize_date(date_str) == strptime_normalize(date_str), repr(date_str)
+        assert is_mmddyyyy(date_str) == strptime_is_mmddyyyy(date_str), repr(date_str)
@@ -0,0 +1,85 @@
+import os
+import random
+
+import pytest
+
+# parse_utils.datastructures imports the Public Digital dataclasses
+pytest.importorskip('public_digital')
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from parse_utils.parse_classes import DocketColumns, DocketProcessor  # noqa: E402
+from parse_utils.parse_functions import parse_docket_columns  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fixtures')
+# The rules in the order the processor applied every one of them to every entry
+RULE_CHAIN = (
+    'bankruptcy_test', 'process_hearing_date', 'parse_served_status',
+    'judgment_test', 'parse_garn_status', 'test_dismissed',
+)
+# Entries that trip several rules, or a keyword without the rule's full pattern
+CRAFTED_ENTRIES = (
+    'JUDGMENT GRANTED FOR $1200.50, ORDER OF GARNISHMENT ISSUED SEE JR.ACME CORP',
+    'CASE DISMISSED WITHOUT PREJUDICE, BANKRUPTCY NOTICE FILED; HEARING SET FOR 10/14/2024',
+    'PROCESS SERVER RETURN:   PERSONAL SERVICE, HEARING CONTINUED TO March 3, 2024',
+    'Signed Receipt for Certified Mail Returned and Filed - JUDGMENT RENDERED $55 AND $5500.00',
+    'PERSONAL EARNINGS GARNISHMENT DISMISSED FOR WANT OF PROSECUTION',
+    'DISMISSED PENDING BANKRUPTCYS',
+    'JUDGE ASSIGNED; PROCESS SERVER APPOINTED; SIGNED RECEIPT MISSING',
+    'HEARING SET FOR LATER, CONTINUED TO 13/45/2024',
+    'bankruptcy discharged. judgment award vacated. dismissed w/o prejudice',
+    'NOTICE OF FILING',
+)
+
+
+def fixture_columns(name: str) -> DocketColumns:
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return parse_docket_columns(BeautifulSoup(file.read(), 'html.parser'))
+
+
+def crafted_columns(seed: int) -> DocketColumns:
+    randomizer = random.Random(seed)
+    columns = DocketColumns()
+    for unique_id in range(60):
+        columns.append(
+            f'{randomizer.randint(1, 12):02d}/{randomizer.randint(1, 28):02d}/20{randomizer.randint(10, 24)}',
+            randomizer.choice(('JE', 'HR', 'SR', 'MO')), randomizer.choice(CRAFTED_ENTRIES), unique_id
+        )
+    return columns
+
+
+def rule_chain(columns: DocketColumns):
+    """The rule chain as it was: every rule on every entry, in order"""
+    processor = DocketProcessor({'case_number': 'X'}, 'PLAINTIFF')
+    for entry in columns.as_dicts():
+        for rule in RULE_CHAIN:
+            getattr(processor, rule)(entry)
+    return processor.case_data, processor.case_party_data
+
+
+def dispatched(dockets):
+    return DocketProcessor({'case_number': 'X'}, 'PLAINTIFF').process_entries(dockets)
+
+
+@pytest.mark.parametrize('name', ['small.html', 'typical.html', 'huge.html'])
+def test_fixture_dockets_match_the_rule_chain(name):
+    columns = fixture_columns(name)
+    assert len(columns)
+    expected = rule_chain(columns)
+    assert dispatched(columns) == expected
+    assert dispatched(columns.as_dicts()) == expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_entries_with_several_keywords_match_the_rule_chain(seed):
+    columns = crafted_columns(seed)
+    expected = rule_chain(columns)
+    assert dispatched(columns) == expected
+    assert dispatched(columns.as_dicts()) == expected
+
+
+@pytest.mark.parametrize('entry', CRAFTED_ENTRIES)
+def test_single_entries_match_the_rule_chain(entry):
+    columns = DocketColumns()
+    columns.append('01/02/2023', 'JE', entry, 1)
+    assert dispatched(columns) == rule_chain(columns)
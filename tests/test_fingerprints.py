@@ -0,0 +1,20 @@
+from crawl_utils.fingerprints import FingerprintStore
+
+
+def test_unchanged_does_not_store(tmp_path):
+    store = FingerprintStore(str(tmp_path / 'fingerprints.sqlite3'))
+    assert not store.unchanged(101, 'abc')
+    # nothing was delivered, so the page is still changed next time
+    assert not store.unchanged(101, 'abc')
+    assert store.get(101) is None
+
+
+def test_stored_fingerprints_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'fingerprints.sqlite3')
+    store = FingerprintStore(path, batch_size=100)
+    store.store(101, 'abc')
+    store.close()
+
+    store = FingerprintStore(path)
+    assert store.unchanged(101, 'abc')
+    assert not store.unchanged(101, 'def')
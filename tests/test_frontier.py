@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from crawl_utils.frontier import FrontierSearch
+
+
+def run_search(search: FrontierSearch, live_ids) -> list:
+    """Drive a search against a set of live CaseIDs; returns every CaseID fetched."""
+    fetched = []
+    probes = search.next_probes()
+    while probes:
+        for case_id in probes:
+            fetched.append(case_id)
+            search.record(case_id, case_id in live_ids)
+        probes = search.next_probes()
+    return fetched
+
+
+def test_dense_range_finds_last_live_case():
+    search = FrontierSearch(1000, gap=20)
+    run_search(search, set(range(1000, 1437)))
+    assert search.done
+    assert search.frontier == 1436
+
+
+def test_sparse_gaps_shorter_than_tolerance_are_crossed():
+    live = set(range(1000, 1200, 7)) | set(range(1200, 1500, 19))
+    search = FrontierSearch(1000, gap=20)
+    run_search(search, live)
+    assert search.frontier == max(live)
+
+
+def test_no_live_case_above_start():
+    search = FrontierSearch(500, gap=10)
+    fetched = run_search(search, {500})
+    assert search.frontier == 500
+    assert all(case_id > 500 for case_id in fetched)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_sparse_ranges(seed):
+    rng = random.Random(seed)
+    gap = rng.randint(5, 30)
+    live, case_id = set(), 10000
+    for _ in range(rng.randint(1, 400)):
+        live.add(case_id)
+        # runs of empty CaseIDs below the frontier stay shorter than the gap
+        case_id += rng.randint(1, gap)
+    search = FrontierSearch(10000, gap=gap)
+    run_search(search, live)
+    assert search.frontier == max(live)
+
+
+def test_long_range_needs_few_probes():
+    search = FrontierSearch(0, gap=20)
+    fetched = run_search(search, set(range(0, 100000)))
+    assert search.frontier == 99999
+    assert len(fetched) < 500
+
+
+def test_probes_are_not_reissued_while_in_flight():
+    search = FrontierSearch(0, gap=5)
+    first = search.next_probes()
+    assert first == [5]
+    assert search.next_probes() == []
+    search.record(5, False)
+    block = search.next_probes()
+    assert block == [6, 7, 8, 9]
+    assert search.next_probes() == []
+
@@ -0,0 +1,55 @@
+import dataclasses
+import importlib
+import os
+
+import pytest
+
+# county.parse imports the Public Digital dataclasses and items
+pytest.importorskip('public_digital')
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from parse_utils import html_backends  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fixtures')
+CASE_FIXTURES = ('small.html', 'typical.html', 'huge.html')
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return file.read()
+
+
+def as_plain(value):
+    """A PackedCase as nested dicts and lists, so two parses can be compared"""
+    if dataclasses.is_dataclass(value):
+        return as_plain(dataclasses.asdict(value))
+    if isinstance(value, dict):
+        return {key: as_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [as_plain(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return as_plain(vars(value))
+    return value
+
+
+def test_bs4_keeps_html_parser_by_default(monkeypatch):
+    monkeypatch.delenv('BS4_PARSER', raising=False)
+    assert importlib.reload(html_backends).BS4_PARSER == 'html.parser'
+
+
+@pytest.mark.parametrize('name', CASE_FIXTURES)
+def test_backends_parse_the_same_case(spiders_package, name):
+    parse = importlib.import_module(f'{spiders_package}.county.parse')
+    backends = importlib.import_module(f'{spiders_package}.parse_utils.html_backends')
+    html = fixture(name)
+
+    def parsed(soup):
+        return as_plain(parse.parse_case_document(soup, 410001, 'http://localhost/Docket.aspx', 'Lorain'))
+
+    expected = parsed(BeautifulSoup(html, 'html.parser'))
+    assert expected
+    for backend in ('bs4', 'lxml', 'selectolax'):
+        if backend == 'selectolax' and backends.HTMLParser is None:
+            continue
+        assert parsed(backends.build_document(html, backend)) == expected, backend
@@ -0,0 +1,71 @@
+import json
+from dataclasses import asdict
+
+import pytest
+
+# packing builds on the Public Digital dataclasses
+pytest.importorskip('public_digital')
+
+from public_digital.dataclasses.base_dataclasses import Case, CaseDocket, CaseParty, PackedCase  # noqa: E402
+
+from parse_utils.packing import (  # noqa: E402
+    PER_PARTY_DOCKETS, SHARED_DOCKETS, SharedDocketCase, expand_case_record, pack_case
+)
+
+
+def dockets(count: int, prefix: str = 'ENTRY'):
+    return [
+        CaseDocket(date_time=f'01/{number + 1:02d}/2023', type='JE', entry=f'{prefix} {number}', unique_id=number)
+        for number in range(count)
+    ]
+
+
+def make_case(*party_dockets) -> PackedCase:
+    case = Case(case_number='2023CVF00001', case_number_int_repr=1, county='Lorain', amount=1250.5)
+    return PackedCase(case, [
+        CaseParty(defendant=f'DEFENDANT {number}', state='OH', docket_entries=entries)
+        for number, entries in enumerate(party_dockets)
+    ])
+
+
+def as_record(packed) -> dict:
+    """The JSON line the spool writes for a PackedCase or SharedDocketCase."""
+    return json.loads(json.dumps(asdict(packed)))
+
+
+shared = dockets(5)
+CASES = {
+    'shared': make_case(shared, shared, shared),
+    'equal copies': make_case(shared, dockets(5), dockets(5)),
+    'unshared': make_case(shared, dockets(3, 'OWN'), shared),
+    'first unshared': make_case(dockets(2, 'FIRST'), shared, shared),
+    'empty dockets': make_case([], [], shared),
+    'single party': make_case(shared),
+    'no parties': make_case(),
+}
+
+
+@pytest.mark.parametrize('name', CASES)
+@pytest.mark.parametrize('mode', [PER_PARTY_DOCKETS, SHARED_DOCKETS])
+def test_expand_record_round_trip(name, mode):
+    packed_case = CASES[name]
+    assert expand_case_record(as_record(pack_case(packed_case, mode))) == as_record(packed_case)
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_expand_round_trip(name):
+    packed_case = CASES[name]
+    assert pack_case(packed_case, SHARED_DOCKETS).expand() == packed_case
+
+
+def test_shared_dockets_are_written_once():
+    packed = pack_case(CASES['unshared'], SHARED_DOCKETS)
+    assert isinstance(packed, SharedDocketCase)
+    assert packed.docket_entries == shared
+    assert [party.docket_entries for party in packed.case_parties] == [None, dockets(3, 'OWN'), None]
+    assert json.dumps(as_record(packed)).count('"ENTRY 0"') == 1
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        pack_case(CASES['shared'], 'zipped')
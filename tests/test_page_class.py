@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from crawl_utils.page_class import (
+    PAGE_CASE, PAGE_EMPTY, PAGE_SERVER_ERROR, PAGE_THROTTLED, PAGE_UNKNOWN, classify_page
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fixtures')
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return file.read()
+
+
+@pytest.mark.parametrize('name, page_class', [
+    ('small.html', PAGE_CASE),
+    ('typical.html', PAGE_CASE),
+    ('non_civil.html', PAGE_CASE),
+    ('error_empty.html', PAGE_EMPTY),
+    ('error_server.html', PAGE_SERVER_ERROR),
+])
+def test_fixture_pages(name, page_class):
+    assert classify_page(200, fixture(name)) == page_class
+
+
+@pytest.mark.parametrize('marker', [
+    b'Too Many Requests for Admissions',
+    b'The service is unavailable',
+    b"Server Error in '/' Application",
+    b'An exception has occured',
+])
+def test_docket_text_does_not_make_a_case_an_error(marker):
+    body = fixture('small.html').replace(b'</table>', b'<td>' + marker + b'</td></table>', 1)
+    assert marker in body
+    assert classify_page(200, body) == PAGE_CASE
+
+
+@pytest.mark.parametrize('body', [
+    b'<html><body><h1>Server Too Busy</h1></body></html>',
+    b'<html><body>The service is unavailable.</body></html>',
+    b'<html><body>Too Many Requests</body></html>',
+])
+def test_throttle_pages(body):
+    assert classify_page(200, body) == PAGE_THROTTLED
+
+
+@pytest.mark.parametrize('status, page_class', [
+    (429, PAGE_THROTTLED),
+    (503, PAGE_THROTTLED),
+    (500, PAGE_SERVER_ERROR),
+    (502, PAGE_SERVER_ERROR),
+])
+def test_error_statuses_win_over_the_body(status, page_class):
+    assert classify_page(status, fixture('small.html')) == page_class
+
+
+def test_other_exceptions_are_server_errors():
+    body = b'<span id="lblError">An exception has occured: System.Data.SqlClient.SqlException: Timeout expired.</span>'
+    assert classify_page(200, body) == PAGE_SERVER_ERROR
+
+
+def test_pages_without_markers_are_unknown():
+    assert classify_page(200, b'<html><body>Case Search</body></html>') == PAGE_UNKNOWN
+    assert classify_page(200, None) == PAGE_UNKNOWN
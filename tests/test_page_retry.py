@@ -0,0 +1,85 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+from twisted.internet import task
+
+SERVER_ERROR = b"<html><h1>Server Error in '/' Application.</h1></html>"
+
+
+@pytest.fixture
+def middleware(spiders_package, monkeypatch):
+    """A PageClassifier on a fake clock and engine, the retries the engine got in `crawled`"""
+    module = importlib.import_module(f'{spiders_package}.middlewares.PageClassifier_555')
+    clock = task.Clock()
+    monkeypatch.setattr('twisted.internet.reactor.callLater', clock.callLater)
+    crawler = get_crawler(settings_dict={
+        'PAGE_RETRY_TIMES': 2, 'PAGE_RETRY_BACKOFF_BASE': 1, 'PAGE_BREAKER_THRESHOLD': 0,
+    })
+    crawled = []
+    crawler.engine = SimpleNamespace(crawl=crawled.append)
+    middleware = module.PageClassifier.from_crawler(crawler)
+    return SimpleNamespace(middleware=middleware, clock=clock, crawled=crawled, stats=crawler.stats,
+                           RetryScheduled=module.RetryScheduled)
+
+
+def respond(middleware, request, body=SERVER_ERROR, status=500, headers=None):
+    response = HtmlResponse(request.url, status=status, body=body, headers=headers, request=request)
+    return middleware.process_response(request, response, None)
+
+
+def test_case_pages_pass_through(middleware):
+    request = Request('https://example.invalid/Docket.aspx?CaseID=1')
+    response = respond(middleware.middleware, request, b'<span id="lblCaseNumber">2023CVF00001</span>', 200)
+    assert response.request is request
+    assert request.meta['page_class'] == 'case'
+
+
+def test_retry_waits_on_a_timer_not_in_the_download(middleware):
+    request = Request('https://example.invalid/Docket.aspx?CaseID=1', priority=5)
+    with pytest.raises(middleware.RetryScheduled):
+        respond(middleware.middleware, request)
+    assert middleware.crawled == []
+    with pytest.raises(DontCloseSpider):
+        middleware.middleware.spider_idle(None)
+
+    middleware.clock.advance(1)
+    assert [retry.meta['page_retry_times'] for retry in middleware.crawled] == [1]
+    retry = middleware.crawled[0]
+    assert (retry.url, retry.priority, retry.dont_filter) == (request.url, 4, True)
+    middleware.middleware.spider_idle(None)
+
+
+def test_retry_after_header_wins(middleware):
+    request = Request('https://example.invalid/Docket.aspx?CaseID=1')
+    with pytest.raises(middleware.RetryScheduled):
+        respond(middleware.middleware, request, b'Too Many Requests', 429, {'Retry-After': '30'})
+    middleware.clock.advance(29)
+    assert middleware.crawled == []
+    middleware.clock.advance(1)
+    assert len(middleware.crawled) == 1
+
+
+def test_gives_up_after_page_retry_times(middleware):
+    request = Request('https://example.invalid/Docket.aspx?CaseID=1')
+    for _ in range(2):
+        with pytest.raises(middleware.RetryScheduled):
+            respond(middleware.middleware, request)
+        middleware.clock.advance(60)
+        request = middleware.crawled[-1]
+    with pytest.raises(IgnoreRequest) as raised:
+        respond(middleware.middleware, request)
+    assert not isinstance(raised.value, middleware.RetryScheduled)
+    assert middleware.stats.get_value('page_retry/count') == 2
+    assert middleware.stats.get_value('page_retry/max_reached') == 1
+
+
+def test_waiting_retries_are_cancelled_on_close(middleware):
+    with pytest.raises(middleware.RetryScheduled):
+        respond(middleware.middleware, Request('https://example.invalid/Docket.aspx?CaseID=1'))
+    middleware.middleware.spider_closed(None)
+    middleware.clock.advance(60)
+    assert middleware.crawled == []
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from parse_utils import melissa_address_search as melissa
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Replaces the Melissa lookup with one that records its queries and concurrency"""
+    monkeypatch.setattr(melissa, 'MELISSA_USERNAME', 'user')
+    monkeypatch.setattr(melissa, 'MELISSA_PASSWORD', 'secret')
+    calls = {'queries': [], 'running': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def lookup_personator(name, state, county, zip_codes=None):
+        with lock:
+            calls['queries'].append((name, state, county, zip_codes))
+            calls['running'] += 1
+            calls['peak'] = max(calls['peak'], calls['running'])
+        time.sleep(0.01)
+        with lock:
+            calls['running'] -= 1
+        query = {'name': name, 'state': state, 'county': county, 'zip_codes': zip_codes}
+        return melissa.PersonatorResult(query=query, address={'name': name})
+
+    monkeypatch.setattr(melissa, 'lookup_personator', lookup_personator)
+    return calls
+
+
+def test_incomplete_queries_are_not_sent(lookups):
+    results = melissa.search_personator_batch([
+        ('JOHN DOE', 'OH', 'Lorain'),
+        ('JANE DOE',),
+        (None, 'OH', 'Lorain', ['44035']),
+        ('MARY ROE', 'OH', 'Lorain', ['44035']),
+    ])
+    assert results == [{'name': 'JOHN DOE'}, '', '', {'name': 'MARY ROE'}]
+    assert sorted(lookups['queries']) == [
+        ('JOHN DOE', 'OH', 'Lorain', None), ('MARY ROE', 'OH', 'Lorain', ['44035'])
+    ]
+
+
+def test_only_incomplete_queries(lookups):
+    assert melissa.search_personator_batch([('JANE DOE',), ()]) == ['', '']
+    assert melissa.search_personator_batch([]) == []
+    assert lookups['queries'] == []
+
+
+def test_workers_never_exceed_the_connection_pool(lookups):
+    queries = [(f'PERSON {number}', 'OH', 'Lorain') for number in range(melissa.MELISSA_POOL_SIZE * 4)]
+    results = melissa.search_personator_batch(queries, max_workers=melissa.MELISSA_POOL_SIZE * 4)
+    assert [result['name'] for result in results] == [query[0] for query in queries]
+    assert lookups['peak'] <= melissa.MELISSA_POOL_SIZE
+
+
+@pytest.mark.parametrize('party', [
+    {'defendant': None, 'street': '100 Main St', 'city': 'Elyria', 'state': 'OH', 'zip_code': '44101'},
+    {'defendant': '  ', 'street': '100 Main St', 'city': 'Elyria', 'state': 'OH', 'zip_code': '44101'},
+    {'defendant': 'JOHN DOE', 'street': None, 'city': None, 'state': 'OH', 'zip_code': None},
+    {'defendant': 'JOHN DOE'},
+])
+def test_unsearchable_defendants_are_not_sent(lookups, party):
+    result = melissa.lookup_defendant(party, 'Lorain')
+    assert result.address == ''
+    assert not result.verified_locally
+    assert lookups['queries'] == []
+
+
+def test_defendant_outside_county_is_sent(lookups):
+    party = {'defendant': 'JOHN DOE', 'street': '100 Main St', 'city': 'Cleveland', 'state': 'OH',
+             'zip_code': '44101'}
+    result = melissa.lookup_defendant(party, 'Lorain')
+    assert result.address == {'name': 'JOHN DOE'}
+    assert lookups['queries'] == [('JOHN DOE', 'OH', 'Lorain', None)]
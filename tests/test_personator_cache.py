@@ -0,0 +1,113 @@
+import importlib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from parse_utils import personator_cache
+from parse_utils.personator_cache import PersonatorCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock in place of time.time() inside personator_cache"""
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(personator_cache, 'time', SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = PersonatorCache(str(tmp_path / 'cache.sqlite3'), ttl=100, negative_ttl=10,
+                            max_entries=3, prune_interval=1000)
+    yield cache
+    cache.close()
+
+
+def count_rows(cache):
+    return cache.connection.execute('SELECT COUNT(*) FROM personator_cache').fetchone()[0]
+
+
+def test_make_key_normalizes_lookups():
+    assert PersonatorCache.make_key(' John  DOE ', 'oh', 'Lorain ', ['44035', '44001']) == \
+        PersonatorCache.make_key('john doe', 'OH', 'lorain', ('44001', '44035 '))
+    assert PersonatorCache.make_key('john doe', 'OH', 'lorain') != \
+        PersonatorCache.make_key('john doe', 'OH', 'lorain', ['44035'])
+
+
+def test_positive_entry_expires_after_ttl(cache, clock):
+    cache.set('key', {'street': '1 MAIN ST'})
+    clock.now += 100
+    assert cache.get('key') == (True, {'street': '1 MAIN ST'})
+    clock.now += 1
+    assert cache.get('key') == (False, None)
+    assert count_rows(cache) == 0
+    assert cache.stats() == {'hits': 1, 'negative_hits': 0, 'misses': 1}
+
+
+def test_negative_entry_expires_after_negative_ttl(cache, clock):
+    cache.set('key', '')
+    clock.now += 10
+    assert cache.get('key') == (True, '')
+    clock.now += 1
+    assert cache.get('key') == (False, None)
+    assert cache.stats() == {'hits': 1, 'negative_hits': 1, 'misses': 1}
+
+
+def test_ttl_counts_from_the_insert_not_the_last_use(cache, clock):
+    cache.set('key', {'street': '1 MAIN ST'})
+    for _ in range(3):
+        clock.now += 40
+        found, _ = cache.get('key')
+    assert not found
+
+
+def test_prune_evicts_least_recently_used(cache, clock):
+    for key in 'abcde':
+        clock.now += 1
+        cache.set(key, {'key': key})
+    clock.now += 1
+    assert cache.get('a')[0] and cache.get('b')[0]
+    cache.prune()
+    assert count_rows(cache) == 3
+    assert [cache.get(key)[0] for key in 'abcde'] == [True, True, False, False, True]
+
+
+def test_prune_runs_every_prune_interval_inserts(tmp_path, clock):
+    cache = PersonatorCache(str(tmp_path / 'cache.sqlite3'), max_entries=2, prune_interval=4)
+    for number in range(3):
+        clock.now += 1
+        cache.set(str(number), {'n': number})
+    assert count_rows(cache) == 3
+    clock.now += 1
+    cache.set('3', {'n': 3})
+    assert count_rows(cache) == 2
+    assert cache.get('3') == (True, {'n': 3}) and cache.get('2') == (True, {'n': 2})
+    cache.close()
+
+
+def test_close_prunes(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = PersonatorCache(path, max_entries=1)
+    cache.set('a', {'n': 1})
+    clock.now += 1
+    cache.set('b', {'n': 2})
+    cache.close()
+    cache = PersonatorCache(path, max_entries=1)
+    assert count_rows(cache) == 1
+    assert cache.get('b') == (True, {'n': 2})
+    cache.close()
+
+
+def test_default_path_is_inside_the_crawl_state_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv('MELISSA_CACHE_PATH', raising=False)
+    monkeypatch.setenv('CRAWL_STATE_DIR', str(tmp_path / 'state'))
+    try:
+        module = importlib.reload(personator_cache)
+        assert module.MELISSA_CACHE_PATH == str(tmp_path / 'state' / 'melissa_cache.sqlite3')
+        cache = module.get_personator_cache()
+        assert os.path.exists(module.MELISSA_CACHE_PATH)
+        cache.close()
+    finally:
+        monkeypatch.undo()
+        importlib.reload(personator_cache)
@@ -0,0 +1,89 @@
+from crawl_utils.range_index import CaseTypeRangeIndex
+
+
+def make_index(tmp_path, **kwargs):
+    options = dict(min_run=3, sample_rate=0.25, max_skip=10, batch_size=1)
+    options.update(kwargs)
+    return CaseTypeRangeIndex(str(tmp_path / 'case_types.sqlite3'), 'lorain', **options)
+
+
+def walk(index, case_ids, pages):
+    """Walks `case_ids` one at a time; `pages` maps a CaseID to its type, missing ones are empty."""
+    fetched = []
+    pending = list(case_ids)
+    while pending:
+        pending = index.take_backfill() + pending
+        case_id = pending.pop(0)
+        if index.should_skip(case_id):
+            continue
+        fetched.append(case_id)
+        if case_id in pages:
+            index.record(case_id, pages[case_id])
+        else:
+            index.record_empty(case_id)
+    for case_id in index.take_backfill(final=True):
+        fetched.append(case_id)
+    return fetched
+
+
+def test_runs_from_earlier_crawls(tmp_path):
+    index = make_index(tmp_path, sample_rate=0)
+    for case_id, case_type in [(1, 'CV'), (2, 'CR'), (3, 'CR'), (5, 'CR'), (6, 'CV'), (7, 'TR'), (8, 'TR')]:
+        index.record(case_id, case_type)
+    index.close()
+
+    index = make_index(tmp_path, sample_rate=0, max_skip=0)
+    assert [tuple(run) for run in index.runs] == [
+        (1, 1, 'CV', 1), (2, 5, 'CR', 3), (6, 6, 'CV', 1), (7, 8, 'TR', 2)
+    ]
+    assert [index.should_skip(case_id) for case_id in range(1, 10)] == [
+        False, True, True, True, True, False, False, False, False
+    ]
+    # a contradicting observation stops the skipping of its run
+    index.record(4, 'CV')
+    assert not index.should_skip(3)
+    index.close()
+
+
+def test_extrapolates_the_current_block(tmp_path):
+    index = make_index(tmp_path)
+    pages = {case_id: 'CR' for case_id in range(1, 41)}
+    fetched = walk(index, range(1, 41), pages)
+    # three observations make the block, then every fourth skippable CaseID is sampled
+    assert fetched == [1, 2, 3, 7, 11, 15, 19, 23, 27, 31, 35, 39, 40]
+    assert (index.skipped, index.sampled, index.backfilled) == (28, 9, 1)
+
+
+def test_block_turning_civil_is_backfilled(tmp_path):
+    index = make_index(tmp_path)
+    pages = {case_id: 'CR' for case_id in range(1, 10)}
+    pages.update({case_id: 'CV' for case_id in range(10, 20)})
+    fetched = walk(index, range(1, 20), pages)
+    assert set(range(10, 20)) <= set(fetched)
+    assert fetched[:5] == [1, 2, 3, 7, 11]
+    # 8 to 10 were skipped on the strength of sample 7
+    assert index.backfilled == 3
+
+
+def test_empty_sample_ends_the_extrapolation(tmp_path):
+    index = make_index(tmp_path)
+    pages = {case_id: 'CR' for case_id in range(1, 6)}
+    pages.update({6: 'CV', 7: 'CV'})
+    fetched = walk(index, range(1, 20), pages)
+    assert {6, 7} <= set(fetched)
+    assert index.block is None or index.block.case_type == 'CV'
+
+
+def test_extrapolation_is_bounded_without_confirmation(tmp_path):
+    index = make_index(tmp_path, sample_rate=0, max_skip=5)
+    for case_id in (1, 2, 3):
+        index.record(case_id, 'TR')
+    assert [index.should_skip(case_id) for case_id in range(4, 11)] == [True] * 5 + [False] * 2
+    assert index.take_backfill(final=True) == [4, 5, 6, 7, 8]
+
+
+def test_civil_blocks_are_never_skipped(tmp_path):
+    index = make_index(tmp_path)
+    pages = {case_id: 'CV' for case_id in range(1, 30)}
+    assert walk(index, range(1, 30), pages) == list(range(1, 30))
+    assert index.skipped == 0
@@ -0,0 +1,58 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from parse_utils.stage_timing import (
+    STAGE_TIMINGS, StageHistogram, StageTimings, count_event, reset_stage_timings, stage_timer
+)
+
+
+def record_in_worker(milliseconds):
+    with stage_timer('soup'):
+        pass
+    STAGE_TIMINGS.record('parse/1_case_related_data', milliseconds / 1000)
+    count_event('cases_parsed')
+    return STAGE_TIMINGS.drain()
+
+
+def test_histogram_quantiles():
+    histogram = StageHistogram()
+    for ms in (0.5, 3, 3, 40, 900):
+        histogram.add(ms)
+    assert histogram.summary() == {
+        'count': 5, 'mean_ms': 189.3, 'p50_ms': 5, 'p95_ms': 900, 'max_ms': 900,
+    }
+
+
+def test_merge_adds_to_what_was_recorded():
+    timings = StageTimings()
+    timings.record('soup', 0.002)
+    timings.count('cases_parsed')
+
+    other = StageTimings()
+    other.record('soup', 0.020)
+    other.record('fingerprint', 0.001)
+    other.count('cases_parsed', 2)
+    other.count('docket_entries', 7)
+    timings.merge(*pickle.loads(pickle.dumps(other.drain())))
+
+    histograms, counters = timings.drain()
+    assert counters == {'cases_parsed': 3, 'docket_entries': 7}
+    assert histograms['soup'].count == 2 and histograms['soup'].max_ms == 20
+    assert histograms['fingerprint'].count == 1
+    assert timings.drain() == ({}, {})
+
+
+def test_worker_timings_reach_the_parent():
+    STAGE_TIMINGS.drain()
+    # recorded before the workers start, must not be reported again by them
+    count_event('cases_parsed', 100)
+    with ProcessPoolExecutor(max_workers=2, initializer=reset_stage_timings) as executor:
+        results = list(executor.map(record_in_worker, (1, 30, 30)))
+    STAGE_TIMINGS.drain()
+    for result in results:
+        STAGE_TIMINGS.merge(*result)
+
+    histograms, counters = STAGE_TIMINGS.drain()
+    assert counters == {'cases_parsed': 3}
+    assert histograms['soup'].count == 3
+    assert histograms['parse/1_case_related_data'].max_ms == 30
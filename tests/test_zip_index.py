@@ -0,0 +1,72 @@
+import os
+import pickle
+
+from parse_utils import zip_index
+from parse_utils.zip_index import ZIP_INDEX_VERSION, load_zip_index
+
+ZIPS = '44035|Lorain County|OH\n44001|Lorain County|OH\n44101|Cuyahoga County|OH\n'
+
+
+def write_zips(tmp_path, text=ZIPS, mtime=None):
+    path = tmp_path / 'zips.txt'
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_builds_and_saves_a_missing_index(tmp_path):
+    zips_path = write_zips(tmp_path)
+    index_path = str(tmp_path / 'zips.idx.pickle')
+    index = load_zip_index(zips_path, index_path)
+    assert index.zips_of('Lorain Oh') == {'44035', '44001'}
+    assert index.county_of('44101') == 'Cuyahoga Oh'
+    with open(index_path, 'rb') as file:
+        assert pickle.load(file)['version'] == ZIP_INDEX_VERSION
+
+
+def test_loads_a_fresh_index_without_reading_zips(tmp_path, monkeypatch):
+    zips_path = write_zips(tmp_path)
+    index_path = str(tmp_path / 'zips.idx.pickle')
+    load_zip_index(zips_path, index_path)
+
+    def build_zip_index(path):
+        raise AssertionError('fresh index rebuilt')
+
+    monkeypatch.setattr(zip_index, 'build_zip_index', build_zip_index)
+    assert load_zip_index(zips_path, index_path).zips_of('Lorain Oh') == {'44035', '44001'}
+
+
+def test_rebuilds_when_zips_is_newer_than_the_index(tmp_path):
+    zips_path = write_zips(tmp_path, mtime=1_000_000)
+    index_path = str(tmp_path / 'zips.idx.pickle')
+    load_zip_index(zips_path, index_path)
+    os.utime(index_path, (1_000_000, 1_000_000))
+
+    write_zips(tmp_path, ZIPS + '44050|Lorain County|OH\n', mtime=2_000_000)
+    assert '44050' in load_zip_index(zips_path, index_path).zips_of('Lorain Oh')
+    assert os.path.getmtime(index_path) > 2_000_000
+    with open(index_path, 'rb') as file:
+        assert '44050' in pickle.load(file)['zip_to_counties']
+
+
+def test_rebuilds_an_index_of_another_version(tmp_path):
+    zips_path = write_zips(tmp_path, mtime=1_000_000)
+    index_path = str(tmp_path / 'zips.idx.pickle')
+    with open(index_path, 'wb') as file:
+        pickle.dump({'version': ZIP_INDEX_VERSION + 1, 'zip_to_counties': {}}, file)
+    assert load_zip_index(zips_path, index_path).zips_of('Lorain Oh') == {'44035', '44001'}
+
+
+def test_rebuilds_a_corrupt_index(tmp_path):
+    zips_path = write_zips(tmp_path, mtime=1_000_000)
+    index_path = tmp_path / 'zips.idx.pickle'
+    index_path.write_bytes(b'not a pickle')
+    assert load_zip_index(zips_path, str(index_path)).county_of('44035') == 'Lorain Oh'
+
+
+def test_unwritable_index_location_still_returns_the_index(tmp_path):
+    zips_path = write_zips(tmp_path)
+    index_path = str(tmp_path / 'missing' / 'zips.idx.pickle')
+    assert load_zip_index(zips_path, index_path).county_of('44035') == 'Lorain Oh'
+    assert not os.path.exists(index_path)